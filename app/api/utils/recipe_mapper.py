@@ -1,6 +1,8 @@
 from typing import List, Dict, Set
 import re
 
+from app.utils.recipe_record import RecipeRecord, _interned
+
 
 def rank_recipes(
     recipes: List[Dict],
@@ -92,3 +94,59 @@ def rank_recipes(
     # 🎯 Always return something
     return unique_results[:5]
 
+
+
+def recipe_db_to_schema(recipe) -> Dict:
+    """
+    Map a RecipeDB row back to the normalized recipe format
+    (same keys as normalize_spoonacular_recipe), so local and
+    Spoonacular results flow through the same ranking code.
+    """
+    instructions = [s for s in (recipe.instructions or "").split("\n") if s.strip()]
+
+    return {
+        "id": recipe.spoonacular_id,
+        "title": recipe.title,
+        "ingredients": sorted(ing.name for ing in recipe.ingredients),
+        "instructions": instructions or ["No instructions provided."],
+        "ready_in_minutes": recipe.ready_in_minutes,
+        "source_url": recipe.source_url,
+        "image": recipe.image,
+        "estimated_cost_kes": recipe.estimated_cost_kes,
+        "price_per_serving": recipe.price_per_serving,
+        "calories": recipe.calories,
+        "dietary_tags": list(recipe.dietary_tags or []),
+        "protein_score": recipe.protein_score,
+        "protein_per_cost": recipe.protein_per_cost,
+        "popularity": recipe.popularity or 0,
+        "diets": list(recipe.diets or []),
+        "cuisines": list(recipe.cuisines or []),
+        "dish_types": list(recipe.dish_types or []),
+    }
+
+
+def recipe_db_to_record(recipe) -> RecipeRecord:
+    """
+    Map a RecipeDB row straight to a compact RecipeRecord (no intermediate dict).
+    """
+    instructions = tuple(s for s in (recipe.instructions or "").split("\n") if s.strip())
+
+    return RecipeRecord(
+        id=recipe.spoonacular_id,
+        title=recipe.title,
+        ingredients=_interned(sorted(ing.name for ing in recipe.ingredients)),
+        instructions=instructions or ("No instructions provided.",),
+        ready_in_minutes=recipe.ready_in_minutes,
+        source_url=recipe.source_url,
+        image=recipe.image,
+        estimated_cost_kes=recipe.estimated_cost_kes,
+        price_per_serving=recipe.price_per_serving,
+        calories=recipe.calories,
+        dietary_tags=_interned(recipe.dietary_tags or []),
+        protein_score=recipe.protein_score,
+        protein_per_cost=recipe.protein_per_cost,
+        popularity=recipe.popularity or 0,
+        diets=_interned(recipe.diets or []),
+        cuisines=_interned(recipe.cuisines or []),
+        dish_types=_interned(recipe.dish_types or []),
+    )
@@ -0,0 +1,44 @@
+import json
+import importlib.util
+from dataclasses import fields, is_dataclass
+from typing import Any
+
+from fastapi.responses import Response
+
+ORJSON_AVAILABLE = importlib.util.find_spec("orjson") is not None
+if ORJSON_AVAILABLE:
+    import orjson
+
+
+def _default(obj: Any) -> Any:
+    # Mirrors json.dumps(default=str), plus dataclasses for the stdlib fallback
+    if is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    return str(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    JSON-encode to bytes. orjson when installed (dataclasses like RecipeRecord
+    and tuples are serialized natively), stdlib json otherwise.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    application/json response encoded with orjson.
+
+    Returning an instance from an endpoint also skips FastAPI's response_model
+    re-validation and jsonable_encoder pass, so only hand it data that is already
+    shaped like the declared model. Pre-encoded bytes are written out as-is.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
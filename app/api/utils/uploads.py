@@ -0,0 +1,144 @@
+import importlib.util
+import os
+import tempfile
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+from app.utils.image_processing import SUPPORTED_MEDIA_TYPES, sniff_media_type
+
+MULTIPART_AVAILABLE = importlib.util.find_spec("python_multipart") is not None
+if MULTIPART_AVAILABLE:
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Hard cap on an uploaded photo; bigger bodies are cut off mid-stream with a 413
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(15 * 1024 * 1024)))
+# Uploads stay in memory up to this size, then spill to a temp file
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+
+
+class SpooledUpload:
+    """
+    One uploaded file, written to a SpooledTemporaryFile as the body streams in.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.file = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.head = b""
+        self.media_type: Optional[str] = None
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise HTTPException(status_code=413, detail=f"Image larger than {self.max_bytes} bytes")
+        if len(self.head) < 12:
+            self.head += data[:12 - len(self.head)]
+        self.file.write(data)
+
+    def finish(self) -> "SpooledUpload":
+        if not self.size:
+            raise HTTPException(status_code=400, detail="Empty image upload")
+        # What the bytes are, not what the client says they are
+        self.media_type = sniff_media_type(self.head)
+        if self.media_type not in SUPPORTED_MEDIA_TYPES:
+            raise HTTPException(status_code=415, detail="Upload is not a JPEG, PNG, GIF or WebP image")
+        self.file.seek(0)
+        return self
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _FilePartWriter:
+    """
+    MultipartParser callbacks that stream the first file part into a SpooledUpload
+    and skip every other part.
+    """
+
+    def __init__(self, upload: SpooledUpload, field: str):
+        self.upload = upload
+        self.field = field
+        self.found = False
+        self._capturing = False
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": lambda data, start, end: self._append("_header_field", data[start:end]),
+            "on_header_value": lambda data, start, end: self._append("_header_value", data[start:end]),
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def _append(self, attr: str, chunk: bytes) -> None:
+        setattr(self, attr, getattr(self, attr) + chunk)
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("latin-1")
+        self._capturing = not self.found and b"filename" in options and name == self.field
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._capturing:
+            self.upload.write(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._capturing:
+            self.found = True
+        self._capturing = False
+
+
+async def spool_image_upload(request: Request, field: str = "file") -> SpooledUpload:
+    """
+    Stream an image upload to a spooled temp file, enforcing UPLOAD_MAX_BYTES as
+    chunks arrive. Accepts multipart/form-data (the `field` file part) or a raw
+    image body. The caller owns the returned upload and must close() it.
+    """
+    length = request.headers.get("content-length")
+    # Multipart framing adds a little on top of the file itself
+    if length and length.isdigit() and int(length) > UPLOAD_MAX_BYTES + 64 * 1024:
+        raise HTTPException(status_code=413, detail=f"Image larger than {UPLOAD_MAX_BYTES} bytes")
+
+    content_type = request.headers.get("content-type", "")
+    upload = SpooledUpload(UPLOAD_MAX_BYTES)
+    try:
+        if content_type.startswith("multipart/form-data"):
+            if not MULTIPART_AVAILABLE:
+                raise HTTPException(status_code=415, detail="Multipart uploads need python-multipart; send the raw image body instead")
+            _, options = parse_options_header(content_type)
+            boundary = options.get(b"boundary")
+            if not boundary:
+                raise HTTPException(status_code=400, detail="Multipart body without a boundary")
+            writer = _FilePartWriter(upload, field)
+            parser = MultipartParser(boundary, writer.callbacks())
+            try:
+                async for chunk in request.stream():
+                    parser.write(chunk)
+                parser.finalize()
+            except MultipartParseError as e:
+                raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+            if not writer.found:
+                raise HTTPException(status_code=400, detail=f"No '{field}' file part in the upload")
+        else:
+            async for chunk in request.stream():
+                upload.write(chunk)
+        return upload.finish()
+    except BaseException:
+        upload.close()
+        raise
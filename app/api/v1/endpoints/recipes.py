@@ -1,109 +1,52 @@
-from fastapi import APIRouter, HTTPException
+import os
+import time
+from typing import AsyncIterator, Dict, List, Tuple
 
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.schemas.intent import IntentSchema
 from app.schemas.recipe_request import RecipeRequest
+from app.schemas.pantry import PantryRequest
 from app.schemas.recipe_response import RecipeListResponse
-from app.services.spoonacular_service import search_recipes, get_random_ingredient
+from app.api.utils.responses import FastJSONResponse, dumps
+from app.services.cache import CacheEntry, LRUCache
+from app.services.metrics import FALLBACKS
+from app.services.tracing import finish_trace, span, start_trace, trace
+from app.services.spoonacular_service import search_recipes, get_random_ingredient, upstream_available
 from app.services.llm_service import parse_user_intent, get_weird_fact
-from app.utils.recipe_normalizer import normalize_spoonacular_recipe
+from app.services.search_planner import search_with_relaxation
+from app.services.local_corpus import LOCAL_CORPUS_MIN_RESULTS, search_local, persist_recipes, pantry_search
+from app.utils.recipe_normalizer import normalize_spoonacular_batch
 from app.utils.recipe_ranker import rank_recipes
+from app.utils.recipe_record import RecipeRecord
 from app.utils.intent_normalizer import normalize_intent
 
 router = APIRouter()
 
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
 
-@router.post("/search", response_model=RecipeListResponse)
-async def search_recipes_endpoint(payload: RecipeRequest):
-    """
-    AI-powered recipe search:
-    - Parse intent using Phi-3
-    - Structured Spoonacular search
-    - Normalize
-    - Rank
-    """
-    print(f"--- [SEARCH TRACE] Raw User Input: {payload.query} ---")
-
-    # 1️⃣ Parse intent
-    try:
-        intent = await parse_user_intent(payload.query)
-        print(f"--- [SEARCH TRACE] Parsed Intent: {intent.model_dump_json()} ---")
-    except Exception as e:
-        print(f"Intent parsing failed: {e}")
-        # Fallback to a basic intent if parsing fails completely
-        from app.schemas.intent import IntentSchema
-        intent = IntentSchema(query=payload.query)
-        print(f"--- [SEARCH TRACE] Fallback Intent: {intent.model_dump_json()} ---")
-
-    # 1.5 Apply Normalization Layer
-    intent = normalize_intent(intent)
-    print(f"--- [SEARCH TRACE] Normalized Intent: {intent.model_dump_json()} ---")
-
-    # 2️⃣ Spoonacular does retrieval (with progressive relaxation)
-    relaxation_applied = []
-    try:
-        raw_recipes = search_recipes(
-            query=intent.query,
-            diet=intent.diet,
-            cuisine=intent.cuisine,
-            intolerances=intent.intolerances,
-            max_calories=intent.max_calories,
-            max_price=intent.max_price,
-            max_time=intent.max_time_minutes,
-            recipe_type=intent.recipe_type,
-            number=15,
-        )
-
-        # Relaxation Step 1: Remove time constraint
-        if not raw_recipes and intent.max_time_minutes is not None:
-            print("--- [SEARCH TRACE] 0 results, retrying without max_time_minutes ---")
-            relaxation_applied.append("max_time_minutes")
-            raw_recipes = search_recipes(
-                query=intent.query,
-                diet=intent.diet,
-                cuisine=intent.cuisine,
-                intolerances=intent.intolerances,
-                max_calories=intent.max_calories,
-                max_price=intent.max_price,
-                recipe_type=intent.recipe_type,
-                number=15,
-            )
+# Encoded /search response bodies: a repeat query is written out without re-encoding
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+response_cache = LRUCache(int(os.getenv("RESPONSE_CACHE_MAXSIZE", "256")))
 
-        # Relaxation Step 2: Remove calorie constraint
-        if not raw_recipes and intent.max_calories is not None:
-            print("--- [SEARCH TRACE] 0 results, retrying without max_calories ---")
-            relaxation_applied.append("max_calories")
-            raw_recipes = search_recipes(
-                query=intent.query,
-                diet=intent.diet,
-                cuisine=intent.cuisine,
-                intolerances=intent.intolerances,
-                max_price=intent.max_price,
-                recipe_type=intent.recipe_type,
-                number=15,
-            )
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Spoonacular error: {str(e)}",
-        )
+def response_cache_key(query: str) -> str:
+    return " ".join(query.lower().split())
 
-    if not raw_recipes:
-        return {
-            "recipes": [],
-            "message": "No recipes found",
-            "parsed_intent": intent.model_dump(),
-            "relaxation_applied": relaxation_applied
-        }
 
-    # 3️⃣ Normalize and Deduplicate
-    normalized = []
+def normalize_and_dedupe(raw_recipes: List[Dict]) -> List[RecipeRecord]:
+    # Dedupe on the raw payload so duplicates are never normalized
+    unique = []
     seen_ids = set()
     seen_backups = set()
 
     for r in raw_recipes:
-        norm = normalize_spoonacular_recipe(r)
-        rid = norm.get("id")
-        backup_key = f"{norm.get('title')}-{norm.get('source_url')}"
+        rid = r.get("id")
+        backup_key = f"{r.get('title', 'Untitled Recipe')}-{r.get('sourceUrl')}"
 
         if rid and rid in seen_ids:
             continue
@@ -112,30 +55,189 @@ async def search_recipes_endpoint(payload: RecipeRequest):
 
         if rid: seen_ids.add(rid)
         seen_backups.add(backup_key)
-        normalized.append(norm)
+        unique.append(r)
+
+    normalized, _ = normalize_spoonacular_batch(unique)
+    return [RecipeRecord.from_normalized(norm) for norm in normalized]
+
+
+async def run_search(
+    payload: RecipeRequest,
+    background_tasks: BackgroundTasks,
+) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    The search pipeline as a stream of (event, data) pairs:
+    - "intent": parsed + normalized intent, as soon as it's known
+    - "recipe": one RecipeRecord per ranked recipe, best first
+    - "done": final metadata (message, relaxation_applied)
+    """
+    start_trace("search")
+    try:
+        async for item in _run_search(payload, background_tasks):
+            yield item
+    finally:
+        finish_trace()
+
+
+async def _run_search(
+    payload: RecipeRequest,
+    background_tasks: BackgroundTasks,
+) -> AsyncIterator[Tuple[str, Dict]]:
+    trace(f"Raw User Input: {payload.query}")
+
+    # 1️⃣ Parse intent
+    with span("intent_parse"):
+        try:
+            intent = await parse_user_intent(payload.query)
+            trace(f"Parsed Intent: {intent.model_dump_json()}")
+        except Exception as e:
+            print(f"Intent parsing failed: {e}")
+            # Fallback to a basic intent if parsing fails completely
+            FALLBACKS.inc(kind="intent_basic")
+            intent = IntentSchema(query=payload.query)
+            trace(f"Fallback Intent: {intent.model_dump_json()}")
+
+        # 1.5 Apply Normalization Layer
+        intent = normalize_intent(intent)
+    trace(f"Normalized Intent: {intent.model_dump_json()}")
+    yield "intent", {"parsed_intent": intent.model_dump()}
+
+    # 2️⃣ Local corpus first; Spoonacular only when local recall is too low
+    relaxation_applied = []
+    with span("local_search"):
+        normalized = await search_local(intent)
+
+    if len(normalized) >= LOCAL_CORPUS_MIN_RESULTS:
+        trace(f"Served {len(normalized)} recipes from local corpus")
+    elif normalized and not upstream_available():
+        # Spoonacular is failing or out of points: a few local hits beat none
+        FALLBACKS.inc(kind="local_only")
+        trace(f"Spoonacular unavailable, serving {len(normalized)} local recipes")
+    else:
+        # Spoonacular does retrieval (strict + relaxed variants run concurrently)
+        try:
+            with span("upstream_search"):
+                raw_recipes, relaxation_applied = await search_with_relaxation(
+                    search_recipes, intent, number=15
+                )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Spoonacular error: {str(e)}",
+            )
+
+        if not raw_recipes:
+            yield "done", {"message": "No recipes found", "relaxation_applied": relaxation_applied}
+            return
+
+        # 3️⃣ Normalize and Deduplicate
+        with span("normalize"):
+            normalized = normalize_and_dedupe(raw_recipes)
+
+        # Grow the local corpus after the response is sent
+        background_tasks.add_task(persist_recipes, list(normalized))
 
     # 4️⃣ Rank (busy professional logic)
-    ranked = rank_recipes(
-        recipes=normalized,
-        query_ingredients=[intent.query],
-        constraints={
-            "diet": intent.diet,
-            "max_calories": intent.max_calories if "max_calories" not in relaxation_applied else None,
-            "max_price": intent.max_price,
-            "max_time": intent.max_time_minutes if "max_time_minutes" not in relaxation_applied else None
-        },
-    )
+    with span("rank"):
+        ranked = rank_recipes(
+            recipes=normalized,
+            query_ingredients=[intent.query],
+            constraints={
+                "diet": intent.diet,
+                "max_calories": intent.max_calories if "max_calories" not in relaxation_applied else None,
+                "max_price": intent.max_price,
+                "max_time": intent.max_time_minutes if "max_time_minutes" not in relaxation_applied else None
+            },
+        )
+    for recipe in ranked:
+        yield "recipe", recipe
 
     message = "Recipes fetched successfully"
     if relaxation_applied:
         message = f"No results with all filters — tried broader search (removed: {', '.join(relaxation_applied)})"
 
-    return {
-        "recipes": ranked,
-        "message": message,
-        "parsed_intent": intent.model_dump(),
-        "relaxation_applied": relaxation_applied
-    }
+    yield "done", {"message": message, "relaxation_applied": relaxation_applied}
+
+
+def _encode_event(event: str, data, fmt: str) -> bytes:
+    with span("serialize"):
+        return _encode(event, data, fmt)
+
+
+def _encode(event: str, data, fmt: str) -> bytes:
+    if fmt == "sse":
+        return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+    return dumps({"event": event, "data": data}) + b"\n"
+
+
+async def _stream_search(payload: RecipeRequest, background_tasks: BackgroundTasks) -> AsyncIterator[bytes]:
+    try:
+        async for event, data in run_search(payload, background_tasks):
+            yield _encode_event(event, data, payload.stream)
+    except HTTPException as e:
+        # Headers are already sent, so errors travel in-band
+        yield _encode_event("error", {"status_code": e.status_code, "detail": e.detail}, payload.stream)
+
+
+@router.post("/search", response_model=RecipeListResponse, response_class=FastJSONResponse)
+async def search_recipes_endpoint(payload: RecipeRequest, background_tasks: BackgroundTasks):
+    """
+    AI-powered recipe search:
+    - Parse intent using Phi-3
+    - Local corpus, then structured Spoonacular search
+    - Normalize (and persist locally)
+    - Rank
+
+    Set "stream": "ndjson" or "sse" to receive each stage as it completes.
+    """
+    if payload.stream:
+        return StreamingResponse(
+            _stream_search(payload, background_tasks),
+            media_type=STREAM_MEDIA_TYPES[payload.stream],
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    key = response_cache_key(payload.query)
+    cached = response_cache.get(key, time.time())
+    if cached is not None:
+        trace(f"Response cache hit for '{key}'")
+        return FastJSONResponse(cached.value)
+
+    recipes: List[RecipeRecord] = []
+    meta: Dict = {}
+    async for event, data in run_search(payload, background_tasks):
+        if event == "recipe":
+            recipes.append(data)
+        else:
+            meta.update(data)
+
+    # Records are already response-shaped: encode them directly, no model re-validation
+    with span("serialize"):
+        body = dumps({
+            "recipes": recipes,
+            "message": meta.get("message"),
+            "parsed_intent": meta.get("parsed_intent"),
+            "relaxation_applied": meta.get("relaxation_applied", []),
+        })
+    if recipes:
+        now = time.time()
+        response_cache.set(key, CacheEntry(body, now + RESPONSE_CACHE_TTL, now + RESPONSE_CACHE_TTL))
+    return FastJSONResponse(body)
+
+
+@router.post("/pantry", response_model=RecipeListResponse)
+async def pantry_search_endpoint(payload: PantryRequest):
+    """
+    "What can I cook with what I have?" over the local recipe corpus.
+    """
+    recipes = await pantry_search(
+        payload.ingredients,
+        mode=payload.mode,
+        max_missing=payload.max_missing,
+        limit=payload.limit,
+    )
+    message = "Recipes fetched successfully" if recipes else "No recipes found"
+    return {"recipes": recipes, "message": message}
 
 
 @router.get("/verify/random-fact")
@@ -143,7 +245,7 @@ async def verify_random_fact():
     """
     Verification endpoint for Jules to prove connectivity and AI capability.
     """
-    ingredient = get_random_ingredient()
+    ingredient = await get_random_ingredient()
     fact = await get_weird_fact(ingredient)
     return {
         "ingredient": ingredient,
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Request
 from app.services.anthropic_service import (
     get_hydration_nudge,
     get_goal_prediction,
     get_hydration_insights,
     chat_with_coach,
-    analyze_food_image
+    analyze_food_image,
+    analyze_food_image_file
 )
+from app.api.utils.responses import FastJSONResponse
+from app.api.utils.uploads import spool_image_upload
 from typing import List, Dict
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
 @router.get("/")
 async def get_root():
@@ -58,3 +61,17 @@ async def hydration_chat(message: str = Body(..., embed=True), history: List[Dic
 async def analyze_calories(image_data: str = Body(..., embed=True)):
     analysis = await analyze_food_image(image_data)
     return {"analysis": analysis}
+
+@router.post("/calories/analyze/upload")
+async def analyze_calories_upload(request: Request):
+    """
+    Photo as multipart/form-data (`file` part) or a raw image body.
+    Streamed to a size-capped spool file and typed by its magic bytes,
+    no base64 or JSON round trip.
+    """
+    upload = await spool_image_upload(request)
+    try:
+        analysis = await analyze_food_image_file(upload.file, upload.media_type)
+    finally:
+        upload.close()
+    return {"analysis": analysis}
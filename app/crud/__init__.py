@@ -1,9 +1,19 @@
 from app.crud.recipe import (
     create_recipe,
+    bulk_create_recipes,
+    resolve_ingredient_ids,
     get_recipes_by_ingredients,
+    get_existing_spoonacular_ids,
+    search_local_recipes,
+    get_recipes_by_ids,
 )
 
 __all__ =[
     "create_recipe",
-    "get_recipes_by_ingredients"
+    "bulk_create_recipes",
+    "resolve_ingredient_ids",
+    "get_recipes_by_ingredients",
+    "get_existing_spoonacular_ids",
+    "search_local_recipes",
+    "get_recipes_by_ids",
 ]
\ No newline at end of file
@@ -1,8 +1,13 @@
-from sqlalchemy.orm import Session
-from typing import List
-from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import and_, func, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from app.db.models import RecipeDB, IngredientDB
+from app.models.models import RecipeDB, IngredientDB, recipe_ingredients
+
+# Keep IN (...) lists and multi-row VALUES under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
 
 
 # -------------------------
@@ -31,6 +36,30 @@ def get_or_create_ingredient(db: Session, name: str) -> IngredientDB:
 # RECIPE CREATION
 # -------------------------
 
+def recipe_row(data: dict) -> dict:
+    """
+    Column values for a RecipeDB row from a normalized recipe.
+    """
+    return {
+        "spoonacular_id": data.get("id"),
+        "title": data["title"],
+        "instructions": "\n".join(data["instructions"]),
+        "ready_in_minutes": data.get("ready_in_minutes"),
+        "source_url": data.get("source_url"),
+        "image": data.get("image"),
+        "estimated_cost_kes": data.get("estimated_cost_kes"),
+        "price_per_serving": data.get("price_per_serving"),
+        "calories": data.get("calories"),
+        "protein_score": data.get("protein_score"),
+        "protein_per_cost": data.get("protein_per_cost"),
+        "popularity": data.get("popularity") or 0,
+        "dietary_tags": data.get("dietary_tags", []),
+        "diets": data.get("diets", []),
+        "cuisines": data.get("cuisines", []),
+        "dish_types": data.get("dish_types", []),
+    }
+
+
 def create_recipe(
     db: Session,
     data: dict,
@@ -49,15 +78,7 @@ def create_recipe(
         if ing.strip()
     }
 
-    recipe = RecipeDB(
-        title=data["title"],
-        instructions=" ".join(data["instructions"]),
-        ready_in_minutes=data.get("ready_in_minutes"),
-        source_url=data.get("source_url"),
-        estimated_cost_kes=data.get("estimated_cost_kes"),
-        protein_score=data.get("protein_score"),
-        protein_per_cost=data.get("protein_per_cost"),
-    )
+    recipe = RecipeDB(**recipe_row(data))
 
     db.add(recipe)
     db.commit()
@@ -76,6 +97,110 @@ def create_recipe(
     return recipe
 
 
+# -------------------------
+# BULK INGESTION
+# -------------------------
+
+def _chunks(items: List, size: int = CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _insert_ignore(db: Session, table):
+    """
+    INSERT ... ON CONFLICT DO NOTHING for the session's dialect.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return pg_insert(table).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite_insert(table).on_conflict_do_nothing()
+    raise NotImplementedError(f"Bulk ingestion does not support {dialect}")
+
+
+def resolve_ingredient_ids(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """
+    Map ingredient names to ids, inserting the missing ones.
+    Set-based: one INSERT ... ON CONFLICT DO NOTHING and one SELECT per chunk. Does not commit.
+    """
+    unique = sorted({n.strip().lower() for n in names if n and n.strip()})
+    ids: Dict[str, int] = {}
+
+    for chunk in _chunks(unique):
+        db.execute(_insert_ignore(db, IngredientDB.__table__).values([{"name": n} for n in chunk]))
+        rows = db.execute(
+            select(IngredientDB.id, IngredientDB.name).where(IngredientDB.name.in_(chunk))
+        )
+        ids.update({name: iid for iid, name in rows})
+
+    return ids
+
+
+def bulk_create_recipes(db: Session, recipes: List[dict]) -> int:
+    """
+    Ingest many normalized recipes in ONE transaction:
+    - skip Spoonacular ids already stored (and duplicates inside the batch)
+    - resolve every ingredient name with set-based queries
+    - insert recipes, then all recipe_ingredients links with executemany
+
+    Returns the number of recipes inserted. Rolls back everything on error.
+    """
+    if not recipes:
+        return 0
+
+    try:
+        existing = get_existing_spoonacular_ids(db, (r.get("id") for r in recipes))
+        batch: List[dict] = []
+        for r in recipes:
+            rid = r.get("id")
+            if rid is not None:
+                if rid in existing:
+                    continue
+                existing.add(rid)
+            batch.append(r)
+
+        if not batch:
+            return 0
+
+        ingredient_ids = resolve_ingredient_ids(
+            db, (name for r in batch for name in r.get("ingredients", []))
+        )
+
+        # A concurrent persist may store the same Spoonacular ids between the
+        # SELECT above and these INSERTs: skip those rows instead of failing the batch
+        inserted: List[tuple] = []
+        keyed = [r for r in batch if r.get("id") is not None]
+        for chunk in _chunks(keyed):
+            result = db.execute(
+                _insert_ignore(db, RecipeDB.__table__).returning(RecipeDB.id, RecipeDB.spoonacular_id),
+                [recipe_row(r) for r in chunk],
+            )
+            by_spoonacular_id = dict((sid, rid) for rid, sid in result)
+            inserted.extend((by_spoonacular_id[r["id"]], r) for r in chunk if r["id"] in by_spoonacular_id)
+
+        unkeyed = [r for r in batch if r.get("id") is None]
+        for chunk in _chunks(unkeyed):
+            result = db.execute(
+                insert(RecipeDB).returning(RecipeDB.id, sort_by_parameter_order=True),
+                [recipe_row(r) for r in chunk],
+            )
+            inserted.extend(zip((row[0] for row in result), chunk))
+
+        links = [
+            {"recipe_id": recipe_id, "ingredient_id": ingredient_ids[name]}
+            for recipe_id, r in inserted
+            for name in {n.strip().lower() for n in r.get("ingredients", []) if n and n.strip()}
+        ]
+        if links:
+            db.execute(recipe_ingredients.insert(), links)
+
+        db.commit()
+        return len(inserted)
+    except Exception:
+        db.rollback()
+        raise
+
+
 # -------------------------
 # SEARCH
 # -------------------------
@@ -85,7 +210,9 @@ def get_recipes_by_ingredients(
     ingredient_names: List[str],
 ):
     """
-    Return recipes that contain ALL given ingredients.
+    Return recipes that contain ANY of the given ingredients,
+    with a match_count, best matches first.
+    For ALL / "at most N missing" queries use the in-memory ingredient index.
     """
 
     if not ingredient_names:
@@ -103,3 +230,81 @@ def get_recipes_by_ingredients(
     )
 
     return results
+
+
+def get_existing_spoonacular_ids(
+    db: Session,
+    spoonacular_ids: Iterable[int],
+) -> Set[int]:
+    """
+    Which of these Spoonacular ids are already in the local corpus.
+    """
+    ids = [i for i in spoonacular_ids if i is not None]
+    if not ids:
+        return set()
+
+    rows = (
+        db.query(RecipeDB.spoonacular_id)
+        .filter(RecipeDB.spoonacular_id.in_(ids))
+        .all()
+    )
+    return {row[0] for row in rows}
+
+
+def search_local_recipes(
+    db: Session,
+    terms: List[str],
+    max_time: Optional[int] = None,
+    max_calories: Optional[int] = None,
+    limit: int = 200,
+) -> List[RecipeDB]:
+    """
+    Candidate recipes from the local corpus.
+    Every term must appear in the title or match an ingredient name.
+    Label filters (diet, cuisine, type) are applied by the caller.
+    """
+
+    query = db.query(RecipeDB).options(selectinload(RecipeDB.ingredients))
+
+    term_filters = [
+        or_(
+            RecipeDB.title.ilike(f"%{term}%"),
+            RecipeDB.ingredients.any(IngredientDB.name.ilike(f"%{term}%")),
+        )
+        for term in terms
+    ]
+    if term_filters:
+        query = query.filter(and_(*term_filters))
+
+    if max_time is not None:
+        query = query.filter(RecipeDB.ready_in_minutes <= max_time)
+
+    if max_calories is not None:
+        query = query.filter(RecipeDB.calories <= max_calories)
+
+    return (
+        query
+        .order_by(RecipeDB.popularity.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def get_recipes_by_ids(
+    db: Session,
+    recipe_ids: List[int],
+) -> List[RecipeDB]:
+    """
+    Load recipes (with ingredients) by primary key, keeping the given order.
+    """
+    if not recipe_ids:
+        return []
+
+    rows = (
+        db.query(RecipeDB)
+        .options(selectinload(RecipeDB.ingredients))
+        .filter(RecipeDB.id.in_(recipe_ids))
+        .all()
+    )
+    by_id = {r.id: r for r in rows}
+    return [by_id[i] for i in recipe_ids if i in by_id]
@@ -0,0 +1,41 @@
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import MetaData
+
+
+def add_missing_columns(engine: Engine, metadata: MetaData) -> List[str]:
+    """
+    Bring tables created by an older build up to the current models.
+
+    create_all() only creates missing tables; it never alters existing ones,
+    so columns added to a model since then are added here (nullable, no
+    server default), followed by any missing indexes. UNIQUE columns get
+    their uniqueness from the model's unique index, since SQLite can't add a
+    UNIQUE column. Returns the "table.column" names that were added.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+
+            indexed = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexed:
+                    index.create(bind=conn, checkfirst=True)
+
+    for name in added:
+        print(f"🛠️ Added column {name}")
+    return added
@@ -1,16 +1,37 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.v1.api import router as api_router
 from app.db.database import engine
 from app.db.database import Base
+from app.db.migrations import add_missing_columns
+from app.services import spoonacular_service
+from app.services.http_clients import registry
+from app.services import llm_service, tracing
+from app.services.metrics import metrics
 import app.models
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Open every upstream pool up front so the first request doesn't pay the handshake
+    await registry.open_all()
+    tracing.start_writer()
+    yield
+    await registry.close_all()
+    await spoonacular_service.close_cache()
+    tracing.stop_writer()
+
+
 app = FastAPI(
     title="QuickBite AI Nutrition Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # In production, these should be restricted
@@ -23,6 +44,7 @@ origins = [
 
 # Create tables (Note: In production use Alembic)
 Base.metadata.create_all(bind=engine)
+add_missing_columns(engine, Base.metadata)
 
 app.add_middleware(
     CORSMiddleware,
@@ -37,3 +59,48 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/")
 async def root():
     return {"message": "QuickBite API is running"}
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "pools": registry.stats(),
+        "breakers": registry.breaker_states(),
+        "spoonacular_quota": spoonacular_service.quota.snapshot(),
+    }
+
+
+BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+metrics.gauge(
+    "quickbite_upstream_in_flight",
+    "Requests currently in flight per upstream pool",
+    ["provider"],
+    collect=lambda: {(name,): s["in_flight"] for name, s in registry.stats().items()},
+)
+metrics.gauge(
+    "quickbite_circuit_state",
+    "Circuit breaker state per upstream (0 closed, 1 half-open, 2 open)",
+    ["provider"],
+    collect=lambda: {(name,): BREAKER_STATE_VALUES[b["state"]] for name, b in registry.breaker_states().items()},
+)
+metrics.gauge(
+    "quickbite_spoonacular_quota_used_ratio",
+    "Share of the Spoonacular point budget currently spent",
+    collect=lambda: {(): spoonacular_service.quota.snapshot()["used_ratio"]},
+)
+metrics.gauge(
+    "quickbite_cache_hit_ratio",
+    "Hit ratio per cache",
+    ["cache"],
+    collect=lambda: {
+        ("spoonacular_search",): spoonacular_service.search_cache.stats()["hit_ratio"],
+        ("intent",): llm_service.intent_cache.stats()["hit_ratio"],
+    },
+)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Table,
     ForeignKey,
+    JSON,
 )
 from datetime import datetime
 from app.db.database import Base
@@ -24,13 +25,25 @@ class RecipeDB(Base):
     __tablename__ = "recipes"
 
     id = Column(Integer, primary_key=True, index=True)
+    spoonacular_id = Column(Integer, unique=True, index=True, nullable=True)
     title = Column(String, nullable=False)
     instructions = Column(Text, nullable=False)
     ready_in_minutes = Column(Integer)
     source_url = Column(String)
+    image = Column(String)
     estimated_cost_kes = Column(Integer)
+    price_per_serving = Column(Float)
+    calories = Column(Float)
     protein_score = Column(Float)
     protein_per_cost = Column(Float)
+    popularity = Column(Integer, default=0)
+
+    # Spoonacular labels, kept so the local corpus can apply the same filters
+    dietary_tags = Column(JSON, default=list)
+    diets = Column(JSON, default=list)
+    cuisines = Column(JSON, default=list)
+    dish_types = Column(JSON, default=list)
+
     created_at = Column(DateTime, default=datetime.utcnow)
 
     ingredients = relationship(
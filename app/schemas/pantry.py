@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal
+
+
+class PantryRequest(BaseModel):
+    ingredients: List[str] = Field(..., min_length=1, description="What you have at home")
+    mode: Literal["all", "any", "missing"] = Field(
+        "missing",
+        description="all: uses every ingredient, any: uses at least one, missing: at most max_missing extras needed",
+    )
+    max_missing: int = Field(0, ge=0, le=10, description="Extra ingredients you're willing to buy (mode=missing)")
+    limit: int = Field(20, ge=1, le=100)
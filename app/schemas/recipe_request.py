@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 
 class RecipeRequest(BaseModel):
     query: str
+    stream: Optional[Literal["ndjson", "sse"]] = None
     #persona: Optional[str] = "busy_professional"
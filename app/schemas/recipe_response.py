@@ -17,6 +17,10 @@ class Recipe(BaseModel):
     dietary_tags: List[str] = []
     protein_score: Optional[float] = None
     protein_per_cost: Optional[float] = None
+    popularity: Optional[int] = None
+    diets: List[str] = []
+    cuisines: List[str] = []
+    dish_types: List[str] = []
 
     match_score: float | None = None
     reasons: List[str] | None = None
@@ -1,17 +1,67 @@
 import os
-import httpx
-import json
-from typing import List, Dict, Optional
+import io
+import asyncio
+from typing import BinaryIO, List, Dict, Optional
+
+from app.services.http_clients import ProviderConfig, registry
+from app.services.metrics import metrics
+from app.services.vision_cache import vision_cache
+from app.utils.hydration_analytics import analyze_history
+from app.utils.hydration_history import compact_history
+from app.utils.image_processing import InvalidImageError, PreparedImage, decode_image_data, file_sha256, prepare_image
 
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 CLAUDE_MODEL = "claude-sonnet-4-20250514"
 
+VISION_FALLBACK = "Sorry, I couldn't analyze the image. Please try again."
+
+# Insights and goals are computed locally; Claude only rewords them when enabled
+HYDRATION_LLM_PHRASING = os.getenv("HYDRATION_LLM_PHRASING", "false").lower() == "true"
+HYDRATION_LLM_TIMEOUT = float(os.getenv("HYDRATION_LLM_TIMEOUT", "4"))
+
+ANTHROPIC_TOKENS = metrics.counter(
+    "quickbite_anthropic_tokens_total",
+    "Claude tokens billed, by kind",
+    ["kind"],
+)
+
+PROVIDER = "anthropic"
+registry.register(ProviderConfig(
+    name=PROVIDER,
+    base_url="https://api.anthropic.com",
+    timeout=30,
+    max_connections=int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "20")),
+    max_keepalive=int(os.getenv("ANTHROPIC_MAX_KEEPALIVE", "10")),
+    http2=True,
+    retries=2,
+    backoff=0.5,
+    retry_statuses=(429, 500, 502, 503, 504, 529),
+))
+
+def _record_usage(data: Dict) -> None:
+    usage = data.get("usage") or {}
+    for kind, field in (
+        ("input", "input_tokens"),
+        ("output", "output_tokens"),
+    ):
+        if usage.get(field):
+            ANTHROPIC_TOKENS.inc(usage[field], kind=kind)
+
+
+def history_prompt(history: List[Dict], tail: str = "") -> str:
+    """
+    User prompt for history-based calls: the compacted rollups of earlier
+    days, then the latest day plus `tail` (forecast, question, ...).
+    """
+    compact = compact_history(history)
+    return "\n".join(part for part in (compact.summary, compact.recent, tail) if part)
+
+
 async def call_claude(system_prompt: str, user_prompt: str) -> str:
     if not ANTHROPIC_API_KEY:
         print("⚠️ ANTHROPIC_API_KEY missing, using fallback")
         return "Claude is currently offline. Stay hydrated!"
 
-    url = "https://api.anthropic.com/v1/messages"
     headers = {
         "x-api-key": ANTHROPIC_API_KEY,
         "anthropic-version": "2023-06-01",
@@ -27,11 +77,13 @@ async def call_claude(system_prompt: str, user_prompt: str) -> str:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            return data["content"][0]["text"]
+        response = await registry.request(
+            PROVIDER, "POST", "/v1/messages", latency_key="text", headers=headers, json=payload, timeout=30
+        )
+        response.raise_for_status()
+        data = response.json()
+        _record_usage(data)
+        return data["content"][0]["text"]
     except Exception as e:
         print(f"⚠️ Claude call failed: {e}")
         return "I'm having trouble connecting right now, but don't forget to drink some water!"
@@ -41,69 +93,101 @@ async def get_hydration_nudge(intake: int, time_of_day: str, weather: str) -> st
     user_prompt = f"Current intake: {intake}ml. Time of day: {time_of_day}. Local weather: {weather}."
     return await call_claude(system_prompt, user_prompt)
 
-async def get_goal_prediction(history: List[Dict], forecast: str) -> Dict:
-    system_prompt = "Analyze hydration history and weather forecast to set a recommended daily goal. Return JSON: {\"goal\": int, \"reason\": \"string\"}"
-    user_prompt = f"History: {json.dumps(history)}. Forecast: {forecast}."
-
-    response_text = await call_claude(system_prompt, user_prompt)
+async def _phrase(lines: List[str]) -> Optional[List[str]]:
+    """
+    Optional LLM rewording of locally computed insights. None (keep the local
+    text) when phrasing is off, Claude is offline/slow, or the reply doesn't
+    come back as one bullet per input line.
+    """
+    if not (HYDRATION_LLM_PHRASING and ANTHROPIC_API_KEY):
+        return None
+    system_prompt = (
+        "You are a friendly hydration coach. Rephrase each fact below as one short, encouraging insight. "
+        "Keep every number unchanged. Reply with exactly one line per fact, each starting with '-'."
+    )
     try:
-        # Simple extraction if Claude adds preamble
-        import re
-        match = re.search(r"\{.*\}", response_text, re.DOTALL)
-        if match:
-            return json.loads(match.group())
-    except:
-        pass
+        response_text = await asyncio.wait_for(
+            call_claude(system_prompt, "\n".join(f"- {line}" for line in lines)),
+            timeout=HYDRATION_LLM_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        print("⚠️ Insight phrasing timed out, using local text")
+        return None
+    phrased = [s.strip().lstrip("-•* ").strip() for s in response_text.split("\n") if s.strip().startswith(("-", "•", "*"))]
+    return phrased if len(phrased) == len(lines) else None
 
-    return {"goal": 2500, "reason": "Standard recommended intake for your activity level."}
+async def get_goal_prediction(history: List[Dict], forecast: str) -> Dict:
+    # 📊 Goal comes from the local model; the LLM may only reword the reason
+    report = analyze_history(history, forecast)
+    reason = await _phrase([report.goal_reason])
+    return {"goal": report.goal, "reason": reason[0] if reason else report.goal_reason}
 
 async def get_hydration_insights(history: List[Dict]) -> List[str]:
-    system_prompt = "Generate 4 concise hydration insights: trend analysis, pattern detection, predicted tomorrow goal, weather adjustment."
-    user_prompt = f"History: {json.dumps(history)}."
-
-    response_text = await call_claude(system_prompt, user_prompt)
-    # Expecting a bulleted list or similar
-    insights = [s.strip() for s in response_text.split("\n") if s.strip() and (s.strip()[0].isdigit() or s.strip().startswith("-"))]
-    if len(insights) >= 4:
-        return insights[:4]
-
-    return [
-        "Your intake peaks in the morning but drops after 3 PM.",
-        "You tend to drink 20% more on days above 25°C.",
-        "Based on trends, aim for 2,800ml tomorrow.",
-        "Increasing water intake after workouts could improve recovery."
-    ]
+    # 📊 Trend, time-of-day pattern, tomorrow's goal, weather effect
+    insights = analyze_history(history).insights
+    return await _phrase(insights) or insights
 
 async def chat_with_coach(message: str, history: List[Dict], weather: str) -> str:
     system_prompt = "You are a hydration coach inside a nutrition tracking app. Be concise, warm, and data-driven. Answer questions about hydration, water intake, daily goals, and healthy habits only."
-    user_prompt = f"Context: Weather is {weather}. History: {json.dumps(history)}. User says: {message}"
+    user_prompt = history_prompt(history, f"Weather is {weather}. User says: {message}")
     return await call_claude(system_prompt, user_prompt)
 
 async def analyze_food_image(image_data: str) -> str:
     """
     Analyze food image using Claude 3.5 Sonnet's vision capabilities.
-    image_data: base64 encoded image string (without data:image/xxx;base64, prefix)
+    image_data: base64 encoded image string (a data:image/xxx;base64, prefix is optional)
+    """
+    try:
+        raw, declared_type = decode_image_data(image_data)
+    except InvalidImageError as e:
+        print(f"⚠️ Food image rejected: {e}")
+        return VISION_FALLBACK
+    return await analyze_food_image_file(io.BytesIO(raw), declared_type)
+
+
+async def analyze_food_image_file(f: BinaryIO, declared_type: Optional[str] = None) -> str:
+    """
+    Downscale + re-encode the photo (read from an open binary file), then answer
+    from the content-addressed cache or a single vision call.
     """
     if not ANTHROPIC_API_KEY:
         print("⚠️ ANTHROPIC_API_KEY missing, using fallback")
         return "I can't see the food right now, but I'm sure it's delicious!"
 
+    # 1️⃣ Byte-identical photo seen before: skip decoding entirely
+    digest = await asyncio.to_thread(file_sha256, f)
+    cached = vision_cache.get_exact(digest)
+    if cached is not None:
+        return cached
+
+    # 2️⃣ Decode / resize / re-encode off the event loop
+    try:
+        image = await asyncio.to_thread(prepare_image, f, declared_type, digest)
+    except InvalidImageError as e:
+        print(f"⚠️ Food image rejected: {e}")
+        return VISION_FALLBACK
+
+    # 3️⃣ Same or near-identical photo (re-compressed, resized) seen before
+    cached = vision_cache.get(image)
+    if cached is not None:
+        return cached
+
+    analysis = await _call_vision(image)
+    if analysis is None:
+        return VISION_FALLBACK
+    vision_cache.set(image, analysis)
+    return analysis
+
+
+async def _call_vision(image: PreparedImage) -> Optional[str]:
     system_prompt = "You are a nutrition expert. The user has taken a photo of food they are about to eat. Identify the food item(s) in the image accurately. Return: food name, estimated calories, protein (g), carbs (g), fats (g). If the image does not contain food, respond with: 'No food detected in this image.'"
 
-    url = "https://api.anthropic.com/v1/messages"
     headers = {
         "x-api-key": ANTHROPIC_API_KEY,
         "anthropic-version": "2023-06-01",
         "content-type": "application/json"
     }
 
-    # Check if we need to extract media type
-    media_type = "image/jpeg"
-    if "," in image_data:
-        header, image_data = image_data.split(",", 1)
-        if "png" in header: media_type = "image/png"
-        elif "webp" in header: media_type = "image/webp"
-
     payload = {
         "model": CLAUDE_MODEL,
         "max_tokens": 1024,
@@ -116,8 +200,8 @@ async def analyze_food_image(image_data: str) -> str:
                         "type": "image",
                         "source": {
                             "type": "base64",
-                            "media_type": media_type,
-                            "data": image_data,
+                            "media_type": image.media_type,
+                            "data": image.base64,
                         },
                     },
                     {
@@ -130,11 +214,13 @@ async def analyze_food_image(image_data: str) -> str:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=40) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            return data["content"][0]["text"]
+        response = await registry.request(
+            PROVIDER, "POST", "/v1/messages", latency_key="vision", headers=headers, json=payload, timeout=40
+        )
+        response.raise_for_status()
+        data = response.json()
+        _record_usage(data)
+        return data["content"][0]["text"]
     except Exception as e:
         print(f"⚠️ Claude vision call failed: {e}")
-        return "Sorry, I couldn't analyze the image. Please try again."
+        return None
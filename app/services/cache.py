@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import asyncio
+import importlib.util
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_AVAILABLE = importlib.util.find_spec("redis") is not None
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+
+class LRUCache:
+    """
+    In-process tier: bounded LRU of CacheEntry objects.
+    Expiry is checked on read; entries past their stale window are dropped.
+    """
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def get(self, key: str, now: float) -> Optional[CacheEntry]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if not entry.is_usable(now):
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def create_redis_client(url: Optional[str] = REDIS_URL):
+    """
+    Build an asyncio Redis client if REDIS_URL is set and redis-py is installed.
+    Returns None otherwise so callers fall back to the in-process tier only.
+    """
+    if not url or not REDIS_AVAILABLE:
+        return None
+    import redis.asyncio as redis_asyncio
+    return redis_asyncio.from_url(url)
+
+
+class TieredCache:
+    """
+    Two-tier read-through cache with stale-while-revalidate.
+
+    - Tier 1: in-process LRU (per worker)
+    - Tier 2: optional shared Redis (anything with async get/set(key, value, ex=...))
+
+    A fresh hit returns immediately. A stale hit returns the old value and
+    refreshes it in the background. A miss awaits the loader and fills both tiers.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        maxsize: int = 512,
+        ttl: float = 600,
+        stale_ttl: float = 3600,
+        redis=None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.redis = redis
+        self.clock = clock
+        self.local = LRUCache(maxsize)
+        self._refreshing: set = set()
+        self._tasks: set = set()
+        self.counters: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "local_hits": 0,
+            "redis_hits": 0,
+            "refreshes": 0,
+            "errors": 0,
+        }
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def _redis_get(self, key: str) -> Optional[CacheEntry]:
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(self._redis_key(key))
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"⚠️ Redis cache get failed: {e}")
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return CacheEntry(data["value"], data["fresh_until"], data["stale_until"])
+
+    async def _redis_set(self, key: str, entry: CacheEntry) -> None:
+        if self.redis is None:
+            return
+        payload = json.dumps({
+            "value": entry.value,
+            "fresh_until": entry.fresh_until,
+            "stale_until": entry.stale_until,
+        })
+        try:
+            await self.redis.set(self._redis_key(key), payload, ex=max(1, int(self.stale_ttl)))
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"⚠️ Redis cache set failed: {e}")
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        now = self.clock()
+        entry = self.local.get(key, now)
+        if entry is not None:
+            self.counters["local_hits"] += 1
+            return entry
+
+        entry = await self._redis_get(key)
+        if entry is not None and entry.is_usable(now):
+            self.counters["redis_hits"] += 1
+            self.local.set(key, entry)
+            return entry
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        now = self.clock()
+        entry = CacheEntry(value, now + self.ttl, now + self.ttl + self.stale_ttl)
+        self.local.set(key, entry)
+        await self._redis_set(key, entry)
+
+    async def _refresh(self, key: str, loader: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            value = await loader()
+            await self.set(key, value)
+            self.counters["refreshes"] += 1
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"⚠️ Background cache refresh failed: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Awaitable[Any]]) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, loader))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = await self.get(key)
+        if entry is not None:
+            if entry.is_fresh(self.clock()):
+                self.counters["hits"] += 1
+            else:
+                self.counters["stale_hits"] += 1
+                self._schedule_refresh(key, loader)
+            return entry.value
+
+        self.counters["misses"] += 1
+        value = await loader()
+        await self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"]
+        served = self.counters["hits"] + self.counters["stale_hits"]
+        return {
+            **self.counters,
+            "size": len(self.local),
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self.local.clear()
@@ -0,0 +1,164 @@
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Latency window for calls that don't name their operation
+DEFAULT_LATENCY_KEY = "default"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open (retry in {retry_in:.1f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class LatencyWindow:
+    """
+    Sliding window of recent successful call latencies (seconds).
+    """
+
+    def __init__(self, size: int = 200):
+        self._samples: deque = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    Per-dependency breaker with half-open probing and adaptive timeouts.
+
+    - closed: calls flow; `failure_threshold` consecutive failures open it
+    - open: calls fail fast (CircuitOpenError) for `recovery_time` seconds
+    - half_open: up to `half_open_probes` trial calls; one success closes, one failure reopens
+
+    The timeout handed to callers tracks the dependency's own latency:
+    p95 of recent successes x `timeout_multiplier`, clamped to
+    [min_timeout, the caller's ceiling]. Until enough samples exist the
+    ceiling is used as-is. Latency is tracked per operation (`latency_key`),
+    so a fast call type never sets the timeout for a slow one on the same
+    provider; failures still count towards one breaker per provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_time: float = 30.0,
+        half_open_probes: int = 1,
+        min_timeout: float = 1.0,
+        timeout_multiplier: float = 3.0,
+        min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.half_open_probes = half_open_probes
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self.clock = clock
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.latency: Dict[str, LatencyWindow] = {}
+        self.counters: Dict[str, int] = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    # ---------- STATE ----------
+
+    def _maybe_half_open(self) -> None:
+        if self.state == OPEN and self.clock() - self.opened_at >= self.recovery_time:
+            self.state = HALF_OPEN
+            self.probes_in_flight = 0
+
+    def available(self) -> bool:
+        """
+        Would a call be let through right now? (Does not reserve a probe.)
+        """
+        self._maybe_half_open()
+        if self.state == OPEN:
+            return False
+        if self.state == HALF_OPEN:
+            return self.probes_in_flight < self.half_open_probes
+        return True
+
+    def before_call(self) -> None:
+        """
+        Raise CircuitOpenError if the call must not go out; reserve a probe when half-open.
+        """
+        if not self.available():
+            self.counters["rejected"] += 1
+            retry_in = max(0.0, self.recovery_time - (self.clock() - self.opened_at))
+            raise CircuitOpenError(self.name, retry_in)
+        if self.state == HALF_OPEN:
+            self.probes_in_flight += 1
+
+    def release_probe(self) -> None:
+        """
+        A reserved call ended without telling us anything (e.g. it was cancelled).
+        """
+        if self.state == HALF_OPEN and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.probes_in_flight = 0
+        self.counters["opened"] += 1
+        print(f"⚠️ Circuit for {self.name} opened after {self.consecutive_failures} failures")
+
+    def record_success(self, latency: float, latency_key: str = DEFAULT_LATENCY_KEY) -> None:
+        self.counters["successes"] += 1
+        self.latency.setdefault(latency_key, LatencyWindow()).add(latency)
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self.probes_in_flight = 0
+
+    def record_failure(self) -> None:
+        self.counters["failures"] += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    # ---------- ADAPTIVE TIMEOUT ----------
+
+    def timeout(self, ceiling: float, latency_key: str = DEFAULT_LATENCY_KEY) -> float:
+        window = self.latency.get(latency_key)
+        if window is None or len(window) < self.min_samples:
+            return ceiling
+        p95 = window.percentile(0.95)
+        return max(self.min_timeout, min(ceiling, p95 * self.timeout_multiplier))
+
+    def snapshot(self) -> Dict:
+        self._maybe_half_open()
+        latency = {}
+        for key, window in self.latency.items():
+            p50, p95 = window.percentile(0.5), window.percentile(0.95)
+            latency[key] = {"p50_ms": round(p50 * 1000, 1), "p95_ms": round(p95 * 1000, 1), "samples": len(window)}
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "latency": latency,
+            **self.counters,
+        }
@@ -0,0 +1,268 @@
+import asyncio
+import importlib.util
+import random
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+from app.services.circuit_breaker import DEFAULT_LATENCY_KEY, CircuitBreaker, CircuitOpenError
+from app.services.metrics import UPSTREAM_ERRORS, UPSTREAM_REQUESTS, UPSTREAM_SECONDS
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Connection-level failures are always safe to retry: the request never reached the server
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError)
+
+
+@dataclass
+class ProviderConfig:
+    name: str
+    base_url: str = ""
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive: int = 10
+    keepalive_expiry: float = 30.0
+    retries: int = 1
+    backoff: float = 0.25
+    http2: bool = False
+    retry_statuses: Tuple[int, ...] = (429, 502, 503, 504)
+
+    # Circuit breaker + adaptive timeout
+    breaker_failures: int = 5
+    breaker_recovery: float = 30.0
+    min_timeout: float = 1.0
+    timeout_multiplier: float = 3.0
+
+
+@dataclass
+class PoolStats:
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+
+
+class ProviderClientRegistry:
+    """
+    One pooled httpx.AsyncClient per upstream provider.
+
+    Providers register their config at import time; the app lifespan opens
+    every client at startup and closes them at shutdown. Clients are still
+    created lazily on first use so scripts and tests work without a lifespan.
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, ProviderConfig] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, PoolStats] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def register(self, config: ProviderConfig) -> None:
+        self._configs[config.name] = config
+        self._stats.setdefault(config.name, PoolStats())
+        self._breakers[config.name] = CircuitBreaker(
+            config.name,
+            failure_threshold=config.breaker_failures,
+            recovery_time=config.breaker_recovery,
+            min_timeout=config.min_timeout,
+            timeout_multiplier=config.timeout_multiplier,
+        )
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        return self._breakers[name]
+
+    def available(self, name: str) -> bool:
+        """
+        False while the provider's breaker is open: callers should take their fallback path.
+        """
+        return self._breakers[name].available()
+
+    def _prepare(self, name: str, kwargs: Dict, latency_key: str) -> CircuitBreaker:
+        # Fail fast when open; otherwise shrink the timeout to what this operation actually needs
+        breaker = self._breakers[name]
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            UPSTREAM_ERRORS.inc(provider=name, kind="circuit_open")
+            raise
+        ceiling = kwargs.pop("timeout", None) or self._configs[name].timeout
+        kwargs["timeout"] = breaker.timeout(ceiling, latency_key)
+        return breaker
+
+    @staticmethod
+    def _is_failure(response: Optional[httpx.Response], error: Optional[BaseException]) -> Optional[bool]:
+        if error is not None:
+            return True if isinstance(error, httpx.TransportError) else None
+        return response.status_code >= 500 or response.status_code == 429
+
+    def _record(self, breaker: CircuitBreaker, latency_key: str, start: float, response=None, error=None) -> None:
+        elapsed = time.perf_counter() - start
+        name = breaker.name
+        failed = self._is_failure(response, error)
+        if failed is None:
+            breaker.release_probe()
+            return
+
+        if error is not None:
+            UPSTREAM_REQUESTS.inc(provider=name, status="error")
+            UPSTREAM_ERRORS.inc(provider=name, kind=type(error).__name__)
+        else:
+            UPSTREAM_REQUESTS.inc(provider=name, status=f"{response.status_code // 100}xx")
+            if failed:
+                UPSTREAM_ERRORS.inc(provider=name, kind=f"http_{response.status_code}")
+        UPSTREAM_SECONDS.observe(elapsed, provider=name, outcome="failure" if failed else "success")
+
+        if failed:
+            breaker.record_failure()
+        else:
+            breaker.record_success(elapsed, latency_key)
+
+    def config(self, name: str) -> ProviderConfig:
+        return self._configs[name]
+
+    def get_client(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            config = self._configs[name]
+            client = httpx.AsyncClient(
+                base_url=config.base_url,
+                http2=config.http2 and HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive,
+                    keepalive_expiry=config.keepalive_expiry,
+                ),
+            )
+            self._clients[name] = client
+        return client
+
+    async def open_all(self) -> None:
+        for name in self._configs:
+            self.get_client(name)
+
+    async def close_all(self) -> None:
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(c.aclose() for c in clients.values()), return_exceptions=True)
+
+    def _backoff(self, config: ProviderConfig, attempt: int) -> float:
+        # Full jitter: spreads retries from many workers instead of syncing them up
+        return random.uniform(0, config.backoff * (2 ** attempt))
+
+    async def request(
+        self, name: str, method: str, url: str, latency_key: str = DEFAULT_LATENCY_KEY, **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the provider's pool, retrying connection errors
+        and retryable status codes with jittered exponential backoff.
+        Read timeouts are not retried: the upstream already spent the time budget.
+        `latency_key` names the operation whose latencies set the adaptive timeout.
+        """
+        breaker = self._prepare(name, kwargs, latency_key)
+        start = time.perf_counter()
+        try:
+            response = await self._request_with_retries(name, method, url, **kwargs)
+        except BaseException as e:
+            self._record(breaker, latency_key, start, error=e)
+            raise
+        self._record(breaker, latency_key, start, response=response)
+        return response
+
+    async def _request_with_retries(self, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        config = self._configs[name]
+        stats = self._stats[name]
+        client = self.get_client(name)
+
+        attempt = 0
+        while True:
+            stats.in_flight += 1
+            stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+            stats.requests += 1
+            try:
+                response = await client.request(method, url, **kwargs)
+            except RETRYABLE_ERRORS:
+                if attempt >= config.retries:
+                    stats.errors += 1
+                    raise
+                response = None
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.in_flight -= 1
+
+            if response is not None:
+                if response.status_code not in config.retry_statuses or attempt >= config.retries:
+                    if response.status_code >= 400:
+                        stats.errors += 1
+                    return response
+                await response.aclose()
+
+            stats.retries += 1
+            await asyncio.sleep(self._backoff(config, attempt))
+            attempt += 1
+
+    @asynccontextmanager
+    async def stream(
+        self, name: str, method: str, url: str, latency_key: str = DEFAULT_LATENCY_KEY, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Streamed request through the provider's pool (no retries: the body is consumed live).
+        Leaving the block closes the response, which also tells the upstream to stop.
+        """
+        breaker = self._prepare(name, kwargs, latency_key)
+        stats = self._stats[name]
+        client = self.get_client(name)
+
+        start = time.perf_counter()
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        stats.requests += 1
+        response = None
+        try:
+            async with client.stream(method, url, **kwargs) as response:
+                yield response
+        except BaseException as e:
+            if isinstance(e, Exception):
+                stats.errors += 1
+            if response is not None and self._is_failure(response, None) and not isinstance(e, httpx.TransportError):
+                # The caller bailed on a 5xx/429 (raise_for_status): judge it by status, like request()
+                self._record(breaker, latency_key, start, response=response)
+            else:
+                self._record(breaker, latency_key, start, error=e)
+            raise
+        else:
+            self._record(breaker, latency_key, start, response=response)
+        finally:
+            stats.in_flight -= 1
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Pool usage per provider: live/peak in-flight requests against the pool size.
+        """
+        out: Dict[str, Dict] = {}
+        for name, config in self._configs.items():
+            s = self._stats[name]
+            out[name] = {
+                "in_flight": s.in_flight,
+                "peak_in_flight": s.peak_in_flight,
+                "max_connections": config.max_connections,
+                "utilization": round(s.in_flight / config.max_connections, 4),
+                "requests": s.requests,
+                "retries": s.retries,
+                "errors": s.errors,
+                "open": name in self._clients and not self._clients[name].is_closed,
+            }
+        return out
+
+    def breaker_states(self) -> Dict[str, Dict]:
+        return {name: b.snapshot() for name, b in self._breakers.items()}
+
+
+registry = ProviderClientRegistry()
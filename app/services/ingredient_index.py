@@ -0,0 +1,157 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.models import IngredientDB, recipe_ingredients
+
+
+def _normalize(name: str) -> str:
+    return name.strip().lower()
+
+
+def _iter_bits(bits: int):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class IngredientIndex:
+    """
+    In-memory inverted index: ingredient name -> bitset of recipe slots.
+
+    Recipe ids are mapped to dense slots so each posting list is a single
+    Python int; ALL / ANY queries are then one AND / OR per ingredient.
+    Built once from recipe_ingredients and topped up incrementally
+    (only rows for recipe ids above the last one indexed).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, int] = {}
+        self._slot_of: Dict[int, int] = {}
+        self._recipe_ids: List[int] = []
+        self._recipe_ingredients: List[frozenset] = []
+        self._by_size: Dict[int, int] = {}
+        self._max_recipe_id = 0
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._recipe_ids)
+
+    # ---------- BUILD / UPDATE ----------
+
+    def add(self, recipe_id: int, ingredients: Iterable[str]) -> None:
+        names = frozenset(_normalize(n) for n in ingredients if n and n.strip())
+        with self._lock:
+            slot = self._slot_of.get(recipe_id)
+            if slot is None:
+                slot = len(self._recipe_ids)
+                self._slot_of[recipe_id] = slot
+                self._recipe_ids.append(recipe_id)
+                self._recipe_ingredients.append(frozenset())
+
+            bit = 1 << slot
+            current = self._recipe_ingredients[slot]
+            self._by_size[len(current)] = self._by_size.get(len(current), 0) & ~bit
+            merged = current | names
+            self._recipe_ingredients[slot] = merged
+            self._by_size[len(merged)] = self._by_size.get(len(merged), 0) | bit
+            names = names - current
+
+            for name in names:
+                self._postings[name] = self._postings.get(name, 0) | bit
+            self._max_recipe_id = max(self._max_recipe_id, recipe_id)
+
+    def refresh_from_db(self, db: Session) -> int:
+        """
+        Index every recipe_ingredients row for recipes newer than the last indexed one.
+        Returns the number of links read.
+        """
+        rows = db.execute(
+            select(recipe_ingredients.c.recipe_id, IngredientDB.name)
+            .join(IngredientDB, IngredientDB.id == recipe_ingredients.c.ingredient_id)
+            .where(recipe_ingredients.c.recipe_id > self._max_recipe_id)
+            .order_by(recipe_ingredients.c.recipe_id)
+        ).all()
+
+        grouped: Dict[int, List[str]] = {}
+        for recipe_id, name in rows:
+            grouped.setdefault(recipe_id, []).append(name)
+        for recipe_id, names in grouped.items():
+            self.add(recipe_id, names)
+
+        self.built = True
+        return len(rows)
+
+    # ---------- QUERIES ----------
+
+    def _bits(self, names: Iterable[str]) -> List[int]:
+        return [self._postings.get(_normalize(n), 0) for n in names]
+
+    def _ids(self, bits: int) -> List[int]:
+        return [self._recipe_ids[slot] for slot in _iter_bits(bits)]
+
+    def all_of(self, names: List[str]) -> List[int]:
+        """
+        Recipes containing every given ingredient.
+        """
+        if not names:
+            return []
+        with self._lock:
+            bits = -1
+            for b in self._bits(names):
+                bits &= b
+                if not bits:
+                    return []
+            return self._ids(bits)
+
+    def any_of(self, names: List[str]) -> List[Tuple[int, int]]:
+        """
+        Recipes containing at least one ingredient, as (recipe_id, match_count), best first.
+        """
+        pantry = {_normalize(n) for n in names}
+        with self._lock:
+            bits = 0
+            for b in self._bits(pantry):
+                bits |= b
+            matches = [
+                (self._recipe_ids[slot], len(self._recipe_ingredients[slot] & pantry))
+                for slot in _iter_bits(bits)
+            ]
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+    def missing_at_most(self, names: List[str], max_missing: int) -> List[Tuple[int, List[str]]]:
+        """
+        Recipes the pantry can cook if you buy at most `max_missing` more ingredients,
+        as (recipe_id, missing_ingredients), fewest missing first.
+        """
+        pantry = {_normalize(n) for n in names}
+        with self._lock:
+            candidates = 0
+            for b in self._bits(pantry):
+                candidates |= b
+
+            # Tiny recipes can qualify without matching anything in the pantry
+            for size, bits in self._by_size.items():
+                if size <= max_missing:
+                    candidates |= bits
+
+            results = []
+            for slot in _iter_bits(candidates):
+                missing = self._recipe_ingredients[slot] - pantry
+                if len(missing) <= max_missing:
+                    results.append((self._recipe_ids[slot], sorted(missing)))
+
+        results.sort(key=lambda r: len(r[1]))
+        return results
+
+    def ingredients_of(self, recipe_id: int) -> Optional[frozenset]:
+        slot = self._slot_of.get(recipe_id)
+        return None if slot is None else self._recipe_ingredients[slot]
+
+
+ingredient_index = IngredientIndex()
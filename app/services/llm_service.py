@@ -1,23 +1,93 @@
-import httpx
+import os
 import json
 import re
+import hashlib
+from typing import Callable, Optional
 from app.schemas.intent import IntentSchema
-
-OLLAMA_URL = "http://localhost:11434/api/generate"
+from app.services.cache import TieredCache
+from app.services.http_clients import ProviderConfig, registry
+from app.services.metrics import FALLBACKS
+from app.services.singleflight import SingleFlight
+from app.services.tracing import trace
+from app.utils.intent_parser import extract_intent, normalize_query_text
+from app.utils.json_stream import JSONObjectScanner
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
 MODEL_NAME = "phi3"
 
+PROVIDER = "ollama"
+registry.register(ProviderConfig(
+    name=PROVIDER,
+    timeout=60,
+    max_connections=int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8")),
+    max_keepalive=int(os.getenv("OLLAMA_MAX_KEEPALIVE", "8")),
+    retries=1,
+))
+
+# Hard cap on generated tokens for structured (JSON) parses
+OLLAMA_NUM_PREDICT = int(os.getenv("OLLAMA_NUM_PREDICT", "256"))
+
+# Queries the lexicon parser is at least this sure about never reach the LLM
+INTENT_FAST_PATH_THRESHOLD = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", "0.75"))
+
+# LLM-parsed intents, keyed by normalized query text
+intent_cache = TieredCache(
+    namespace="llm:intent",
+    maxsize=int(os.getenv("INTENT_CACHE_MAXSIZE", "2048")),
+    ttl=float(os.getenv("INTENT_CACHE_TTL", "86400")),
+    stale_ttl=0,
+)
+
+# Identical queries arriving together share one Phi-3 call
+intent_flight = SingleFlight("llm:intent")
+
+
+async def generate_json(
+    prompt: str,
+    timeout: float = 60,
+    num_predict: int = OLLAMA_NUM_PREDICT,
+    validate_partial: Optional[Callable[[dict], None]] = None,
+    latency_key: str = "json",
+) -> dict:
+    """
+    Bounded structured generation:
+    - Ollama JSON mode + num_predict token cap
+    - tokens are streamed and scanned as they arrive
+    - the stream is closed (stopping generation) the moment the JSON object is complete
+    - validate_partial sees each completed top-level member and can abort early by raising
+    - latency_key keeps each prompt type's adaptive timeout separate
+    """
+    payload = {
+        "model": MODEL_NAME,
+        "prompt": prompt,
+        "stream": True,
+        "format": "json",
+        "options": {"num_predict": num_predict, "temperature": 0},
+    }
+    scanner = JSONObjectScanner(on_member=validate_partial)
+
+    async with registry.stream(PROVIDER, "POST", OLLAMA_URL, latency_key=latency_key, json=payload, timeout=timeout) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            complete = scanner.feed(chunk.get("response", ""))
+            if complete is not None:
+                return json.loads(complete)
+            if chunk.get("done"):
+                break
+
+    raise ValueError("Model stopped before completing a JSON object")
+
 
-def extract_json(text: str) -> dict:
-    match = re.search(r"\{[\s\S]*\}", text)
-    if not match:
-        raise ValueError("No JSON object found")
-    return json.loads(match.group())
+def _check_partial_intent(partial: dict) -> None:
+    # Types only: a bad field fails here instead of after the whole generation
+    IntentSchema.model_validate({"query": "", **partial})
 
 
 async def parse_recipe_intent(query: str) -> dict:
-    payload = {
-        "model": MODEL_NAME,
-        "prompt": f"""
+    prompt = f"""
 Extract ingredients and constraints from this recipe request.
 
 Return JSON ONLY in this format:
@@ -28,17 +98,10 @@ Return JSON ONLY in this format:
 
 Request:
 {query}
-""",
-        "stream": False,
-    }
+"""
 
     try:
-        async with httpx.AsyncClient(timeout=240) as client:
-            response = await client.post(OLLAMA_URL, json=payload)
-            response.raise_for_status()
-
-            raw = response.json()["response"]
-            return extract_json(raw)
+        return await generate_json(prompt, timeout=60, latency_key="recipe_intent")
 
     except Exception as e:
         print("⚠️ Ollama failed, using fallback:", e)
@@ -61,10 +124,9 @@ async def get_weird_fact(ingredient: str) -> str:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(OLLAMA_URL, json=payload)
-            response.raise_for_status()
-            return response.json()["response"].strip()
+        response = await registry.request(PROVIDER, "POST", OLLAMA_URL, latency_key="fact", json=payload, timeout=30)
+        response.raise_for_status()
+        return response.json()["response"].strip()
     except Exception as e:
         # Fallback to Jules' "Phi-3 brain" knowledge
         facts = {
@@ -86,12 +148,7 @@ async def get_weird_fact(ingredient: str) -> str:
 
         return f"Did you know that {ingredient} has a fascinating history in culinary arts and was once considered a luxury in certain ancient civilizations?"
 
-async def parse_user_intent(user_input: str) -> IntentSchema:
-    """
-    Parse messy user input into a structured IntentSchema using Phi-3.
-    Maps natural language to Spoonacular-supported enums.
-    """
-    system_prompt = """
+INTENT_SYSTEM_PROMPT = """
     You are a culinary AI assistant. Convert user recipe requests into structured JSON.
     Map natural language to these specific Spoonacular enums:
     - Diet: 'Gluten Free', 'Ketogenic', 'Vegetarian', 'Vegan', 'Pescetarian', 'Paleo', 'Primal', 'Whole30'.
@@ -117,56 +174,44 @@ async def parse_user_intent(user_input: str) -> IntentSchema:
     }
     """
 
-    payload = {
-        "model": MODEL_NAME,
-        "prompt": f"{system_prompt}\n\nUser Request: {user_input}\nJSON Response:",
-        "stream": False,
-    }
 
+def intent_cache_key(user_input: str) -> str:
+    return hashlib.sha1(normalize_query_text(user_input).encode()).hexdigest()
+
+
+async def _llm_parse_intent(user_input: str) -> dict:
+    """
+    Phi-3 round trip. Raises on any failure so bad parses are never cached.
+    """
+    data = await generate_json(
+        f"{INTENT_SYSTEM_PROMPT}\n\nUser Request: {user_input}\nJSON Response:",
+        timeout=60,
+        validate_partial=_check_partial_intent,
+        latency_key="intent",
+    )
+    return IntentSchema(**data).model_dump()
+
+
+async def parse_user_intent(user_input: str) -> IntentSchema:
+    """
+    Parse messy user input into a structured IntentSchema.
+    - Confident lexicon parse -> returned directly (no LLM)
+    - Otherwise Phi-3, memoized by normalized query text
+    - Lexicon parse is also the fallback when Phi-3 fails
+    """
+    fast_intent, confidence = extract_intent(user_input)
+    if confidence >= INTENT_FAST_PATH_THRESHOLD:
+        trace(f"Fast-path intent (confidence {confidence})")
+        return fast_intent
+
+    key = intent_cache_key(user_input)
     try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(OLLAMA_URL, json=payload)
-            response.raise_for_status()
-            raw = response.json()["response"]
-            data = extract_json(raw)
-            return IntentSchema(**data)
+        data = await intent_flight.do(
+            key,
+            lambda: intent_cache.get_or_load(key, lambda: _llm_parse_intent(user_input)),
+        )
+        return IntentSchema(**data)
     except Exception as e:
         print(f"⚠️ Ollama parse_user_intent failed, using fallback: {e}")
-        # Intelligent fallback
-        query = user_input.lower()
-        diet = None
-        if "vegan" in query: diet = "Vegan"
-        elif "vegetarian" in query: diet = "Vegetarian"
-        elif "keto" in query or "no carb" in query: diet = "Ketogenic"
-
-        intolerances = []
-        if "dairy free" in query or "no milk" in query: intolerances.append("Dairy")
-        if "gluten free" in query: intolerances.append("Gluten")
-
-        max_calories = None
-        if "low cal" in query: max_calories = 400
-
-        max_price = None
-        if "cheap" in query: max_price = 10.0
-
-        max_time_minutes = None
-        # Basic time extraction from common patterns like "under 20 mins"
-        time_match = re.search(r"under (\d+)", query)
-        if time_match:
-            max_time_minutes = int(time_match.group(1))
-
-        recipe_type = None
-        if "breakfast" in query: recipe_type = "breakfast"
-        elif "lunch" in query: recipe_type = "lunch"
-        elif "dinner" in query: recipe_type = "main course"
-
-        return IntentSchema(
-            query=user_input,
-            cuisine=None,
-            diet=diet,
-            intolerances=intolerances,
-            max_calories=max_calories,
-            max_price=max_price,
-            max_time_minutes=max_time_minutes,
-            recipe_type=recipe_type
-        )
+        FALLBACKS.inc(kind="intent_lexicon")
+        return fast_intent
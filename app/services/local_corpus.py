@@ -0,0 +1,168 @@
+import os
+import asyncio
+from typing import Dict, List
+
+from app.api.utils.recipe_mapper import recipe_db_to_record, recipe_db_to_schema
+from app.crud.recipe import bulk_create_recipes, get_recipes_by_ids, search_local_recipes
+from app.db.database import SessionLocal
+from app.schemas.intent import IntentSchema
+from app.services.ingredient_index import ingredient_index
+from app.utils.intent_parser import FILLER_WORDS
+from app.utils.recipe_record import RecipeLike, RecipeRecord
+
+LOCAL_CORPUS_ENABLED = os.getenv("LOCAL_CORPUS_ENABLED", "true").lower() == "true"
+
+# Go upstream unless the local corpus alone has at least this many matches
+LOCAL_CORPUS_MIN_RESULTS = int(os.getenv("LOCAL_CORPUS_MIN_RESULTS", "5"))
+
+# Intolerances we can check from Spoonacular's boolean flags (stored in `diets`/`dietary_tags`)
+LOCAL_INTOLERANCE_LABELS = {
+    "Dairy": "dairy free",
+    "Gluten": "gluten free",
+}
+
+# Intent diet -> labels Spoonacular uses for it in `diets`
+DIET_LABELS = {
+    "vegetarian": {"vegetarian", "lacto ovo vegetarian"},
+    "pescetarian": {"pescetarian", "pescatarian"},
+    "paleo": {"paleo", "paleolithic"},
+    "whole30": {"whole30", "whole 30"},
+}
+
+session_factory = SessionLocal
+
+
+def is_locally_answerable(intent: IntentSchema) -> bool:
+    """
+    The local corpus only stores labels for some constraints; anything else must go upstream.
+    """
+    return all(i in LOCAL_INTOLERANCE_LABELS for i in intent.intolerances or [])
+
+
+def _labels(recipe: RecipeLike) -> set:
+    return {label.lower() for label in (*recipe.get("diets", []), *recipe.get("dietary_tags", []))}
+
+
+def matches_intent(recipe: RecipeLike, intent: IntentSchema) -> bool:
+    labels = _labels(recipe)
+
+    if intent.diet:
+        wanted = DIET_LABELS.get(intent.diet.lower(), {intent.diet.lower()})
+        if not wanted & labels:
+            return False
+
+    for intolerance in intent.intolerances or []:
+        if LOCAL_INTOLERANCE_LABELS[intolerance] not in labels:
+            return False
+
+    if intent.cuisine and intent.cuisine.lower() not in {c.lower() for c in recipe.get("cuisines", [])}:
+        return False
+
+    if intent.recipe_type and intent.recipe_type.lower() not in {t.lower() for t in recipe.get("dish_types", [])}:
+        return False
+
+    price = recipe.get("price_per_serving")
+    if intent.max_price is not None and price is not None and price / 100 > intent.max_price:
+        return False
+
+    return True
+
+
+def _search_sync(intent: IntentSchema, limit: int) -> List[RecipeRecord]:
+    terms = [w for w in intent.query.lower().split() if w not in FILLER_WORDS]
+    db = session_factory()
+    try:
+        rows = search_local_recipes(
+            db,
+            terms=terms,
+            max_time=intent.max_time_minutes,
+            max_calories=intent.max_calories,
+        )
+        recipes = [recipe_db_to_record(r) for r in rows]
+    finally:
+        db.close()
+
+    return [r for r in recipes if matches_intent(r, intent)][:limit]
+
+
+async def search_local(intent: IntentSchema, limit: int = 15) -> List[RecipeRecord]:
+    """
+    RecipeRecords from the local corpus matching the intent.
+    Returns [] when disabled, when the intent can't be checked locally, or on DB errors.
+    """
+    if not LOCAL_CORPUS_ENABLED or not is_locally_answerable(intent):
+        return []
+
+    try:
+        return await asyncio.to_thread(_search_sync, intent, limit)
+    except Exception as e:
+        print(f"⚠️ Local corpus search failed: {e}")
+        return []
+
+
+def persist_recipes(recipes: List[RecipeLike]) -> int:
+    """
+    Write normalized Spoonacular recipes into the local corpus (skips ones already stored).
+    Blocking: run it as a background task, never on the request path.
+    """
+    if not LOCAL_CORPUS_ENABLED or not recipes:
+        return 0
+
+    db = session_factory()
+    try:
+        written = bulk_create_recipes(db, recipes)
+        if written and ingredient_index.built:
+            ingredient_index.refresh_from_db(db)
+        return written
+    except Exception as e:
+        print(f"⚠️ Local corpus write failed: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+def _pantry_search_sync(ingredients: List[str], mode: str, max_missing: int, limit: int) -> List[Dict]:
+    db = session_factory()
+    try:
+        # First call builds the index; later calls only pick up new recipes
+        ingredient_index.refresh_from_db(db)
+
+        pantry = sorted({i.strip().lower() for i in ingredients if i.strip()})
+        if mode == "all":
+            hits = [(rid, None) for rid in ingredient_index.all_of(pantry)]
+        elif mode == "any":
+            hits = [(rid, None) for rid, _ in ingredient_index.any_of(pantry)]
+        else:
+            hits = ingredient_index.missing_at_most(pantry, max_missing)
+
+        hits = hits[:limit]
+        rows = get_recipes_by_ids(db, [rid for rid, _ in hits])
+    finally:
+        db.close()
+
+    missing_by_id = dict(hits)
+    pantry_set = set(pantry)
+    recipes = []
+    for row in rows:
+        recipe = recipe_db_to_schema(row)
+        recipe["matched_ingredients"] = [i for i in recipe["ingredients"] if i in pantry_set]
+        missing = missing_by_id[row.id]
+        recipe["missing_ingredients"] = (
+            missing if missing is not None else [i for i in recipe["ingredients"] if i not in pantry_set]
+        )
+        recipes.append(recipe)
+    return recipes
+
+
+async def pantry_search(
+    ingredients: List[str],
+    mode: str = "missing",
+    max_missing: int = 0,
+    limit: int = 20,
+) -> List[Dict]:
+    """
+    Pantry-style search over the local corpus using the inverted ingredient index.
+    mode: "all" (has every ingredient), "any" (has at least one),
+          "missing" (can be cooked buying at most max_missing extras).
+    """
+    return await asyncio.to_thread(_pantry_search_sync, ingredients, mode, max_missing, limit)
@@ -0,0 +1,169 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional
+
+# Degradation levels, from cheapest to most expensive to keep serving
+FULL = "full"
+REDUCED = "reduced"
+LEAN = "lean"
+LOCAL_ONLY = "local_only"
+
+
+class QuotaExhaustedError(Exception):
+    """Raised instead of calling an upstream whose point budget can't cover the request."""
+
+
+@dataclass
+class QuotaPlan:
+    level: str
+    number: int
+    nutrition: bool
+
+    @property
+    def upstream(self) -> bool:
+        return self.level != LOCAL_ONLY
+
+
+class QuotaBudget:
+    """
+    Token bucket over an upstream's daily point quota.
+
+    The bucket holds `capacity` points and refills evenly over `period` seconds,
+    so spend is spread across the day instead of burning out by noon. Costs are
+    estimated before a call (admission control) and reconciled from the
+    provider's quota headers afterwards, which always win over our estimate.
+
+    As the bucket drains, `plan()` degrades requests:
+    full -> fewer results -> no nutrition -> local corpus only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: float,
+        period: float = 86400.0,
+        reduced_below: float = 0.5,
+        lean_below: float = 0.25,
+        local_only_below: float = 0.1,
+        reduced_results: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.capacity = capacity
+        self.refill_rate = capacity / period
+        self.reduced_below = reduced_below
+        self.lean_below = lean_below
+        self.local_only_below = local_only_below
+        self.reduced_results = reduced_results
+        self.clock = clock
+
+        self.tokens = capacity
+        self._updated = clock()
+        self.upstream_used: Optional[float] = None
+        self.upstream_left: Optional[float] = None
+        self.last_request_cost: Optional[float] = None
+        self.counters: Dict[str, float] = {"admitted": 0, "rejected": 0, "refunded": 0, "points_spent": 0.0}
+
+    # ---------- BUCKET ----------
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def remaining_fraction(self) -> float:
+        self._refill()
+        return self.tokens / self.capacity if self.capacity else 0.0
+
+    def level(self) -> str:
+        fraction = self.remaining_fraction()
+        if fraction < self.local_only_below:
+            return LOCAL_ONLY
+        if fraction < self.lean_below:
+            return LEAN
+        if fraction < self.reduced_below:
+            return REDUCED
+        return FULL
+
+    def plan(self, number: int) -> QuotaPlan:
+        """
+        How much of a search we can afford right now.
+        """
+        level = self.level()
+        if level == FULL:
+            return QuotaPlan(level, number, nutrition=True)
+        return QuotaPlan(level, min(number, self.reduced_results), nutrition=level == REDUCED)
+
+    def acquire(self, cost: float) -> None:
+        """
+        Reserve `cost` points for a call, or raise QuotaExhaustedError.
+        """
+        self._refill()
+        if self.tokens < cost:
+            self.counters["rejected"] += 1
+            raise QuotaExhaustedError(f"{self.name} point budget exhausted ({self.tokens:.2f} < {cost:.2f})")
+        self.tokens -= cost
+        self.counters["admitted"] += 1
+
+    def refund(self, cost: float) -> None:
+        """
+        Give back a reservation for a call that never reached the provider
+        (open breaker, timeout, transport error).
+        """
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + cost)
+        self.counters["refunded"] += 1
+
+    # ---------- RECONCILE ----------
+
+    def update_from_headers(self, headers: Mapping[str, str], estimated_cost: float = 0.0) -> None:
+        """
+        Reconcile with the provider's view of the quota
+        (X-API-Quota-Request / -Used / -Left on every Spoonacular response).
+        """
+        cost = _header_float(headers, "x-api-quota-request")
+        used = _header_float(headers, "x-api-quota-used")
+        left = _header_float(headers, "x-api-quota-left")
+
+        self._refill()
+        if cost is not None:
+            self.last_request_cost = cost
+            self.counters["points_spent"] += cost
+            # Settle the difference between what we reserved and what was billed
+            self.tokens = max(0.0, self.tokens - (cost - estimated_cost))
+        if used is not None:
+            self.upstream_used = used
+        if left is not None:
+            self.upstream_left = left
+            self.tokens = min(self.tokens, left)
+
+    def exhaust(self) -> None:
+        """
+        The provider says we're out (402): stop spending until the bucket refills.
+        """
+        self._refill()
+        self.tokens = 0.0
+        self.upstream_left = 0.0
+
+    def snapshot(self) -> Dict:
+        fraction = self.remaining_fraction()
+        return {
+            "level": self.level(),
+            "capacity": self.capacity,
+            "tokens": round(self.tokens, 3),
+            "used_ratio": round(1 - fraction, 4),
+            "upstream_used": self.upstream_used,
+            "upstream_left": self.upstream_left,
+            "last_request_cost": self.last_request_cost,
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.counters.items()},
+        }
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,106 @@
+import os
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.schemas.intent import IntentSchema
+from app.services.tracing import span, trace
+
+# How many strict/relaxed variants may be in flight at once
+RELAXATION_FANOUT = int(os.getenv("RELAXATION_FANOUT", "3"))
+
+# (intent field, search_recipes kwarg), in the order they get dropped
+RELAXATION_STEPS = [
+    ("max_time_minutes", "max_time"),
+    ("max_calories", "max_calories"),
+]
+
+SearchFn = Callable[..., Awaitable[List[Dict]]]
+
+
+def plan_relaxations(intent: IntentSchema) -> List[Tuple[List[str], Dict]]:
+    """
+    Strict query first, then one variant per relaxation step.
+    Relaxations are cumulative: the last variant drops every optional constraint.
+    """
+    params = {
+        "query": intent.query,
+        "diet": intent.diet,
+        "cuisine": intent.cuisine,
+        "intolerances": intent.intolerances,
+        "max_calories": intent.max_calories,
+        "max_price": intent.max_price,
+        "max_time": intent.max_time_minutes,
+        "recipe_type": intent.recipe_type,
+    }
+    plans: List[Tuple[List[str], Dict]] = [([], params)]
+
+    relaxed: List[str] = []
+    for field, kwarg in RELAXATION_STEPS:
+        if getattr(intent, field) is None:
+            continue
+        relaxed = relaxed + [field]
+        params = {**params, kwarg: None}
+        plans.append((relaxed, params))
+
+    return plans
+
+
+def _winner(results: List[Optional[List[Dict]]]) -> Optional[int]:
+    """
+    Index of the least-relaxed non-empty result, once every stricter variant has finished.
+    """
+    for i, result in enumerate(results):
+        if result is None:
+            return None
+        if result:
+            return i
+    return None
+
+
+async def _run_step(search_fn: SearchFn, params: Dict, number: int, step: int) -> List[Dict]:
+    with span(f"relaxation_step_{step}"):
+        return await search_fn(**params, number=number)
+
+
+async def search_with_relaxation(
+    search_fn: SearchFn,
+    intent: IntentSchema,
+    number: int = 15,
+    fanout: int = RELAXATION_FANOUT,
+) -> Tuple[List[Dict], List[str]]:
+    """
+    Run the strict search and its relaxed variants concurrently (at most `fanout` at a time).
+    Returns (results, relaxation_applied) for the least-relaxed variant that found anything;
+    looser variants still in flight are cancelled as soon as a stricter one wins.
+    """
+    plans = plan_relaxations(intent)
+    results: List[Optional[List[Dict]]] = [None] * len(plans)
+    pending: Dict[asyncio.Task, int] = {}
+    next_index = 0
+
+    try:
+        while True:
+            while next_index < len(plans) and len(pending) < max(1, fanout):
+                _, params = plans[next_index]
+                task = asyncio.create_task(_run_step(search_fn, params, number, next_index))
+                pending[task] = next_index
+                next_index += 1
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = pending.pop(task)
+                results[index] = task.result() or []
+
+            winner = _winner(results)
+            if winner is not None:
+                relaxed, _ = plans[winner]
+                if relaxed:
+                    trace(f"Relaxed search succeeded (removed: {relaxed})")
+                return results[winner], relaxed
+
+            if not pending and next_index >= len(plans):
+                relaxed, _ = plans[-1]
+                return [], relaxed
+    finally:
+        for task in pending:
+            task.cancel()
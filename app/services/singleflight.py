@@ -0,0 +1,53 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical work: the first caller for a key starts
+    the coroutine, everyone else arriving while it runs awaits the same task.
+
+    - results and exceptions are delivered to every waiter
+    - a waiter that disconnects (is cancelled) just stops waiting; the shared
+      work is cancelled only when the last waiter is gone
+    - nothing is kept once the task finishes (this is not a cache)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+        self.counters: Dict[str, int] = {"leaders": 0, "followers": 0, "cancelled": 0}
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _, c=call: self._forget(key, c))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["followers"] += 1
+
+        call.waiters += 1
+        try:
+            # shield: one waiter being cancelled must not cancel the shared task
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
+                self.counters["cancelled"] += 1
+
+    def in_flight(self) -> int:
+        return len(self._calls)
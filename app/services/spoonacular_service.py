@@ -1,15 +1,119 @@
 import os
-import requests
+import asyncio
 import sqlite3
 import random
+import json
+import hashlib
 from typing import List, Dict, Optional
 
+from app.services.cache import TieredCache, create_redis_client
+from app.services.http_clients import ProviderConfig, registry
+from app.services.metrics import FALLBACKS
+from app.services.quota import FULL, QuotaBudget
+from app.services.singleflight import SingleFlight
+from app.services.tracing import trace
+
 SPOONACULAR_API_KEY = os.getenv("SPOONACULAR_API_KEY")
 
-BASE_SEARCH_URL = "https://api.spoonacular.com/recipes/complexSearch"
+BASE_URL = "https://api.spoonacular.com"
+BASE_SEARCH_URL = f"{BASE_URL}/recipes/complexSearch"
+
+PROVIDER = "spoonacular"
+registry.register(ProviderConfig(
+    name=PROVIDER,
+    base_url=BASE_URL,
+    timeout=float(os.getenv("SPOONACULAR_TIMEOUT", "10")),
+    max_connections=int(os.getenv("SPOONACULAR_MAX_CONNECTIONS", "100")),
+    max_keepalive=int(os.getenv("SPOONACULAR_MAX_KEEPALIVE", "20")),
+    http2=True,
+    retries=1,
+))
+
+# complexSearch result cache (in-process LRU + optional shared Redis)
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "600"))
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", "3600"))
+SEARCH_CACHE_MAXSIZE = int(os.getenv("SEARCH_CACHE_MAXSIZE", "512"))
+
+search_cache = TieredCache(
+    namespace="spoonacular:complexSearch",
+    maxsize=SEARCH_CACHE_MAXSIZE,
+    ttl=SEARCH_CACHE_TTL,
+    stale_ttl=SEARCH_CACHE_STALE_TTL,
+    redis=create_redis_client(),
+)
+
+# Concurrent identical searches (same canonical intent) share one upstream call
+search_flight = SingleFlight("spoonacular:complexSearch")
+
+
+# Daily point budget (free tier: 150). complexSearch costs 1 point + a fraction per result
+# for every add* / fill* flag, so `number` and nutrition are what we trim when it runs low.
+SPOONACULAR_DAILY_POINTS = float(os.getenv("SPOONACULAR_DAILY_POINTS", "150"))
+SEARCH_BASE_POINTS = 1.0
+SEARCH_POINTS_PER_RESULT = 0.01
+SEARCH_POINTS_PER_FLAG = 0.025
+
+quota = QuotaBudget(
+    PROVIDER,
+    capacity=SPOONACULAR_DAILY_POINTS,
+    reduced_results=int(os.getenv("SPOONACULAR_REDUCED_RESULTS", "8")),
+)
+
+
+def estimate_search_cost(params: Dict) -> float:
+    """
+    Points a complexSearch call should cost, from its result count and add* / fill* flags.
+    """
+    number = params.get("number", 10)
+    flags = sum(1 for k in ("addRecipeInformation", "addRecipeNutrition", "fillIngredients") if params.get(k))
+    return SEARCH_BASE_POINTS + number * (SEARCH_POINTS_PER_RESULT + flags * SEARCH_POINTS_PER_FLAG)
+
+
+def upstream_available() -> bool:
+    """
+    Worth calling Spoonacular at all: circuit not open and point budget not in local-only mode.
+    """
+    return registry.available(PROVIDER) and quota.plan(1).upstream
+
+
+async def close_cache() -> None:
+    if search_cache.redis is not None:
+        await search_cache.redis.aclose()
+
+
+def search_cache_key(
+    query: str,
+    diet: Optional[str] = None,
+    cuisine: Optional[str] = None,
+    intolerances: Optional[List[str]] = None,
+    max_calories: Optional[int] = None,
+    max_price: Optional[float] = None,
+    max_time: Optional[int] = None,
+    recipe_type: Optional[str] = None,
+    number: int = 10,
+    nutrition: bool = True,
+) -> str:
+    """
+    Canonical cache key for a complexSearch call.
+    Case, whitespace and intolerance order don't change the upstream answer, so they don't change the key.
+    """
+    canonical = {
+        "query": " ".join(query.lower().split()),
+        "diet": diet.lower() if diet else None,
+        "cuisine": cuisine.lower() if cuisine else None,
+        "intolerances": sorted({i.strip().lower() for i in intolerances or [] if i.strip()}),
+        "max_calories": max_calories,
+        "max_price": max_price,
+        "max_time": max_time,
+        "type": recipe_type.lower() if recipe_type else None,
+        "number": number,
+        "nutrition": nutrition,
+    }
+    raw = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode()).hexdigest()
 
 
-def search_recipes(
+async def search_recipes(
     query: str,
     diet: Optional[str] = None,
     cuisine: Optional[str] = None,
@@ -29,16 +133,29 @@ def search_recipes(
         print("⚠️ Spoonacular API key missing")
         return []
 
+    # Admission control: shrink the request as the point budget drains
+    plan = quota.plan(number)
+    if not plan.upstream:
+        FALLBACKS.inc(kind="quota_local_only")
+        trace(f"Spoonacular budget low ({quota.remaining_fraction():.0%} left), local only")
+        return []
+    if plan.level != FULL:
+        FALLBACKS.inc(kind=f"quota_{plan.level}")
+        trace(f"Spoonacular budget {plan.level}: number={plan.number}, nutrition={plan.nutrition}")
+
     params = {
         "apiKey": SPOONACULAR_API_KEY,
-        "query": query,
         "addRecipeInformation": True,        # ingredients, instructions, time
-        "addRecipeNutrition": True,
+        "addRecipeNutrition": plan.nutrition,
         "fillIngredients": True,
-        "number": number,
+        "number": plan.number,
         "sort": "popularity",                # good default for busy pros
     }
 
+    # Constraint-only intents carry no query text: filters alone drive the search
+    if query:
+        params["query"] = query
+
     if diet:
         params["diet"] = diet
 
@@ -60,27 +177,50 @@ def search_recipes(
     if recipe_type:
         params["type"] = recipe_type
 
-    print(f"--- [SEARCH TRACE] Spoonacular Params: {params} ---")
+    key = search_cache_key(
+        query, diet, cuisine, intolerances, max_calories, max_price, max_time, recipe_type,
+        plan.number, plan.nutrition,
+    )
 
     try:
-        response = requests.get(
-            BASE_SEARCH_URL,
-            params=params,
-            timeout=10,
+        return await search_flight.do(
+            key,
+            lambda: search_cache.get_or_load(key, lambda: _fetch_complex_search(params)),
         )
-        print(f"--- [SEARCH TRACE] Spoonacular Status: {response.status_code} ---")
-        if response.status_code != 200:
-            print(f"--- [SEARCH TRACE] Spoonacular Error Body: {response.text} ---")
-
-        response.raise_for_status()
-        data = response.json()
-        results = data.get("results", [])
-        print(f"--- [SEARCH TRACE] Total Results from Spoonacular: {len(results)} ---")
-        return results
     except Exception as e:
         print(f"⚠️ Spoonacular search failed: {e}")
+        FALLBACKS.inc(kind="spoonacular_empty")
         return []
 
+
+async def _fetch_complex_search(params: Dict) -> List[Dict]:
+    """
+    Raw complexSearch call. Raises on failure so errors never get cached.
+    Only cache misses get here, so only real upstream calls spend points.
+    """
+    trace(f"Spoonacular Params: {params}")
+
+    cost = estimate_search_cost(params)
+    quota.acquire(cost)
+    try:
+        response = await registry.request(PROVIDER, "GET", "/recipes/complexSearch", latency_key="search", params=params)
+    except Exception:
+        # Nothing was billed upstream
+        quota.refund(cost)
+        raise
+    trace(f"Spoonacular Status: {response.status_code}")
+    quota.update_from_headers(response.headers, estimated_cost=cost)
+    if response.status_code == 402:
+        quota.exhaust()
+    if response.status_code != 200:
+        trace(f"Spoonacular Error Body: {response.text}")
+
+    response.raise_for_status()
+    data = response.json()
+    results = data.get("results", [])
+    trace(f"Total Results from Spoonacular: {len(results)}")
+    return results
+
 def dedupe_spoonacular_results(results: list[dict]) -> list[dict]:
     seen = set()
     unique = []
@@ -97,15 +237,33 @@ def dedupe_spoonacular_results(results: list[dict]) -> list[dict]:
 
     return unique
 
-def get_random_ingredient() -> str:
+
+def _random_local_ingredient() -> Optional[str]:
+    conn = sqlite3.connect("./recipes.db")
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM ingredients ORDER BY RANDOM() LIMIT 1;")
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+async def get_random_ingredient() -> str:
     """
     Fetch a random ingredient from Spoonacular or fallback to local DB.
     """
     if SPOONACULAR_API_KEY:
         try:
-            url = "https://api.spoonacular.com/recipes/random"
             params = {"apiKey": SPOONACULAR_API_KEY, "number": 1}
-            response = requests.get(url, params=params, timeout=10)
+            cost = SEARCH_BASE_POINTS + SEARCH_POINTS_PER_RESULT
+            quota.acquire(cost)
+            try:
+                response = await registry.request(PROVIDER, "GET", "/recipes/random", latency_key="random", params=params)
+            except Exception:
+                quota.refund(cost)
+                raise
+            quota.update_from_headers(response.headers, estimated_cost=cost)
             response.raise_for_status()
             data = response.json()
             recipes = data.get("recipes", [])
@@ -118,15 +276,11 @@ def get_random_ingredient() -> str:
         except Exception as e:
             print(f"Spoonacular random failed: {e}")
 
-    # Fallback to local database
+    # Fallback to local database (sqlite3 is blocking, keep it off the event loop)
     try:
-        conn = sqlite3.connect("./recipes.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM ingredients ORDER BY RANDOM() LIMIT 1;")
-        row = cursor.fetchone()
-        conn.close()
-        if row:
-            return row[0]
+        name = await asyncio.to_thread(_random_local_ingredient)
+        if name:
+            return name
     except Exception as e:
         print(f"Local DB fallback failed: {e}")
 
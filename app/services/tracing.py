@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from app.services.metrics import STAGE_SECONDS
+
+# Fraction of searches whose trace is written out (timings are always recorded as metrics)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("quickbite_trace", default=None)
+
+# Trace lines go through a queue drained by a background thread: the request path never writes to stdout
+_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_logger = logging.getLogger("quickbite.trace")
+_logger.propagate = False
+_logger.setLevel(logging.INFO)
+_logger.addHandler(logging.handlers.QueueHandler(_queue))
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def start_writer() -> None:
+    global _listener
+    if _listener is None:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _listener = logging.handlers.QueueListener(_queue, handler)
+        _listener.start()
+
+
+def stop_writer() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class Trace:
+    """
+    Events and spans of one sampled search, written as a single block when it finishes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.id = uuid.uuid4().hex[:8]
+        self.start = time.perf_counter()
+        self.events: List[Tuple[float, str]] = []
+
+    def add(self, message: str) -> None:
+        self.events.append((time.perf_counter() - self.start, message))
+
+    def render(self) -> str:
+        total = (time.perf_counter() - self.start) * 1000
+        lines = [f"--- [SEARCH TRACE] {self.name} id={self.id} total={total:.1f}ms ---"]
+        lines.extend(f"  +{offset * 1000:8.1f}ms  {message}" for offset, message in self.events)
+        return "\n".join(lines)
+
+
+def start_trace(name: str, sample_rate: Optional[float] = None) -> Optional[Trace]:
+    """
+    Begin a (possibly sampled-out) trace for the current task and the tasks it spawns.
+    """
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    current = Trace(name) if random.random() < rate else None
+    _current.set(current)
+    return current
+
+
+def finish_trace() -> None:
+    current = _current.get()
+    if current is None:
+        return
+    _current.set(None)
+    start_writer()
+    _logger.info(current.render())
+
+
+def trace(message: str) -> None:
+    """
+    Add an event to the current trace. A no-op when the search isn't sampled.
+    """
+    current = _current.get()
+    if current is not None:
+        current.add(message)
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Time a pipeline stage into quickbite_stage_seconds (and the trace, if sampled).
+    Cancelled work (e.g. a losing relaxation variant) is not recorded.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except asyncio.CancelledError:
+        raise
+    except BaseException:
+        _record_span(stage, start, " (failed)")
+        raise
+    else:
+        _record_span(stage, start)
+
+
+def _record_span(stage: str, start: float, note: str = "") -> None:
+    elapsed = time.perf_counter() - start
+    STAGE_SECONDS.observe(elapsed, stage=stage)
+    current = _current.get()
+    if current is not None:
+        current.add(f"[{stage}] {elapsed * 1000:.1f}ms{note}")
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from app.services.metrics import metrics
+from app.utils.image_processing import PreparedImage, hamming
+
+VISION_CACHE_TTL = float(os.getenv("VISION_CACHE_TTL", str(7 * 24 * 3600)))
+VISION_CACHE_MAXSIZE = int(os.getenv("VISION_CACHE_MAXSIZE", "1024"))
+# Max differing bits (of 64) for two photos to count as the same meal
+VISION_PHASH_DISTANCE = int(os.getenv("VISION_PHASH_DISTANCE", "6"))
+
+VISION_CACHE_LOOKUPS = metrics.counter(
+    "quickbite_vision_cache_lookups_total",
+    "Food photo analyses served from cache, by match kind",
+    ["result"],
+)
+
+
+class VisionCache:
+    """
+    Food photo analyses keyed by content.
+
+    Exact hits go by SHA-256 of the uploaded bytes, so a repeat upload is
+    answered before it is even decoded. Near-duplicates (re-compressed, resized,
+    re-shared copies) match on perceptual hash within VISION_PHASH_DISTANCE bits;
+    that's a linear popcount scan, which for a cache of this size costs
+    microseconds next to a multi-second vision call.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = VISION_CACHE_MAXSIZE,
+        ttl: float = VISION_CACHE_TTL,
+        max_distance: int = VISION_PHASH_DISTANCE,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.clock = clock
+        self._lock = threading.Lock()
+        # entry id -> (expires_at, phash, analysis)
+        self._entries: "OrderedDict[int, Tuple[float, Optional[int], str]]" = OrderedDict()
+        self._by_digest: dict = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _live(self, entry_id: int, now: float) -> Optional[str]:
+        entry = self._entries.get(entry_id)
+        if entry is None or entry[0] <= now:
+            return None
+        self._entries.move_to_end(entry_id)
+        return entry[2]
+
+    def get_exact(self, digest: str) -> Optional[str]:
+        with self._lock:
+            entry_id = self._by_digest.get(digest)
+            result = None if entry_id is None else self._live(entry_id, self.clock())
+        if result is not None:
+            VISION_CACHE_LOOKUPS.inc(result="exact")
+        return result
+
+    def get(self, image: PreparedImage) -> Optional[str]:
+        """
+        Exact match on either digest, else the closest perceptual match.
+        """
+        result = self.get_exact(image.sha256)
+        if result is not None or image.phash is None:
+            if result is None:
+                VISION_CACHE_LOOKUPS.inc(result="miss")
+            return result
+
+        now = self.clock()
+        with self._lock:
+            best_id, best_distance = None, self.max_distance + 1
+            for entry_id, (expires_at, phash, _) in self._entries.items():
+                if phash is None or expires_at <= now:
+                    continue
+                distance = hamming(phash, image.phash)
+                if distance < best_distance:
+                    best_id, best_distance = entry_id, distance
+            result = None if best_id is None else self._live(best_id, now)
+
+        VISION_CACHE_LOOKUPS.inc(result="similar" if result is not None else "miss")
+        return result
+
+    def set(self, image: PreparedImage, analysis: str) -> None:
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (self.clock() + self.ttl, image.phash, analysis)
+            self._by_digest[image.sha256] = entry_id
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            if len(self._by_digest) > 2 * self.maxsize:
+                self._by_digest = {d: i for d, i in self._by_digest.items() if i in self._entries}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_digest.clear()
+
+
+vision_cache = VisionCache()
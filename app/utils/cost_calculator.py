@@ -1,4 +1,14 @@
-# Average prices in KES (VERY rough, adjustable)
+import csv
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app.utils.ingredient_vocab import stem
+
+# Average prices in KES (VERY rough, adjustable); used when the catalog file can't be read
 INGREDIENT_COSTS = {
     "chicken": 400,
     "rice": 200,
@@ -14,16 +24,201 @@ INGREDIENT_COSTS = {
 
 DEFAULT_COST = 50  # fallback per ingredient
 
+# CSV: name, aliases (";"-separated), category, then one KES column per region
+PRICE_CATALOG_PATH = os.getenv(
+    "PRICE_CATALOG_PATH",
+    str(Path(__file__).resolve().parent.parent / "data" / "ingredient_prices.csv"),
+)
+PRICE_REGION = os.getenv("PRICE_REGION", "nairobi").lower()
+# Seconds between mtime checks; an edited catalog is picked up without a restart
+PRICE_CATALOG_RELOAD_INTERVAL = float(os.getenv("PRICE_CATALOG_RELOAD_INTERVAL", "30"))
+# Bound on cached ingredient -> price resolutions; cleared wholesale when exceeded
+PRICE_CACHE_SIZE = 50_000
+
+_END = ""  # trie key holding the price of the phrase ending at this node
+
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def catalog_tokens(text: str) -> List[str]:
+    return [stem(w) for w in _WORD.findall(text.lower())]
+
+
+class CompiledCatalog:
+    """
+    Token trie over the catalog's normalized names and aliases.
+
+    Names are lowercased and plural-stemmed like the ingredient vocabulary, but
+    preparation words are kept: "whole chicken", "whole wheat flour" and
+    "crushed tomato" are rows of their own. An ingredient string is scanned once,
+    taking the longest catalog phrase at each position and skipping words no
+    phrase starts with: "boneless chicken thighs" -> chicken thigh,
+    "salt and pepper" -> salt + pepper.
+    Resolutions are cached per raw string for the lifetime of this compilation.
+    """
+
+    def __init__(self, prices: Dict[str, int]):
+        self.root: Dict = {}
+        self.size = 0
+        for phrase, price in prices.items():
+            tokens = catalog_tokens(phrase)
+            if not tokens:
+                continue
+            node = self.root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            # First definition wins, so an alias can't override a listed item
+            if _END not in node:
+                node[_END] = price
+                self.size += 1
+            elif node[_END] != price:
+                print(f"⚠️ Price catalog: '{phrase}' collides with an earlier entry, keeping KES {node[_END]}")
+        self.cache: Dict[str, int] = {}
+
+    def resolve(self, name: str) -> int:
+        price = self.cache.get(name)
+        if price is not None:
+            return price
+
+        tokens = catalog_tokens(name)
+        total, found, i = 0, False, 0
+        while i < len(tokens):
+            node, match, end = self.root, None, i
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    match, end = node[_END], j + 1
+            if match is None:
+                i += 1
+            else:
+                total += match
+                found = True
+                i = end
+
+        price = total if found else DEFAULT_COST
+        if len(self.cache) >= PRICE_CACHE_SIZE:
+            self.cache.clear()
+        self.cache[name] = price
+        return price
+
+
+def load_price_table(path: str, region: str) -> Dict[str, int]:
+    """
+    name/alias -> KES price for `region`, falling back to the first region column
+    when the region is missing or its cell is empty.
+    """
+    prices: Dict[str, int] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        regions = [c for c in reader.fieldnames or [] if c not in ("name", "aliases", "category")]
+        if not regions:
+            raise ValueError(f"no region price columns in {path}")
+        column = region if region in regions else regions[0]
+
+        for row in reader:
+            raw = (row.get(column) or "").strip() or (row.get(regions[0]) or "").strip()
+            name = (row.get("name") or "").strip().lower()
+            if not name or not raw:
+                continue
+            price = int(float(raw))
+            prices.setdefault(name, price)
+            for alias in (row.get("aliases") or "").split(";"):
+                alias = alias.strip().lower()
+                if alias:
+                    prices.setdefault(alias, price)
+    return prices
+
+
+class PriceCatalog:
+    """
+    Regional ingredient prices, compiled into a token trie and hot-reloaded
+    when the catalog file changes.
+
+    Readers grab the current CompiledCatalog once per call; a reload builds a
+    new one and swaps the reference, so in-flight batches finish on the old prices.
+    """
+
+    def __init__(
+        self,
+        path: str = PRICE_CATALOG_PATH,
+        region: str = PRICE_REGION,
+        reload_interval: float = PRICE_CATALOG_RELOAD_INTERVAL,
+    ):
+        self.path = path
+        self.region = region
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._compiled: Optional[CompiledCatalog] = None
+        self._mtime: Optional[int] = None
+        self._checked = 0.0
+
+    def _stat(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self) -> CompiledCatalog:
+        """
+        (Re)compile from the catalog file; on failure keep serving the previous
+        compilation, or the built-in INGREDIENT_COSTS if there is none.
+        """
+        with self._lock:
+            mtime = self._stat()
+            try:
+                compiled = CompiledCatalog(load_price_table(self.path, self.region))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Price catalog {self.path} not loaded: {e}")
+                compiled = self._compiled or CompiledCatalog(INGREDIENT_COSTS)
+            self._compiled = compiled
+            self._mtime = mtime
+            self._checked = time.monotonic()
+            return compiled
+
+    def compiled(self) -> CompiledCatalog:
+        compiled = self._compiled
+        if compiled is None:
+            return self.reload()
+        now = time.monotonic()
+        if now - self._checked >= self.reload_interval:
+            self._checked = now
+            if self._stat() != self._mtime:
+                return self.reload()
+        return compiled
+
+    def price_of(self, name: str) -> int:
+        return self.compiled().resolve(name)
+
+    def estimate(self, ingredients: Iterable[str]) -> int:
+        resolve = self.compiled().resolve
+        return sum(resolve(name) for name in ingredients)
+
+    def estimate_batch(self, batch: Iterable[Iterable[str]]) -> List[int]:
+        """
+        Price every ingredient list of a result batch against one compiled catalog;
+        each distinct ingredient string is matched at most once.
+        """
+        resolve = self.compiled().resolve
+        return [sum(resolve(name) for name in ingredients) for ingredients in batch]
+
+
+price_catalog = PriceCatalog()
+
 
 def estimate_recipe_cost(ingredients: list[str]) -> int:
     """
     Estimate total recipe cost in KES.
     """
 
-    total = 0
+    return price_catalog.estimate(ingredients)
+
 
-    for ingredient in ingredients:
-        key = ingredient.lower()
-        total += INGREDIENT_COSTS.get(key, DEFAULT_COST)
+def estimate_batch_costs(batch: list[list[str]]) -> list[int]:
+    """
+    estimate_recipe_cost for every recipe of a batch in one pass.
+    """
 
-    return total
+    return price_catalog.estimate_batch(batch)
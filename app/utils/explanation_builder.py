@@ -1,10 +1,13 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from app.utils.ingredient_vocab import QueryMatch, ingredient_vocab
 
 
 def build_explanations(
     recipe: Dict,
     query_ingredients: List[str],
     persona: str,
+    query: Optional[QueryMatch] = None,
 ) -> List[str]:
     reasons: List[str] = []
 
@@ -17,12 +20,14 @@ def build_explanations(
             reasons.append(f"Quick to prepare ({time} minutes)")
 
     # --- INGREDIENT MATCH ---
-    ingredients = set(recipe.get("ingredients", []))
-    matched = ingredients & set(q.lower() for q in query_ingredients)
+    # Rankers pass the query they already resolved
+    if query is None:
+        query = ingredient_vocab.query(query_ingredients)
+    matched = query.matched(ingredient_vocab.recipe_ids(recipe.get("ingredients", [])))
 
     if matched:
         reasons.append(
-            f"Uses {len(matched)} of your ingredients"
+            f"Uses {matched} of your ingredients"
         )
 
     # --- PROTEIN ---
@@ -0,0 +1,199 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.utils.hydration_history import parse_history
+
+DEFAULT_GOAL = 2500
+MIN_GOAL, MAX_GOAL = 1500, 4500
+# Days of data the trend and baseline look at
+TREND_DAYS = 14
+# Weight of the newest day in the exponentially weighted baseline
+BASELINE_ALPHA = 0.3
+# Used when the history can't support a per-user temperature model
+DEFAULT_HEAT_ML_PER_C = 40.0
+HOT_DAY_C = 25.0
+
+_TEMP = re.compile(r"(-?\d+(?:\.\d+)?)\s*°?\s*C\b", re.IGNORECASE)
+
+
+def _block(block: int) -> str:
+    return f"{block * 3:02d}-{block * 3 + 3:02d}h"
+
+
+def _round_goal(value: float) -> int:
+    return int(min(MAX_GOAL, max(MIN_GOAL, round(value / 50) * 50)))
+
+
+def forecast_temperature(forecast: Optional[str]) -> Optional[float]:
+    if not forecast:
+        return None
+    match = _TEMP.search(forecast)
+    if not match:
+        return None
+    value = float(match.group(1))
+    # A digit run too long for a float would overflow the goal rounding
+    return value if math.isfinite(value) else None
+
+
+@dataclass
+class HydrationReport:
+    """
+    Statistics behind the hydration insights and goal prediction.
+    """
+
+    entries: int = 0
+    days: int = 0
+    latest_total: float = 0.0
+    daily_mean: Optional[float] = None
+    trend_ml_per_day: Optional[float] = None
+    block_share: Dict[int, float] = field(default_factory=dict)
+    heat_ml_per_c: Optional[float] = None
+    heat_r: Optional[float] = None
+    hot_uplift: Optional[float] = None
+    baseline: Optional[float] = None
+    forecast_c: Optional[float] = None
+    goal: int = DEFAULT_GOAL
+    goal_reason: str = "Standard recommended intake for your activity level."
+
+    # ---------- PHRASING ----------
+
+    def trend_insight(self) -> str:
+        if self.days == 0:
+            return "Log a few drinks to start seeing your hydration trends."
+        if self.trend_ml_per_day is None:
+            return f"You've logged {self.latest_total:.0f}ml across {self.entries} drinks so far."
+        slope = self.trend_ml_per_day
+        if abs(slope) < 10:
+            return f"Your intake is steady at about {self.daily_mean:.0f}ml a day over the last {self.days} days."
+        direction = "rising" if slope > 0 else "falling"
+        return (
+            f"Your intake is {direction} by about {abs(slope):.0f}ml a day "
+            f"(averaging {self.daily_mean:.0f}ml over the last {self.days} days)."
+        )
+
+    def pattern_insight(self) -> str:
+        if not self.block_share:
+            return "Log drink times to see when in the day you hydrate best."
+        peak = max(self.block_share, key=self.block_share.get)
+        # Waking hours (06-21h) with nothing logged are the real gap
+        daytime = {b: self.block_share.get(b, 0.0) for b in range(2, 7)}
+        low = min((b for b in daytime if b != peak), key=daytime.get, default=None)
+        text = f"Your intake peaks {_block(peak)} ({self.block_share[peak]:.0%} of the total)"
+        if low is not None:
+            text += f" and is lowest {_block(low)} ({daytime[low]:.0%})"
+        return text + "."
+
+    def goal_insight(self) -> str:
+        return f"Based on your trends, aim for {self.goal:,}ml tomorrow."
+
+    def weather_insight(self) -> str:
+        if self.hot_uplift is not None:
+            more = "more" if self.hot_uplift >= 0 else "less"
+            return f"You drink {abs(self.hot_uplift):.0%} {more} on days at {HOT_DAY_C:.0f}°C or hotter."
+        if self.heat_ml_per_c is not None:
+            return f"Each extra °C goes with about {self.heat_ml_per_c:+.0f}ml of water for you."
+        return f"On hot days add roughly {DEFAULT_HEAT_ML_PER_C:.0f}ml per °C above {HOT_DAY_C:.0f}°C."
+
+    @property
+    def insights(self) -> List[str]:
+        # Same order the LLM prompt asked for: trend, pattern, goal, weather
+        return [self.trend_insight(), self.pattern_insight(), self.goal_insight(), self.weather_insight()]
+
+
+def analyze_history(history: Iterable[Dict], forecast: Optional[str] = None) -> HydrationReport:
+    """
+    Trend, time-of-day, temperature and next-day goal statistics, vectorized
+    over the parsed history. Deterministic and network-free.
+    """
+    entries = parse_history(history)
+    report = HydrationReport(entries=len(entries), forecast_c=forecast_temperature(forecast))
+    if not entries:
+        return _finish_goal(report)
+
+    amount = np.fromiter((e.amount for e in entries), float, len(entries))
+    minute = np.fromiter((-1 if e.minute is None else e.minute for e in entries), float, len(entries))
+    temp = np.fromiter((np.nan if e.temperature is None else e.temperature for e in entries), float, len(entries))
+    # Undated entries belong to the latest day
+    latest = max((e.day for e in entries if e.day is not None), default=None)
+    ordinal = np.fromiter(
+        ((e.day or latest).toordinal() if (e.day or latest) else 0 for e in entries), int, len(entries)
+    )
+
+    # ---------- DAILY TOTALS ----------
+    days, day_index = np.unique(ordinal, return_inverse=True)
+    totals = np.bincount(day_index, weights=amount)
+    report.latest_total = float(totals[-1])
+    # The latest day is usually still in progress: keep it out of the statistics
+    past = np.ones(len(days), dtype=bool)
+    past[-1] = len(days) == 1
+    complete = past & (days >= days[-1] - (TREND_DAYS - 1))
+    if not complete.any():
+        # Back after a long gap: the older days are all there is to go on
+        complete = past
+    report.days = int(complete.sum())
+    report.daily_mean = float(totals[complete].mean()) if report.days else None
+
+    if complete.sum() >= 3:
+        x = days[complete] - days[complete][0]
+        report.trend_ml_per_day = float(np.polyfit(x, totals[complete], 1)[0])
+        weights = (1 - BASELINE_ALPHA) ** np.arange(complete.sum())[::-1]
+        report.baseline = float(np.average(totals[complete], weights=weights))
+    elif len(days) > 1:
+        report.baseline = report.daily_mean
+
+    # ---------- TIME OF DAY ----------
+    timed = minute >= 0
+    if timed.any():
+        blocks = np.bincount((minute[timed] // 180).astype(int), weights=amount[timed], minlength=8)
+        share = blocks / blocks.sum() if blocks.sum() else blocks
+        report.block_share = {int(b): float(share[b]) for b in np.flatnonzero(blocks)}
+
+    # ---------- WEATHER ----------
+    has_temp = ~np.isnan(temp)
+    if has_temp.any():
+        temp_sum = np.bincount(day_index[has_temp], weights=temp[has_temp], minlength=len(days))
+        temp_n = np.bincount(day_index[has_temp], minlength=len(days))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            day_temp = temp_sum / temp_n
+        # Heat response is a slow-moving habit: use the whole history, not just the trend window
+        usable = (temp_n > 0) & past
+        if usable.sum() >= 3 and np.ptp(day_temp[usable]) > 0:
+            t, y = day_temp[usable], totals[usable]
+            report.heat_ml_per_c = float(np.polyfit(t, y, 1)[0])
+            r = np.corrcoef(t, y)[0, 1]
+            report.heat_r = None if math.isnan(r) else float(r)
+            hot = t >= HOT_DAY_C
+            if hot.any() and (~hot).any() and y[~hot].mean() > 0:
+                report.hot_uplift = float(y[hot].mean() / y[~hot].mean() - 1)
+
+    return _finish_goal(report)
+
+
+def _finish_goal(report: HydrationReport) -> HydrationReport:
+    """
+    Next-day target: weighted recent baseline (at least the standard goal),
+    adjusted for the forecast temperature.
+    """
+    base = max(report.baseline or 0.0, DEFAULT_GOAL)
+    reasons = []
+    if report.baseline:
+        reasons.append(f"your recent average of {report.baseline:.0f}ml a day")
+    else:
+        reasons.append("the standard recommended intake")
+
+    if report.forecast_c is not None:
+        # Trust the personal temperature model only when it's a clear, positive relationship
+        personal = report.heat_ml_per_c is not None and report.heat_r is not None and report.heat_r >= 0.3
+        per_c = max(report.heat_ml_per_c, 0.0) if personal else DEFAULT_HEAT_ML_PER_C
+        extra = per_c * max(report.forecast_c - HOT_DAY_C, 0.0)
+        if extra >= 50:
+            base += extra
+            reasons.append(f"{report.forecast_c:.0f}°C forecast (+{extra:.0f}ml)")
+
+    report.goal = _round_goal(base)
+    report.goal_reason = "Based on " + " and ".join(reasons) + "."
+    return report
@@ -0,0 +1,240 @@
+import math
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Prompt budget for a user's history (summary + recent part), in estimated tokens
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "600"))
+# Share of the budget reserved for the latest day and the raw tail
+HISTORY_RECENT_SHARE = 0.4
+# Raw entries kept verbatim at most
+HISTORY_TAIL_ENTRIES = 12
+# Days summarized one line each before falling back to weekly lines
+HISTORY_DAILY_DAYS = 14
+
+_TIME_KEYS = ("timestamp", "datetime", "logged_at", "created_at", "date", "time")
+_AMOUNT_KEYS = ("amount", "amount_ml", "ml", "volume", "intake", "water")
+_TEMP_KEYS = ("temperature", "temp", "temp_c", "weather_temp")
+_TEMP_IN_TEXT = re.compile(r"(-?\d+(?:\.\d+)?)\s*°?\s*C\b", re.IGNORECASE)
+_CLOCK_FORMATS = ("%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p", "%I %p")
+
+
+@dataclass(frozen=True, slots=True)
+class HydrationEntry:
+    day: Optional[date]
+    minute: Optional[int]  # minutes after midnight, if a time was logged
+    amount: float  # ml
+    temperature: Optional[float]  # °C
+
+    @property
+    def hour(self) -> Optional[int]:
+        return None if self.minute is None else self.minute // 60
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    ~4 characters per token: close enough for budgeting English/number-heavy prompts.
+    """
+    return math.ceil(len(text) / 4)
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, str):
+        match = re.search(r"-?\d+(?:\.\d+)?", value)
+        if match:
+            # A long enough digit run parses to inf
+            number = float(match.group())
+            return number if math.isfinite(number) else None
+    return None
+
+
+def _parse_when(value: Any) -> Tuple[Optional[date], Optional[int]]:
+    if isinstance(value, bool) or value is None:
+        return None, None
+    if isinstance(value, (int, float)):
+        # Epoch seconds (or milliseconds, as JavaScript's Date.now() sends)
+        seconds = value / 1000 if value > 1e11 else value
+        try:
+            moment = datetime.fromtimestamp(seconds, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            # Out of datetime's range (1e20, -1e15, inf, nan)
+            return None, None
+        return moment.date(), moment.hour * 60 + moment.minute
+    text = str(value).strip()
+    try:
+        moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        if len(text) <= 10:
+            return moment.date(), None
+        return moment.date(), moment.hour * 60 + moment.minute
+    except ValueError:
+        pass
+    for fmt in _CLOCK_FORMATS:
+        try:
+            clock = datetime.strptime(text.upper(), fmt)
+            return None, clock.hour * 60 + clock.minute
+        except ValueError:
+            continue
+    return None, None
+
+
+def parse_entry(raw: Dict) -> Optional[HydrationEntry]:
+    """
+    Best-effort read of one client history entry ({"time": "14:05", "amount": 250},
+    {"timestamp": "...", "amount_ml": 300, "weather": "Sunny, 28°C"}, ...).
+    Entries without a usable amount are skipped.
+    """
+    if not isinstance(raw, dict):
+        return None
+    amount = next((_number(raw[k]) for k in _AMOUNT_KEYS if k in raw), None)
+    if amount is None or amount < 0:
+        return None
+
+    day, minute = None, None
+    for key in _TIME_KEYS:
+        if key in raw:
+            d, m = _parse_when(raw[key])
+            day = day or d
+            minute = minute if minute is not None else m
+    temperature = next((_number(raw[k]) for k in _TEMP_KEYS if k in raw), None)
+    if temperature is None and isinstance(raw.get("weather"), str):
+        match = _TEMP_IN_TEXT.search(raw["weather"])
+        if match:
+            temperature = _number(match.group(1))
+    return HydrationEntry(day, minute, amount, temperature)
+
+
+def parse_history(history: Iterable[Dict]) -> List[HydrationEntry]:
+    """
+    Parsed entries, oldest first. Dated entries are sorted; undated ones (the
+    frontend only sends clock times, newest first) count as the latest day.
+    """
+    entries = [e for e in map(parse_entry, history or []) if e is not None]
+    dated = sorted((e for e in entries if e.day is not None), key=lambda e: (e.day, e.minute or 0))
+    undated = [e for e in entries if e.day is None]
+    if undated and all(a.minute is not None for a in undated):
+        undated.sort(key=lambda e: e.minute)
+    return dated + undated
+
+
+# ---------- COMPACTION ----------
+
+def _clock(minute: Optional[int]) -> str:
+    return "--:--" if minute is None else f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def _day_stats(entries: List[HydrationEntry]) -> str:
+    total = sum(e.amount for e in entries)
+    parts = [f"{total:.0f}ml in {len(entries)} drinks"]
+    by_block: Dict[int, float] = {}
+    for e in entries:
+        if e.hour is not None:
+            by_block[e.hour // 3] = by_block.get(e.hour // 3, 0.0) + e.amount
+    if by_block:
+        peak = max(by_block, key=by_block.get)
+        parts.append(f"peak {peak * 3:02d}-{peak * 3 + 3:02d}h")
+    temps = [e.temperature for e in entries if e.temperature is not None]
+    if temps:
+        parts.append(f"{sum(temps) / len(temps):.0f}°C")
+    return ", ".join(parts)
+
+
+def _week_line(start: date, days: Dict[date, List[HydrationEntry]]) -> str:
+    totals = [sum(e.amount for e in entries) for entries in days.values()]
+    line = (
+        f"week of {start.isoformat()}: avg {sum(totals) / len(totals):.0f}ml/day over {len(totals)} days"
+        f" (min {min(totals):.0f}, max {max(totals):.0f})"
+    )
+    temps = [e.temperature for entries in days.values() for e in entries if e.temperature is not None]
+    if temps:
+        line += f", {sum(temps) / len(temps):.0f}°C"
+    return line
+
+
+def _fit(items: List[str], budget: int, separator: int = 1) -> List[str]:
+    """
+    Longest prefix of `items` (in priority order) within `budget` tokens.
+    """
+    kept, used = [], 0
+    for item in items:
+        cost = estimate_tokens(item) + separator
+        if used + cost > budget:
+            break
+        kept.append(item)
+        used += cost
+    return kept
+
+
+@dataclass(frozen=True)
+class CompactHistory:
+    summary: str  # rollups of earlier days: unchanged until the day rolls over
+    recent: str  # latest day + raw tail: the part that changes between calls
+
+    @property
+    def text(self) -> str:
+        return "\n".join(part for part in (self.summary, self.recent) if part)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def compact_history(
+    history: Iterable[Dict],
+    budget: int = HISTORY_TOKEN_BUDGET,
+    tail: int = HISTORY_TAIL_ENTRIES,
+) -> CompactHistory:
+    """
+    Turn a raw history list into prompt text within `budget` tokens:
+    daily lines for the last HISTORY_DAILY_DAYS days, weekly lines before that,
+    and the latest day's entries verbatim. Newest data wins when something
+    has to be dropped.
+    """
+    entries = parse_history(history)
+    if not entries:
+        return CompactHistory("", "No hydration history logged yet.")
+
+    days: Dict[Optional[date], List[HydrationEntry]] = {}
+    for e in entries:
+        days.setdefault(e.day, []).append(e)
+    latest = None if None in days else max(days)
+    earlier = sorted(d for d in days if d is not None and d != latest)
+
+    # ---------- RECENT (latest day + raw tail) ----------
+    today = days[latest]
+    label = latest.isoformat() if latest else "today"
+    recent = f"Latest day ({label}): {_day_stats(today)}"
+    tail_budget = int(budget * HISTORY_RECENT_SHARE) - estimate_tokens(recent) - 8
+    newest_first = [f"{_clock(e.minute)} {e.amount:.0f}ml" for e in reversed(today[-tail:])]
+    kept_tail = _fit(newest_first, tail_budget)
+    if kept_tail:
+        recent += "\nLatest entries (newest first): " + ", ".join(kept_tail)
+    if not earlier:
+        return CompactHistory("", recent)
+
+    # ---------- SUMMARY (earlier days, newest kept first) ----------
+    cutoff = earlier[-1] - timedelta(days=HISTORY_DAILY_DAYS - 1)
+    daily = [f"{d.isoformat()}: {_day_stats(days[d])}" for d in reversed(earlier) if d >= cutoff]
+    weeks: Dict[date, Dict[date, List[HydrationEntry]]] = {}
+    for d in earlier:
+        if d < cutoff:
+            weeks.setdefault(d - timedelta(days=d.weekday()), {})[d] = days[d]
+    weekly = [_week_line(start, weeks[start]) for start in sorted(weeks, reverse=True)]
+
+    header = f"History {earlier[0].isoformat()} to {earlier[-1].isoformat()} ({len(earlier)} days logged):"
+    omitted = "(older days omitted)"
+    summary_budget = budget - estimate_tokens(recent) - estimate_tokens(header) - estimate_tokens(omitted) - 3
+    kept = _fit(daily + weekly, summary_budget)
+    kept_daily, kept_weekly = kept[:len(daily)], kept[len(daily):]
+
+    lines = [header]
+    if len(kept) < len(daily) + len(weekly):
+        lines.append(omitted)
+    # Chronological for the model
+    lines += kept_weekly[::-1] + kept_daily[::-1]
+    return CompactHistory("\n".join(lines), recent)
@@ -0,0 +1,183 @@
+import base64
+import binascii
+import hashlib
+import importlib.util
+import io
+import math
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, Optional, Tuple, Union
+
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+if PILLOW_AVAILABLE:
+    from PIL import Image, ImageOps
+
+# Claude downsizes anything larger than this before looking at it, so sending more only costs bytes
+VISION_MAX_EDGE = int(os.getenv("VISION_MAX_EDGE", "1568"))
+VISION_MAX_PIXELS = int(os.getenv("VISION_MAX_PIXELS", "1150000"))
+VISION_JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "85"))
+
+# Formats the vision API accepts as-is
+SUPPORTED_MEDIA_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+
+_ORIENTATION_TAG = 0x0112
+
+
+class InvalidImageError(ValueError):
+    """The upload isn't decodable image data."""
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    data: bytes
+    media_type: str
+    width: Optional[int]
+    height: Optional[int]
+    original_size: int
+    sha256: str
+    phash: Optional[int]
+
+    @property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode("ascii")
+
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    """
+    Media type from the file's magic bytes (needs the first 12), not from what the client claims.
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"mif1", b"msf1"):
+        return "image/heic"
+    return None
+
+
+def decode_image_data(image_data: str) -> Tuple[bytes, Optional[str]]:
+    """
+    base64 string or data URL -> (raw bytes, media type declared in the data URL).
+    """
+    declared = None
+    if image_data.startswith("data:") and "," in image_data:
+        header, image_data = image_data.split(",", 1)
+        declared = header[5:].split(";", 1)[0] or None
+    try:
+        return base64.b64decode(image_data, validate=False), declared
+    except (binascii.Error, ValueError) as e:
+        raise InvalidImageError(f"invalid base64 image: {e}") from e
+
+
+def target_size(width: int, height: int) -> Tuple[int, int]:
+    scale = min(1.0, VISION_MAX_EDGE / max(width, height), math.sqrt(VISION_MAX_PIXELS / (width * height)))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def perceptual_hash(image: "Image.Image") -> int:
+    """
+    64-bit difference hash: brightness gradients of a 9x8 grayscale thumbnail.
+    Re-encodes, resizes and small edits of the same photo land a few bits apart.
+    """
+    small = image.convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            bits = (bits << 1) | (left > pixels[row * 9 + col + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def file_sha256(f: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    f.seek(0)
+    while chunk := f.read(chunk_size):
+        digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+
+def _read_all(f: BinaryIO) -> bytes:
+    f.seek(0)
+    return f.read()
+
+
+def prepare_image(
+    source: Union[bytes, BinaryIO],
+    declared_type: Optional[str] = None,
+    digest: Optional[str] = None,
+) -> PreparedImage:
+    """
+    Decode, fix EXIF rotation, shrink to what the vision model actually uses and
+    re-encode as JPEG. Without Pillow the bytes pass through unchanged.
+
+    `source` may be an open binary file (e.g. a spooled upload): Pillow decodes
+    straight from it, and the original bytes are only read into memory when
+    they're sent as-is.
+    """
+    f = io.BytesIO(source) if isinstance(source, bytes) else source
+    original_size = f.seek(0, io.SEEK_END)
+    if not original_size:
+        raise InvalidImageError("empty image")
+    digest = digest or file_sha256(f)
+    f.seek(0)
+    sniffed = sniff_media_type(f.read(12))
+    f.seek(0)
+    media_type = sniffed or declared_type or "image/jpeg"
+
+    def passthrough() -> PreparedImage:
+        return PreparedImage(_read_all(f), media_type, None, None, original_size, digest, None)
+
+    if not PILLOW_AVAILABLE:
+        return passthrough()
+
+    try:
+        image = Image.open(f)
+        width, height = image.size
+        size = target_size(width, height)
+        if image.format == "JPEG":
+            # Let libjpeg decode at a reduced scale: much cheaper than decoding full size and resizing
+            image.draft("RGB", size)
+        rotated = image.getexif().get(_ORIENTATION_TAG, 1) not in (1, None)
+        image = ImageOps.exif_transpose(image)
+        size = target_size(*image.size)
+        resized = size != image.size or (width, height) != image.size
+
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        if size != image.size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+
+        phash = perceptual_hash(image)
+        # Already-compressed photos that need no resize or rotation keep their
+        # original bytes: re-encoding them only loses quality
+        keep = not resized and not rotated and sniffed in SUPPORTED_MEDIA_TYPES
+        if keep and sniffed != "image/png":
+            return PreparedImage(_read_all(f), sniffed, width, height, original_size, digest, phash)
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+        data = out.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        if sniffed in SUPPORTED_MEDIA_TYPES:
+            print(f"⚠️ Image preprocessing failed, sending original: {e}")
+            return passthrough()
+        raise InvalidImageError(f"unreadable image: {e}") from e
+
+    # Lossless originals are only kept when the JPEG wouldn't be smaller
+    if keep and original_size <= len(data):
+        return PreparedImage(_read_all(f), sniffed, width, height, original_size, digest, phash)
+    return PreparedImage(data, "image/jpeg", image.width, image.height, original_size, digest, phash)
@@ -0,0 +1,315 @@
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Compiled into the vocabulary at import; recipe ingredients outside it still get ids on first sight
+BASE_INGREDIENTS = [
+    "chicken", "beef", "pork", "lamb", "goat", "fish", "tilapia", "salmon", "tuna", "shrimp",
+    "egg", "milk", "butter", "cheese", "yogurt", "cream", "parmesan", "mozzarella",
+    "rice", "pasta", "noodle", "bread", "flour", "cornmeal", "oat", "quinoa", "tortilla", "chapati",
+    "bean", "chickpea", "lentil", "green gram", "pea", "tofu", "peanut", "peanut butter",
+    "potato", "sweet potato", "cassava", "arrowroot", "plantain", "carrot", "cabbage", "kale",
+    "spinach", "lettuce", "broccoli", "cauliflower", "zucchini", "eggplant", "cucumber", "pumpkin",
+    "onion", "green onion", "red onion", "garlic", "ginger", "tomato", "tomato paste", "bell pepper",
+    "chili", "mushroom", "avocado", "corn", "coriander", "parsley", "basil", "mint", "rosemary",
+    "thyme", "cumin", "turmeric", "paprika", "cinnamon", "curry powder", "garam masala", "salt",
+    "pepper", "black pepper", "sugar", "honey", "olive oil", "vegetable oil", "coconut oil",
+    "coconut milk", "soy sauce", "vinegar", "lemon", "lemon juice", "lime", "orange", "banana",
+    "mango", "apple", "pineapple", "berry", "strawberry", "ground beef", "chicken stock", "beef stock",
+]
+
+# Alternative names -> canonical ingredient (both sides in normalized, stemmed form)
+SYNONYMS = {
+    "chicken breast": "chicken",
+    "chicken thigh": "chicken",
+    "chicken drumstick": "chicken",
+    "chicken wing": "chicken",
+    "chicken leg": "chicken",
+    "steak": "beef",
+    "beef steak": "beef",
+    "minced meat": "ground beef",
+    "mince": "ground beef",
+    "prawn": "shrimp",
+    "egg yolk": "egg",
+    "egg white": "egg",
+    "garlic clove": "garlic",
+    "clove garlic": "garlic",
+    "scallion": "green onion",
+    "spring onion": "green onion",
+    "garbanzo": "chickpea",
+    "garbanzo bean": "chickpea",
+    "ndengu": "green gram",
+    "mung bean": "green gram",
+    "cilantro": "coriander",
+    "dhania": "coriander",
+    "aubergine": "eggplant",
+    "brinjal": "eggplant",
+    "courgette": "zucchini",
+    "capsicum": "bell pepper",
+    "hoho": "bell pepper",
+    "sukuma": "kale",
+    "sukuma wiki": "kale",
+    "maize flour": "cornmeal",
+    "unga": "cornmeal",
+    "waru": "potato",
+    "irish potato": "potato",
+    "chilli": "chili",
+    "chile": "chili",
+    "spaghetti": "pasta",
+    "penne": "pasta",
+    "macaroni": "pasta",
+    "greek yogurt": "yogurt",
+    "natural yogurt": "yogurt",
+}
+
+# Preparation words that don't change which ingredient it is
+MODIFIERS = {
+    "fresh", "dried", "chopped", "diced", "minced", "sliced", "grated", "shredded", "crushed",
+    "boneless", "skinless", "large", "small", "medium", "whole", "raw", "cooked", "frozen",
+    "canned", "organic", "ripe", "finely", "roughly", "peeled", "of", "and", "or", "to", "taste",
+    "a", "the", "for", "with",
+}
+# Words that show up in free-text queries but never name an ingredient
+QUERY_STOPWORDS = {
+    "recipe", "recipes", "dish", "meal", "dinner", "lunch", "breakfast", "supper", "snack",
+    "quick", "easy", "simple", "healthy", "cheap", "something", "some", "want", "i", "me", "my",
+}
+
+STEM_EXCEPTIONS = {"asparagus", "couscous", "hummus", "molasses", "swiss", "citrus", "grits", "bass"}
+IRREGULAR = {"leaves": "leaf", "halves": "half", "loaves": "loaf", "knives": "knife"}
+
+# Fuzzy fallback for unknown query tokens (typos, prefixes like "chick")
+FUZZY_MIN_LENGTH = 4
+FUZZY_MIN_SIMILARITY = 0.6
+
+# Bound on each expansion cache (names, ingredient lists, queries); cleared wholesale when exceeded
+INGREDIENT_CACHE_SIZE = 50_000
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def stem(word: str) -> str:
+    """
+    Light plural stemmer; only needs to be consistent between queries and recipes.
+    """
+    if word in IRREGULAR:
+        return IRREGULAR[word]
+    if len(word) <= 3 or word in STEM_EXCEPTIONS:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(w) for w in _WORD.findall(text.lower()) if w not in MODIFIERS]
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class QueryMatch:
+    """
+    A query resolved to canonical ingredient ids.
+
+    Each query ingredient is a group of interchangeable ids (its canonical id
+    plus any fuzzy candidates); a recipe matches a group if it shares any id with it.
+    """
+
+    __slots__ = ("ids", "group_of", "size")
+
+    def __init__(self, groups: List[FrozenSet[int]]):
+        self.group_of: Dict[int, int] = {}
+        for g, ids in enumerate(groups):
+            for i in ids:
+                self.group_of.setdefault(i, g)
+        self.ids = frozenset(self.group_of)
+        self.size = len(groups)
+
+    def matched(self, recipe_ids: FrozenSet[int]) -> int:
+        """
+        Number of query ingredients the recipe covers.
+        """
+        hits = recipe_ids & self.ids
+        if not hits:
+            return 0
+        return len({self.group_of[i] for i in hits})
+
+
+class IngredientVocabulary:
+    """
+    Ingredient name -> canonical integer ids.
+
+    Names are lowercased, stripped of preparation words and plural-stemmed,
+    then mapped through the synonym table. A recipe ingredient expands to its
+    own phrase, every known sub-phrase and every token ("extra virgin olive oil"
+    -> olive oil, oil, ...), cached per distinct name. Queries are segmented
+    into known phrases (longest first) with a trigram lookup for unknown words,
+    once per request; ranking then only intersects integer sets.
+    """
+
+    def __init__(self, base: Iterable[str] = (), synonyms: Optional[Dict[str, str]] = None):
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._cache: Dict[str, FrozenSet[int]] = {}
+        self._recipe_cache: Dict[Tuple[str, ...], Tuple[FrozenSet[int], int]] = {}
+        self._query_cache: Dict[Tuple[str, ...], "QueryMatch"] = {}
+
+        self._synonyms: Dict[str, str] = {}
+        for alias, canonical in (synonyms or {}).items():
+            self._synonyms[" ".join(tokenize(alias))] = " ".join(tokenize(canonical))
+
+        self._known: Set[str] = set(self._synonyms)
+        for name in base:
+            phrase = " ".join(tokenize(name))
+            if phrase:
+                self._known.add(phrase)
+        self._known.update(self._synonyms.values())
+        self._max_words = max((len(p.split()) for p in self._known), default=1)
+
+        self._trigrams: Dict[str, Set[str]] = {}
+        for phrase in self._known:
+            for gram in trigrams(phrase):
+                self._trigrams.setdefault(gram, set()).add(phrase)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, name: str) -> bool:
+        return " ".join(tokenize(name)) in self._known
+
+    def canonical(self, phrase: str) -> str:
+        return self._synonyms.get(phrase, phrase)
+
+    def id_of(self, phrase: str) -> int:
+        """
+        Interned id of a canonical phrase.
+        """
+        ident = self._ids.get(phrase)
+        if ident is None:
+            with self._lock:
+                ident = self._ids.setdefault(phrase, len(self._ids))
+        return ident
+
+    def fuzzy(self, word: str) -> Optional[str]:
+        """
+        Closest known phrase by trigram (Dice) similarity, if close enough.
+        """
+        if len(word) < FUZZY_MIN_LENGTH:
+            return None
+        grams = trigrams(word)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for phrase in self._trigrams.get(gram, ()):
+                shared[phrase] = shared.get(phrase, 0) + 1
+
+        best, best_score = None, FUZZY_MIN_SIMILARITY
+        for phrase, count in shared.items():
+            score = 2 * count / (len(grams) + len(phrase) + 1)
+            if score > best_score or (score == best_score and best is not None and phrase < best):
+                best, best_score = phrase, score
+        return best
+
+    # ---------- RECIPE SIDE ----------
+
+    def ingredient_ids(self, name: str) -> FrozenSet[int]:
+        cached = self._cache.get(name)
+        if cached is not None:
+            return cached
+
+        tokens = tokenize(name)
+        phrases = {" ".join(tokens)} if tokens else set()
+        phrases.update(tokens)
+        for size in range(2, min(len(tokens), self._max_words) + 1):
+            for start in range(len(tokens) - size + 1):
+                sub = " ".join(tokens[start:start + size])
+                if sub in self._known:
+                    phrases.add(sub)
+
+        ids = frozenset(self.id_of(self.canonical(p)) for p in phrases)
+        if len(self._cache) >= INGREDIENT_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[name] = ids
+        return ids
+
+    def recipe_entry(self, ingredients: Iterable[str]) -> Tuple[FrozenSet[int], int]:
+        """
+        (union of the ingredients' ids, distinct lowercased ingredient count),
+        cached per ingredient list (records keep them as tuples).
+        """
+        key = ingredients if isinstance(ingredients, tuple) else tuple(ingredients)
+        cached = self._recipe_cache.get(key)
+        if cached is not None:
+            return cached
+
+        ids = frozenset().union(*(self.ingredient_ids(name) for name in key if name))
+        entry = (ids, len({name.lower() for name in key}))
+        if len(self._recipe_cache) >= INGREDIENT_CACHE_SIZE:
+            self._recipe_cache.clear()
+        self._recipe_cache[key] = entry
+        return entry
+
+    def recipe_ids(self, ingredients: Iterable[str]) -> FrozenSet[int]:
+        return self.recipe_entry(ingredients)[0]
+
+    # ---------- QUERY SIDE ----------
+
+    def query(self, terms: Iterable[str]) -> QueryMatch:
+        """
+        Resolve query terms into groups of canonical ids, greedily matching the
+        longest known phrase at each position.
+        """
+        key = tuple(terms)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            return cached
+
+        groups: List[FrozenSet[int]] = []
+        seen: Set[FrozenSet[int]] = set()
+        transient = 0
+        for term in key:
+            tokens = [t for t in tokenize(term) if t not in QUERY_STOPWORDS]
+            i = 0
+            while i < len(tokens):
+                group = None
+                for j in range(min(len(tokens), i + self._max_words), i, -1):
+                    phrase = " ".join(tokens[i:j])
+                    if phrase in self._known:
+                        group = frozenset({self.id_of(self.canonical(phrase))})
+                        i = j
+                        break
+                if group is None:
+                    word = tokens[i]
+                    # Lookup only: interning arbitrary query words would grow _ids forever.
+                    # A word no recipe has is a negative id that still counts as a group.
+                    ident = self._ids.get(word)
+                    if ident is None:
+                        transient += 1
+                        ident = -transient
+                    ids = {ident}
+                    match = self.fuzzy(word)
+                    if match is not None:
+                        ids.add(self.id_of(self.canonical(match)))
+                    group = frozenset(ids)
+                    i += 1
+                if group not in seen:
+                    seen.add(group)
+                    groups.append(group)
+
+        query = QueryMatch(groups)
+        if transient:
+            # A later recipe may introduce the word: resolve again next time
+            return query
+        if len(self._query_cache) >= INGREDIENT_CACHE_SIZE:
+            self._query_cache.clear()
+        self._query_cache[key] = query
+        return query
+
+
+ingredient_vocab = IngredientVocabulary(BASE_INGREDIENTS, SYNONYMS)
@@ -0,0 +1,293 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.schemas.intent import IntentSchema
+
+# -------------------------
+# LEXICON (phrase -> Spoonacular enum)
+# -------------------------
+
+DIETS: Dict[str, str] = {
+    "ketogenic": "Ketogenic",
+    "keto": "Ketogenic",
+    "no carb": "Ketogenic",
+    "no carbs": "Ketogenic",
+    "low carb": "Ketogenic",
+    "low carbs": "Ketogenic",
+    "vegetarian": "Vegetarian",
+    "veggie": "Vegetarian",
+    "meat free": "Vegetarian",
+    "meatless": "Vegetarian",
+    "no meat": "Vegetarian",
+    "vegan": "Vegan",
+    "plant based": "Vegan",
+    "pescetarian": "Pescetarian",
+    "pescatarian": "Pescetarian",
+    "paleo": "Paleo",
+    "primal": "Primal",
+    "whole30": "Whole30",
+    "whole 30": "Whole30",
+}
+
+INTOLERANCES: Dict[str, str] = {
+    "dairy free": "Dairy",
+    "no dairy": "Dairy",
+    "no milk": "Dairy",
+    "lactose free": "Dairy",
+    "egg free": "Egg",
+    "no egg": "Egg",
+    "no eggs": "Egg",
+    "gluten free": "Gluten",
+    "no gluten": "Gluten",
+    "celiac": "Gluten",
+    "grain free": "Grain",
+    "no grains": "Grain",
+    "peanut free": "Peanut",
+    "no peanut": "Peanut",
+    "no peanuts": "Peanut",
+    "seafood free": "Seafood",
+    "no seafood": "Seafood",
+    "sesame free": "Sesame",
+    "no sesame": "Sesame",
+    "shellfish free": "Shellfish",
+    "no shellfish": "Shellfish",
+    "soy free": "Soy",
+    "no soy": "Soy",
+    "sulfite free": "Sulfite",
+    "no sulfites": "Sulfite",
+    "nut free": "Tree Nut",
+    "no nuts": "Tree Nut",
+    "tree nut free": "Tree Nut",
+    "no tree nuts": "Tree Nut",
+    "wheat free": "Wheat",
+    "no wheat": "Wheat",
+}
+
+CUISINES: Dict[str, str] = {
+    name.lower(): name
+    for name in [
+        "African", "American", "British", "Cajun", "Caribbean", "Chinese",
+        "Eastern European", "European", "French", "German", "Greek", "Indian",
+        "Irish", "Italian", "Japanese", "Jewish", "Korean", "Latin American",
+        "Mediterranean", "Mexican", "Middle Eastern", "Nordic", "Southern",
+        "Spanish", "Thai", "Vietnamese", "Asian",
+    ]
+}
+
+MEAL_TYPES: Dict[str, str] = {
+    "breakfast": "breakfast",
+    "brunch": "breakfast",
+    "lunch": "main course",
+    "dinner": "main course",
+    "supper": "main course",
+    "main course": "main course",
+    "side dish": "side dish",
+    "dessert": "dessert",
+    "appetizer": "appetizer",
+    "starter": "appetizer",
+    "salad": "salad",
+    "soup": "soup",
+    "snack": "snack",
+    "drink": "drink",
+    "smoothie": "beverage",
+    "beverage": "beverage",
+}
+
+PRICES: Dict[str, float] = {
+    "cheap": 5.0,
+    "budget": 5.0,
+    "affordable": 5.0,
+    "inexpensive": 5.0,
+    "expensive": 50.0,
+    "fancy": 50.0,
+}
+
+# Currency words -> USD (max_price is USD per serving); shillings at an approximate rate
+USD_PER_KES = 1 / 129
+CURRENCIES: Dict[str, float] = {
+    "dollars": 1.0,
+    "dollar": 1.0,
+    "bucks": 1.0,
+    "usd": 1.0,
+    "ksh": USD_PER_KES,
+    "kes": USD_PER_KES,
+    "shillings": USD_PER_KES,
+    "shilling": USD_PER_KES,
+}
+
+LOW_CALORIE_PHRASES = ("low cal", "low calorie", "low calories", "light")
+LOW_CALORIE_DEFAULT = 400
+
+# Words that carry no search meaning and can be dropped from the query
+FILLER_WORDS = {
+    "i", "im", "want", "need", "would", "like", "some", "a", "an", "the", "for",
+    "me", "my", "with", "and", "or", "recipe", "recipes", "meal", "meals", "dish",
+    "make", "cook", "something", "please", "give", "show", "find", "idea", "ideas",
+    "quick", "easy", "fast", "simple", "healthy", "tasty", "good", "nice", "to",
+    "of", "in", "can", "you", "today", "tonight", "friendly",
+}
+
+# Anything here means the request has nuance the lexicon can't express
+NEGATIONS = {"not", "isnt", "without", "except", "avoid", "hate", "dont", "allergic", "but", "no"}
+
+_NUMBER_WORDS = {"half an hour": "30 minutes", "an hour": "60 minutes", "one hour": "60 minutes"}
+
+_TIME_RE = re.compile(
+    r"\b(?:under|less than|in|within|max|at most|below)?\s*(\d{1,3}(?:\.\d+)?)\s*(?:-|\s)?"
+    r"(minutes|minute|mins|min|hours|hour|hrs|hr)\b"
+)
+_CALORIE_RE = re.compile(
+    r"\b(?:under|less than|below|max|at most)?\s*(\d{2,4})\s*(?:-|\s)?(calories|calorie|kcal|cals|cal)\b"
+)
+_CURRENCY_UNITS = "|".join(sorted(CURRENCIES, key=len, reverse=True))
+_CURRENCY_RE = re.compile(
+    r"\b(?:under|less than|below|max|at most|for)?\s*"
+    rf"(?:({_CURRENCY_UNITS})\s*(\d+(?:\.\d+)?)|(\d+(?:\.\d+)?)\s*({_CURRENCY_UNITS}))\b"
+)
+_BARE_UNDER_RE = re.compile(r"\bunder (\d+)\b")
+# "for two", "for 4 people": servings, not something to search for
+_SERVINGS_RE = re.compile(
+    r"\bfor (?:\d{1,2}|one|two|three|four|five|six|seven|eight|ten|twelve)(?: people| persons| servings)?\b"
+)
+# A unit-less "under N" is only a guess at minutes: leave the call to the LLM
+BARE_UNDER_PENALTY = 0.3
+
+
+def _phrase_pattern(phrases) -> re.Pattern:
+    # Longest phrase first so "tree nut free" wins over "nut free"
+    ordered = sorted(phrases, key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(p) for p in ordered) + r")\b")
+
+
+_DIET_RE = _phrase_pattern(DIETS)
+_INTOLERANCE_RE = _phrase_pattern(INTOLERANCES)
+_CUISINE_RE = _phrase_pattern(CUISINES)
+_MEAL_TYPE_RE = _phrase_pattern(MEAL_TYPES)
+_PRICE_RE = _phrase_pattern(PRICES)
+_LOW_CALORIE_RE = _phrase_pattern(LOW_CALORIE_PHRASES)
+
+
+def normalize_query_text(text: str) -> str:
+    """
+    Canonical form of a raw query: lowercase, hyphens as spaces, no punctuation, single spaces.
+    "$" becomes "dollars" and decimal points survive, so "$7.50" reads "7.50 dollars".
+    """
+    text = text.lower().replace("-", " ")
+    text = re.sub(r"\$\s*(\d+(?:\.\d+)?)", r" \1 dollars ", text)
+    text = re.sub(r"[^a-z0-9\s.]", "", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    return " ".join(text.split())
+
+
+def extract_intent(user_input: str) -> Tuple[IntentSchema, float]:
+    """
+    Deterministic intent extraction using the compiled lexicon.
+
+    Returns the intent plus a confidence in [0, 1]. Confidence drops when
+    words are left over that the lexicon can't explain (negations, stray
+    numbers, long free text), which is when the LLM is actually worth calling.
+    """
+    text = normalize_query_text(user_input)
+    for phrase, replacement in _NUMBER_WORDS.items():
+        text = text.replace(phrase, replacement)
+
+    # Intolerances first: "no dairy" must not leave a dangling "no"
+    intolerances: List[str] = []
+    for match in _INTOLERANCE_RE.findall(text):
+        value = INTOLERANCES[match]
+        if value not in intolerances:
+            intolerances.append(value)
+    text = _INTOLERANCE_RE.sub(" ", text)
+
+    diet: Optional[str] = None
+    diet_match = _DIET_RE.search(text)
+    if diet_match:
+        diet = DIETS[diet_match.group(1)]
+        text = _DIET_RE.sub(" ", text)
+
+    max_calories: Optional[int] = None
+    calorie_match = _CALORIE_RE.search(text)
+    if calorie_match:
+        max_calories = int(calorie_match.group(1))
+        text = _CALORIE_RE.sub(" ", text)
+    elif _LOW_CALORIE_RE.search(text):
+        max_calories = LOW_CALORIE_DEFAULT
+    text = _LOW_CALORIE_RE.sub(" ", text)
+
+    # Prices before times: "under $10" / "under 500 ksh" are never minutes
+    max_price: Optional[float] = None
+    currency_match = _CURRENCY_RE.search(text)
+    if currency_match:
+        unit_before, amount_after, amount_before, unit_after = currency_match.groups()
+        amount = float(amount_after or amount_before)
+        max_price = round(amount * CURRENCIES[unit_before or unit_after], 2)
+        text = _CURRENCY_RE.sub(" ", text)
+    price_match = _PRICE_RE.search(text)
+    if price_match:
+        if max_price is None:
+            max_price = PRICES[price_match.group(1)]
+        text = _PRICE_RE.sub(" ", text)
+
+    max_time_minutes: Optional[int] = None
+    bare_time = False
+    time_match = _TIME_RE.search(text)
+    if time_match:
+        amount, unit = float(time_match.group(1)), time_match.group(2)
+        max_time_minutes = round(amount * 60 if unit.startswith("h") else amount)
+        text = _TIME_RE.sub(" ", text)
+    else:
+        bare = _BARE_UNDER_RE.search(text)
+        if bare:
+            max_time_minutes = int(bare.group(1))
+            bare_time = True
+            text = _BARE_UNDER_RE.sub(" ", text)
+
+    # After prices and times, so "for $7.50" / "for 30 minutes" aren't read as serving counts
+    text = _SERVINGS_RE.sub(" ", text)
+
+    cuisine: Optional[str] = None
+    cuisine_match = _CUISINE_RE.search(text)
+    if cuisine_match:
+        cuisine = CUISINES[cuisine_match.group(1)]
+
+    recipe_type: Optional[str] = None
+    type_match = _MEAL_TYPE_RE.search(text)
+    if type_match:
+        recipe_type = MEAL_TYPES[type_match.group(1)]
+
+    descriptive = [m.group(1) for m in (cuisine_match, type_match) if m]
+    text = _CUISINE_RE.sub(" ", text)
+    text = _MEAL_TYPE_RE.sub(" ", text)
+
+    residual = [w for w in text.split() if w not in FILLER_WORDS]
+
+    # ---------- CONFIDENCE ----------
+    confidence = 1.0
+    if any(w in NEGATIONS for w in residual):
+        confidence -= 0.6
+    if any(any(c.isdigit() for c in w) for w in residual):
+        confidence -= 0.5
+    if bare_time:
+        confidence -= BARE_UNDER_PENALTY
+    if len(residual) > 3:
+        confidence -= 0.15 * (len(residual) - 3)
+    confidence = max(0.0, round(confidence, 2))
+
+    # Constraint-only requests ("vegan under 20 minutes") search by filters alone
+    query = " ".join(residual or descriptive)
+    constraints = (diet, intolerances, max_calories, max_price, max_time_minutes, cuisine, recipe_type)
+    if not query and not any(constraints):
+        # Nothing understood at all: let the LLM try
+        confidence = 0.0
+
+    intent = IntentSchema(
+        query=query,
+        cuisine=cuisine,
+        diet=diet,
+        intolerances=intolerances,
+        max_calories=max_calories,
+        max_price=max_price,
+        max_time_minutes=max_time_minutes,
+        recipe_type=recipe_type,
+    )
+    return intent, confidence
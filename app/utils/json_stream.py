@@ -0,0 +1,57 @@
+import json
+from typing import Callable, Optional
+
+
+class JSONObjectScanner:
+    """
+    Incremental scanner for a single JSON object arriving in token-sized chunks.
+
+    feed() returns the object's text as soon as its closing brace arrives
+    (anything before the first "{" is ignored). Each time a top-level member
+    completes, on_member is called with the members parsed so far, so a
+    caller can reject bad output without waiting for the rest of it.
+    """
+
+    def __init__(self, on_member: Optional[Callable[[dict], None]] = None):
+        self.on_member = on_member
+        self._chars: list = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def _check_members(self) -> None:
+        if self.on_member is None:
+            return
+        partial = "".join(self._chars)
+        self.on_member(json.loads(partial + "}"))
+
+    def feed(self, chunk: str) -> Optional[str]:
+        for ch in chunk:
+            if self._depth == 0:
+                if ch != "{":
+                    continue
+            self._chars.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    return "".join(self._chars)
+            elif ch == "," and self._depth == 1:
+                self._chars.pop()
+                self._check_members()
+                self._chars.append(ch)
+
+        return None
@@ -25,3 +25,39 @@ def extract_calories(recipe_data: dict) -> float | None:
             return float(nutrient.get("amount", 0))
 
     return None
+
+
+# Spoonacular nutrient name (lowercased) -> our column name
+NUTRIENT_COLUMNS = {
+    "calories": "calories",
+    "protein": "protein",
+    "carbohydrates": "carbs",
+    "fat": "fat",
+    "fiber": "fiber",
+}
+
+# Exact-case fast path for the names as Spoonacular sends them
+NUTRIENT_LOOKUP = {**NUTRIENT_COLUMNS, **{k.capitalize(): v for k, v in NUTRIENT_COLUMNS.items()}}
+
+
+def scan_nutrients(nutrients: list) -> tuple:
+    """
+    One scan of a nutrition.nutrients list for every NUTRIENT_COLUMNS entry
+    (first occurrence wins, like the single-nutrient helpers above).
+    Returns (values by column, index of each found column in the list).
+    """
+    found = dict.fromkeys(NUTRIENT_COLUMNS.values())
+    positions = {}
+    for i, nutrient in enumerate(nutrients):
+        name = nutrient.get("name", "")
+        column = NUTRIENT_LOOKUP.get(name) or NUTRIENT_COLUMNS.get(name.lower())
+        if column is not None and column not in positions:
+            found[column] = float(nutrient.get("amount", 0))
+            positions[column] = i
+            if len(positions) == len(found):
+                break
+    return found, positions
+
+
+def extract_nutrients(recipe_data: dict) -> dict:
+    return scan_nutrients(recipe_data.get("nutrition", {}).get("nutrients", []))[0]
@@ -0,0 +1,150 @@
+from typing import Dict, List
+
+import numpy as np
+
+from app.utils.explanation_builder import build_explanations
+from app.utils.ingredient_vocab import QueryMatch, ingredient_vocab
+from app.utils.recipe_record import with_ranking
+
+
+def extract_features(
+    recipes: List[Dict],
+    query: QueryMatch,
+    query_is_complex: bool,
+) -> Dict[str, np.ndarray]:
+    """
+    One Python pass over the recipes, producing columnar features:
+    time, ingredient count, protein, cost, match count and the match-filter mask.
+    Falsy values (None / 0) become 0, exactly as the scalar scorer treats them.
+    """
+    n = len(recipes)
+
+    time = np.zeros(n)
+    count = np.zeros(n)
+    protein = np.zeros(n)
+    cost = np.zeros(n)
+    matched = np.zeros(n)
+    relevant = np.zeros(n, dtype=bool)
+
+    for i, recipe in enumerate(recipes):
+        ids, ingredient_count = ingredient_vocab.recipe_entry(recipe.get("ingredients", ()))
+        hits = query.matched(ids)
+        relevant[i] = bool(hits) or query_is_complex
+
+        time[i] = recipe.get("ready_in_minutes") or 0
+        count[i] = ingredient_count
+        protein[i] = recipe.get("protein_score") or 0
+        cost[i] = recipe.get("estimated_cost_kes") or 0
+        matched[i] = hits
+
+    return {
+        "time": time,
+        "count": count,
+        "protein": protein,
+        "cost": cost,
+        "matched": matched,
+        "relevant": relevant,
+        "query_size": query.size,
+    }
+
+
+def score_features(features: Dict[str, np.ndarray], max_time: float) -> np.ndarray:
+    """
+    All scores in one vectorized pass; filtered-out recipes get -inf.
+    Terms are added in the same order as the scalar scorer so floats match bit for bit.
+    """
+    time, count = features["time"], features["count"]
+    protein, cost = features["protein"], features["cost"]
+
+    score = np.zeros(len(time))
+    score += np.where(time != 0, np.maximum(0, 12 - time / 4), 0)
+    score += np.where(count > 0, np.maximum(0, 8 - count), 0)
+    score += np.where(protein != 0, np.minimum(protein * 0.15, 6), 0)
+    if features["query_size"]:
+        score += features["matched"] / features["query_size"] * 5
+    score += np.where(cost != 0, np.maximum(0, 5 - cost / 100), 0)
+
+    keep = features["relevant"] & ~((time != 0) & (time > max_time))
+    return np.where(keep, score, -np.inf)
+
+
+def _select(recipes: List[Dict], scores: np.ndarray, pool: np.ndarray, top_k: int) -> List[int]:
+    """
+    Replicates the scalar ordering on a candidate pool:
+    stable sort by rounded score (desc), then dedupe by title.
+    """
+    rounded = {int(i): round(float(scores[i]), 2) for i in pool}
+    ordered = sorted(rounded, key=lambda i: (-rounded[i], i))
+
+    seen = set()
+    picked: List[int] = []
+    for i in ordered:
+        key = recipes[i]["title"].lower().strip()
+        if key in seen:
+            continue
+        seen.add(key)
+        picked.append(i)
+        if len(picked) == top_k:
+            break
+    return picked
+
+
+def rank_recipes_vectorized(
+    recipes: List[Dict],
+    query_ingredients: List[str],
+    constraints: Dict | None = None,
+    persona: str = "busy_professional",
+    top_k: int = 5,
+) -> List[Dict]:
+    """
+    Columnar equivalent of recipe_ranker.rank_recipes_scalar.
+
+    Scores every recipe with NumPy, then uses a partial sort (np.partition) to pull a small
+    candidate pool instead of sorting everything. The pool grows until the
+    k-th pick provably beats everything left outside it, so the output
+    (including ties and title dedupe) matches the scalar scorer exactly.
+    """
+    if not recipes:
+        return []
+
+    max_time = constraints.get("max_time") if constraints else None
+    if max_time is None:
+        max_time = 999
+
+    query = ingredient_vocab.query(query_ingredients)
+    query_is_complex = any(len(q.split()) > 1 for q in query_ingredients)
+    scores = score_features(extract_features(recipes, query, query_is_complex), max_time)
+    valid = np.flatnonzero(np.isfinite(scores))
+    if valid.size == 0:
+        return []
+
+    pool_size = top_k * 2
+    while True:
+        if pool_size >= valid.size:
+            picked = _select(recipes, scores, valid, top_k)
+            break
+
+        valid_scores = scores[valid]
+        threshold = np.partition(valid_scores, valid.size - pool_size)[valid.size - pool_size]
+        pool = valid[valid_scores >= threshold]
+        picked = _select(recipes, scores, pool, top_k)
+
+        # Anything outside the pool scores < threshold, so it rounds to at most threshold + 0.01
+        if len(picked) == top_k and round(float(scores[picked[-1]]), 2) > threshold + 0.01:
+            break
+        pool_size *= 4
+
+    ranked = []
+    for i in picked:
+        recipe = recipes[i]
+        ranked.append(with_ranking(
+            recipe,
+            round(float(scores[i]), 2),
+            build_explanations(
+                recipe=recipe,
+                query_ingredients=query_ingredients,
+                persona="busy_professional",
+                query=query,
+            ),
+        ))
+    return ranked
@@ -1,39 +1,24 @@
-from typing import Dict, Any, List
-from app.utils.cost_calculator import estimate_recipe_cost
-from app.utils.nutrition_utils import calculate_protein_score, extract_calories
+from typing import Dict, Any, List, Optional, Tuple
+from app.utils.cost_calculator import estimate_batch_costs, estimate_recipe_cost
+from app.utils.nutrition_utils import NUTRIENT_COLUMNS, calculate_protein_score, extract_calories, extract_nutrients
 
 
-def normalize_spoonacular_recipe(data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Normalize Spoonacular recipe data into a STABLE internal format.
-
-    This output is:
-    - ranking-safe
-    - frontend-safe
-    - schema-aligned
-    """
-
-    # ---------- INGREDIENTS ----------
-    raw_ingredients = data.get("extendedIngredients", [])
+def _ingredients(data: Dict[str, Any]) -> List[str]:
     ingredient_set = set()
-
-    for ing in raw_ingredients:
+    for ing in data.get("extendedIngredients", []):
         name = ing.get("name")
         if name:
             ingredient_set.add(name.lower().strip())
+    return sorted(ingredient_set)
 
-    ingredients: List[str] = sorted(ingredient_set)
 
-    # ---------- INSTRUCTIONS ----------
+def _instructions(data: Dict[str, Any]) -> List[str]:
     instructions: List[str] = []
-
-    analyzed = data.get("analyzedInstructions", [])
-    if analyzed:
-        for block in analyzed:
-            for step in block.get("steps", []):
-                text = step.get("step")
-                if text:
-                    instructions.append(text.strip())
+    for block in data.get("analyzedInstructions") or []:
+        for step in block.get("steps", []):
+            text = step.get("step")
+            if text:
+                instructions.append(text.strip())
 
     if not instructions and data.get("instructions"):
         instructions = [
@@ -42,31 +27,34 @@ def normalize_spoonacular_recipe(data: Dict[str, Any]) -> Dict[str, Any]:
             if s.strip()
         ]
 
-    if not instructions:
-        instructions = ["No instructions provided."]
+    return instructions or ["No instructions provided."]
 
-    # ---------- COST & NUTRITION ----------
-    estimated_cost = estimate_recipe_cost(ingredients)
-    protein_score = calculate_protein_score(data)
-    calories = extract_calories(data)
 
-    # ---------- DIETARY TAGS ----------
+def _dietary_tags(data: Dict[str, Any]) -> List[str]:
     dietary_tags = []
     if data.get("vegetarian"): dietary_tags.append("Vegetarian")
     if data.get("vegan"): dietary_tags.append("Vegan")
     if data.get("glutenFree"): dietary_tags.append("Gluten Free")
     if data.get("dairyFree"): dietary_tags.append("Dairy Free")
+    return dietary_tags
 
+
+def _normalized(
+    data: Dict[str, Any],
+    ingredients: List[str],
+    calories: Optional[float],
+    protein_score: Optional[float],
+    estimated_cost: float,
+) -> Dict[str, Any]:
     protein_per_cost = None
     if protein_score is not None and estimated_cost > 0:
         protein_per_cost = round(protein_score / estimated_cost, 4)
 
-    # ---------- NORMALIZED OUTPUT ----------
     return {
         "id": data.get("id"),
         "title": data.get("title", "Untitled Recipe"),
-        "ingredients": sorted(list(ingredients)),
-        "instructions": instructions,
+        "ingredients": ingredients,
+        "instructions": _instructions(data),
         "ready_in_minutes": data.get("readyInMinutes"),
         "source_url": data.get("sourceUrl"),
         "image": data.get("image"),
@@ -75,8 +63,56 @@ def normalize_spoonacular_recipe(data: Dict[str, Any]) -> Dict[str, Any]:
         "estimated_cost_kes": estimated_cost,
         "price_per_serving": data.get("pricePerServing"),
         "calories": calories,
-        "dietary_tags": dietary_tags,
+        "dietary_tags": _dietary_tags(data),
         "protein_score": protein_score,
         "protein_per_cost": protein_per_cost,
         "popularity": data.get("aggregateLikes", 0),
+
+        # filter labels (used by the local corpus)
+        "diets": [d.lower() for d in data.get("diets", [])],
+        "cuisines": data.get("cuisines", []),
+        "dish_types": data.get("dishTypes", []),
     }
+
+
+def normalize_spoonacular_recipe(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize Spoonacular recipe data into a STABLE internal format.
+
+    This output is:
+    - ranking-safe
+    - frontend-safe
+    - schema-aligned
+    """
+    ingredients = _ingredients(data)
+    return _normalized(
+        data,
+        ingredients,
+        calories=extract_calories(data),
+        protein_score=calculate_protein_score(data),
+        estimated_cost=estimate_recipe_cost(ingredients),
+    )
+
+
+def normalize_spoonacular_batch(
+    results: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], Dict[str, List[Optional[float]]]]:
+    """
+    Batch version of normalize_spoonacular_recipe for a whole complexSearch result list.
+
+    Same output dicts, but the whole batch is priced in one pass against the
+    price catalog and each recipe's nutrients are read in a single scan.
+
+    Returns (recipes, nutrients) where nutrients is a column table
+    (calories / protein / carbs / fat / fiber), aligned with recipes.
+    """
+    ingredients = [_ingredients(data) for data in results]
+    rows = [extract_nutrients(data) for data in results]
+    costs = estimate_batch_costs(ingredients)
+
+    recipes = [
+        _normalized(data, names, row["calories"], row["protein"], cost)
+        for data, names, row, cost in zip(results, ingredients, rows, costs)
+    ]
+    nutrients = {column: [row[column] for row in rows] for column in NUTRIENT_COLUMNS.values()}
+    return recipes, nutrients
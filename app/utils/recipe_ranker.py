@@ -1,5 +1,13 @@
-from typing import List, Dict, Set
+import os
+from typing import List, Dict
 from app.utils.explanation_builder import build_explanations
+from app.utils.ingredient_vocab import ingredient_vocab
+from app.utils.ranking_engine import rank_recipes_vectorized
+from app.utils.recipe_record import with_ranking
+
+# Below this many candidates the plain Python loop beats NumPy's setup cost
+VECTORIZE_MIN_RECIPES = int(os.getenv("RANK_VECTORIZE_MIN_RECIPES", "64"))
+
 
 def rank_recipes(
     recipes: List[Dict],
@@ -9,9 +17,28 @@ def rank_recipes(
 ) -> List[Dict]:
     """
     Busy-professional ranking with explanations.
+    Large candidate sets (e.g. the local corpus) go through the vectorized engine.
     """
+    if len(recipes) >= VECTORIZE_MIN_RECIPES:
+        return rank_recipes_vectorized(recipes, query_ingredients, constraints, persona)
+    return rank_recipes_scalar(recipes, query_ingredients, constraints, persona)
 
-    query_set: Set[str] = set(q.lower() for q in query_ingredients)
+
+def rank_recipes_scalar(
+    recipes: List[Dict],
+    query_ingredients: List[str],
+    constraints: Dict | None = None,
+    persona: str = "busy_professional",
+) -> List[Dict]:
+    """
+    Reference scorer: one recipe dict at a time.
+    """
+
+    # Query terms -> canonical ingredient ids, once for the whole batch
+    query = ingredient_vocab.query(query_ingredients)
+    # If it's a multi-word query (e.g. a dish name), nothing may match.
+    # We relax the hard filter for longer queries.
+    query_is_complex = any(len(q.split()) > 1 for q in query_ingredients)
     # Use a high default if no time constraint is provided to avoid over-filtering
     max_time = constraints.get("max_time") if constraints else None
     if max_time is None:
@@ -25,23 +52,9 @@ def rank_recipes(
             for ing in recipe.get("ingredients", [])
         }
 
-        matched = ingredients & query_set
-
-        # If it's a multi-word query, the exact intersection will likely be empty.
-        # We relax the hard filter for longer queries.
-        query_is_complex = any(len(q.split()) > 1 for q in query_ingredients)
+        matched = query.matched(ingredient_vocab.recipe_ids(recipe.get("ingredients", ())))
         if not matched and not query_is_complex:
-            # Check for partial matches in query_ingredients
-            has_partial = False
-            for q in query_ingredients:
-                for ing in ingredients:
-                    if q in ing or ing in q:
-                        has_partial = True
-                        break
-                if has_partial: break
-
-            if not has_partial:
-                continue
+            continue
 
         score = 0.0
         reasons = []
@@ -67,7 +80,7 @@ def rank_recipes(
             reasons.append("High protein")
 
         # 🔍 QUERY MATCH
-        match_ratio = len(matched) / len(query_set)
+        match_ratio = matched / query.size if query.size else 0.0
         score += match_ratio * 5
         reasons.append("Strong ingredient match")
 
@@ -77,11 +90,15 @@ def rank_recipes(
             score += max(0, 5 - (cost / 100))
             reasons.append("Good value per serving")
 
-        recipe["match_score"] = round(score, 2)
-        recipe["explanation"] = build_explanations(
-            recipe=recipe,
-            query_ingredients=query_ingredients,
-            persona="busy_professional",
+        recipe = with_ranking(
+            recipe,
+            round(score, 2),
+            build_explanations(
+                recipe=recipe,
+                query_ingredients=query_ingredients,
+                persona="busy_professional",
+                query=query,
+            ),
         )
 
         scored.append(recipe)
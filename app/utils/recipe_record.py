@@ -0,0 +1,137 @@
+import sys
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.schemas.recipe_response import Recipe
+
+
+def _interned(values: Iterable[str]) -> Tuple[str, ...]:
+    # Ingredient and label vocabularies are tiny next to the recipe count: share one str per name
+    return tuple(sys.intern(v) for v in values)
+
+
+@dataclass(frozen=True, slots=True)
+class RecipeRecord:
+    """
+    Compact, immutable form of a normalized recipe.
+
+    Same fields as normalize_spoonacular_recipe's dict, but slotted (no per-instance
+    __dict__), tuple-backed and with interned ingredient / label strings, so large
+    in-memory candidate sets cost a fraction of the dict form.
+
+    Supports read-only mapping access (`record["title"]`, `record.get(...)`) so the
+    rankers and explanation builder work on records and dicts alike.
+    """
+
+    id: Optional[int]
+    title: str
+    ingredients: Tuple[str, ...]
+    instructions: Tuple[str, ...]
+    ready_in_minutes: Optional[int] = None
+    source_url: Optional[str] = None
+    image: Optional[str] = None
+
+    estimated_cost_kes: Optional[int] = None
+    price_per_serving: Optional[float] = None
+    calories: Optional[float] = None
+    dietary_tags: Tuple[str, ...] = ()
+    protein_score: Optional[float] = None
+    protein_per_cost: Optional[float] = None
+    popularity: int = 0
+
+    diets: Tuple[str, ...] = ()
+    cuisines: Tuple[str, ...] = ()
+    dish_types: Tuple[str, ...] = ()
+
+    # Set by ranking
+    match_score: Optional[float] = None
+    explanation: Tuple[str, ...] = ()
+
+    # ---------- MAPPING COMPAT ----------
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    # ---------- CONVERSION ----------
+
+    @classmethod
+    def from_normalized(cls, data: Dict[str, Any]) -> "RecipeRecord":
+        return cls(
+            id=data.get("id"),
+            title=data.get("title", "Untitled Recipe"),
+            ingredients=_interned(data.get("ingredients", [])),
+            instructions=tuple(data.get("instructions", [])),
+            ready_in_minutes=data.get("ready_in_minutes"),
+            source_url=data.get("source_url"),
+            image=data.get("image"),
+            estimated_cost_kes=data.get("estimated_cost_kes"),
+            price_per_serving=data.get("price_per_serving"),
+            calories=data.get("calories"),
+            dietary_tags=_interned(data.get("dietary_tags", [])),
+            protein_score=data.get("protein_score"),
+            protein_per_cost=data.get("protein_per_cost"),
+            popularity=data.get("popularity") or 0,
+            diets=_interned(data.get("diets", [])),
+            cuisines=_interned(data.get("cuisines", [])),
+            dish_types=_interned(data.get("dish_types", [])),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        The normalized dict form (lists, not tuples). For callers that need a real dict.
+        """
+        out = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            out[f.name] = list(value) if isinstance(value, tuple) else value
+        return out
+
+    def to_response(self) -> Recipe:
+        """
+        Build the response model directly (no intermediate dict, no re-validation).
+        """
+        return Recipe.model_construct(
+            id=self.id,
+            title=self.title,
+            ingredients=list(self.ingredients),
+            instructions=list(self.instructions),
+            ready_in_minutes=self.ready_in_minutes,
+            source_url=self.source_url,
+            image=self.image,
+            estimated_cost_kes=self.estimated_cost_kes,
+            price_per_serving=self.price_per_serving,
+            calories=self.calories,
+            dietary_tags=list(self.dietary_tags),
+            protein_score=self.protein_score,
+            protein_per_cost=self.protein_per_cost,
+            popularity=self.popularity,
+            diets=list(self.diets),
+            cuisines=list(self.cuisines),
+            dish_types=list(self.dish_types),
+            match_score=self.match_score,
+            explanation=list(self.explanation),
+        )
+
+
+RecipeLike = Union[Dict[str, Any], RecipeRecord]
+
+
+def with_ranking(recipe: RecipeLike, match_score: float, explanation: List[str]) -> RecipeLike:
+    """
+    Attach ranking output: dicts are updated in place (legacy behaviour), records are copied.
+    """
+    if isinstance(recipe, RecipeRecord):
+        return replace(recipe, match_score=match_score, explanation=tuple(explanation))
+    recipe["match_score"] = match_score
+    recipe["explanation"] = explanation
+    return recipe
+
+
+def to_response(recipe: RecipeLike) -> Union[Dict[str, Any], Recipe]:
+    return recipe.to_response() if isinstance(recipe, RecipeRecord) else recipe
@@ -0,0 +1,71 @@
+"""
+Per-recipe normalize_spoonacular_recipe vs normalize_spoonacular_batch
+on the recorded complexSearch payload.
+
+    python -m benchmarks.bench_normalizer --repeat 200
+"""
+import argparse
+import time
+
+from app.utils.nutrition_utils import NUTRIENT_COLUMNS
+from app.utils.recipe_normalizer import normalize_spoonacular_batch, normalize_spoonacular_recipe
+from benchmarks.payloads import load_complex_search
+
+
+def best_of(fn, results, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(results)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_recipe(results):
+    return [normalize_spoonacular_recipe(r) for r in results]
+
+
+def _nutrient(data, wanted):
+    # One scan per nutrient, the way calculate_protein_score / extract_calories work
+    for nutrient in data.get("nutrition", {}).get("nutrients", []):
+        if nutrient.get("name", "").lower() == wanted:
+            return float(nutrient.get("amount", 0))
+    return None
+
+
+def per_recipe_all_nutrients(results):
+    # What the per-recipe path costs once it also needs carbs / fat / fiber
+    recipes = per_recipe(results)
+    table = {column: [_nutrient(r, name) for r in results] for name, column in NUTRIENT_COLUMNS.items()}
+    return recipes, table
+
+
+def batch(results):
+    return normalize_spoonacular_batch(results)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    results = load_complex_search()
+    assert per_recipe(results) == batch(results), "batch normalizer diverged from the per-recipe one"
+
+    assert per_recipe_all_nutrients(results)[1] == normalize_spoonacular_batch(results)[1]
+
+    legacy = best_of(per_recipe, results, args.repeat)
+    legacy_all = best_of(per_recipe_all_nutrients, results, args.repeat)
+    fast = best_of(batch, results, args.repeat)
+    rows = (
+        ("per-recipe (calories + protein)", legacy),
+        ("per-recipe (all 5 nutrients)", legacy_all),
+        ("batch (all 5 nutrients)", fast),
+    )
+    for label, seconds in rows:
+        print(f"{label:<32} {len(results):>5} recipes  {seconds * 1e3:8.3f} ms  {seconds / len(results) * 1e6:8.2f} µs/recipe")
+    print(f"speedup vs per-recipe: {legacy / fast:.2f}x, vs per-recipe with all nutrients: {legacy_all / fast:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
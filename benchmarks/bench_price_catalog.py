@@ -0,0 +1,66 @@
+"""
+Pricing a result batch against the compiled price catalog: the shipped catalog
+and a synthetic one with thousands of entries, cold (fresh compilation, empty
+resolution cache) and warm.
+
+    python -m benchmarks.bench_price_catalog --entries 5000 --repeat 50
+"""
+import argparse
+import random
+import time
+
+from app.utils.cost_calculator import CompiledCatalog, load_price_table, price_catalog
+from app.utils.recipe_normalizer import normalize_spoonacular_batch
+from benchmarks.payloads import load_complex_search
+
+WORDS = [
+    "red", "green", "smoked", "roasted", "wild", "baby", "sweet", "hot", "dark", "light",
+    "kenyan", "coastal", "highland", "lake", "farm", "spiced", "salted", "pickled", "toasted", "golden",
+]
+
+
+def synthetic_prices(base, entries: int, seed: int = 7):
+    rng = random.Random(seed)
+    prices = dict(base)
+    names = list(base)
+    while len(prices) < entries:
+        words = rng.sample(WORDS, rng.randint(1, 2))
+        prices[" ".join(words + [rng.choice(names)])] = rng.randint(5, 1500)
+    return prices
+
+
+def time_batch(prices, batch, repeat: int, warm: bool) -> float:
+    best = float("inf")
+    compiled = CompiledCatalog(prices)
+    for _ in range(repeat):
+        if not warm:
+            compiled.cache.clear()
+        start = time.perf_counter()
+        [sum(compiled.resolve(name) for name in ingredients) for ingredients in batch]
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    recipes, _ = normalize_spoonacular_batch(load_complex_search())
+    batch = [r["ingredients"] for r in recipes]
+    shipped = load_price_table(price_catalog.path, price_catalog.region)
+    large = synthetic_prices(shipped, args.entries)
+
+    start = time.perf_counter()
+    CompiledCatalog(large)
+    print(f"compile {len(large)} entries: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for label, prices in (("shipped", shipped), (f"synthetic[{len(large)}]", large)):
+        for warm in (False, True):
+            seconds = time_batch(prices, batch, args.repeat, warm)
+            print(f"{label:>18} {'warm' if warm else 'cold'}: {seconds * 1e6:8.1f} us / {len(batch)} recipes")
+
+
+if __name__ == "__main__":
+    main()
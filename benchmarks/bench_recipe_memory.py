@@ -0,0 +1,78 @@
+"""
+Memory benchmark: normalized recipe dicts vs RecipeRecord.
+
+    python -m benchmarks.bench_recipe_memory --recipes 100000
+
+Ingredient and label strings are built fresh per recipe, as they are when
+decoded from JSON or loaded from the database, so interning is measured fairly.
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+
+from app.utils.recipe_record import RecipeRecord
+
+VOCAB = [f"ingredient {i}" for i in range(800)]
+CUISINES = ["Italian", "Mexican", "Indian", "Kenyan", "Thai"]
+DISH_TYPES = ["lunch", "main course", "dinner", "side dish"]
+
+
+def fresh(s: str) -> str:
+    # A distinct str object with the same value (what json.loads hands us)
+    return "".join(list(s))
+
+
+def make_dicts(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "title": f"Benchmark recipe {i}",
+            "ingredients": sorted(fresh(v) for v in rng.sample(VOCAB, 12)),
+            "instructions": [f"Step {s} of recipe {i}." for s in range(4)],
+            "ready_in_minutes": rng.randint(10, 90),
+            "source_url": f"https://example.com/recipes/{i}",
+            "image": f"https://img.example.com/{i}.jpg",
+            "estimated_cost_kes": rng.randint(100, 900),
+            "price_per_serving": rng.uniform(50, 500),
+            "calories": rng.uniform(200, 900),
+            "dietary_tags": [fresh("Gluten Free")] if i % 3 == 0 else [],
+            "protein_score": rng.uniform(5, 50),
+            "protein_per_cost": rng.uniform(0, 1),
+            "popularity": rng.randint(0, 1000),
+            "diets": [fresh("gluten free")] if i % 3 == 0 else [],
+            "cuisines": [fresh(rng.choice(CUISINES))],
+            "dish_types": [fresh(t) for t in rng.sample(DISH_TYPES, 2)],
+        }
+        for i in range(n)
+    ]
+
+
+def measure(label: str, build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<14} {len(data):>8} recipes  {size / 2**20:9.1f} MiB  {size / len(data):8.0f} B/recipe")
+    del data
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recipes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    as_dicts = measure("dict", lambda: make_dicts(args.recipes))
+    as_records = measure(
+        "RecipeRecord",
+        # Build each dict and convert it immediately, as normalize_and_dedupe does
+        lambda: [RecipeRecord.from_normalized(d) for d in make_dicts(args.recipes)],
+    )
+    print(f"reduction: {1 - as_records / as_dicts:.0%}")
+
+
+if __name__ == "__main__":
+    main()
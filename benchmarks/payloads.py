@@ -0,0 +1,143 @@
+"""
+Recorded upstream payloads for the benchmarks.
+
+    python -m benchmarks.payloads --record "chicken pasta" --number 100   # needs SPOONACULAR_API_KEY
+    python -m benchmarks.payloads --synthesize 40                         # offline, deterministic
+
+Files live in benchmarks/data/. complex_search.json is checked in so the
+benchmarks run offline; re-record it to track real payload drift.
+"""
+import argparse
+import json
+import os
+import random
+from pathlib import Path
+from typing import Dict, List
+
+DATA_DIR = Path(__file__).parent / "data"
+COMPLEX_SEARCH = DATA_DIR / "complex_search.json"
+OLLAMA_INTENTS = DATA_DIR / "ollama_intents.json"
+
+# Full Spoonacular nutrient block order (names as the API returns them)
+NUTRIENTS = [
+    ("Calories", "kcal"), ("Fat", "g"), ("Saturated Fat", "g"), ("Carbohydrates", "g"),
+    ("Net Carbohydrates", "g"), ("Sugar", "g"), ("Cholesterol", "mg"), ("Sodium", "mg"),
+    ("Protein", "g"), ("Vitamin C", "mg"), ("Manganese", "mg"), ("Fiber", "g"),
+    ("Vitamin B6", "mg"), ("Iron", "mg"), ("Potassium", "mg"), ("Magnesium", "mg"),
+    ("Phosphorus", "mg"), ("Vitamin A", "IU"), ("Calcium", "mg"), ("Zinc", "mg"),
+]
+INGREDIENTS = [
+    "chicken breast", "garlic", "onion", "tomato", "rice", "olive oil", "salt", "pepper",
+    "beans", "potato", "beef", "fish", "egg", "spinach", "coconut milk", "ginger",
+    "lemon juice", "cumin", "pasta", "parmesan", "butter", "flour", "milk", "carrot",
+]
+CUISINES = ["Italian", "Mexican", "Indian", "African", "Thai", "American"]
+DISH_TYPES = ["lunch", "main course", "main dish", "dinner", "side dish", "salad"]
+DIETS = ["gluten free", "dairy free", "lacto ovo vegetarian", "vegan", "paleolithic"]
+
+
+def synthesize_complex_search(n: int, seed: int = 7) -> Dict:
+    """
+    A complexSearch response with addRecipeInformation + addRecipeNutrition + fillIngredients,
+    shaped like the real thing (same keys, nesting and list sizes).
+    """
+    rng = random.Random(seed)
+    results = []
+    for i in range(n):
+        names = rng.sample(INGREDIENTS, rng.randint(5, 14))
+        results.append({
+            "id": 600000 + i,
+            "title": f"{rng.choice(['Quick', 'Easy', 'Spicy', 'Creamy'])} {names[0].title()} {rng.choice(['Bowl', 'Stew', 'Bake', 'Stir Fry'])}",
+            "image": f"https://img.spoonacular.com/recipes/{600000 + i}-312x231.jpg",
+            "readyInMinutes": rng.choice([15, 20, 25, 30, 45, 60, 90]),
+            "servings": rng.randint(1, 6),
+            "sourceUrl": f"https://example.com/recipe/{600000 + i}",
+            "pricePerServing": round(rng.uniform(40, 600), 2),
+            "aggregateLikes": rng.randint(0, 3000),
+            "healthScore": rng.randint(0, 100),
+            "vegetarian": rng.random() < 0.3,
+            "vegan": rng.random() < 0.1,
+            "glutenFree": rng.random() < 0.4,
+            "dairyFree": rng.random() < 0.4,
+            "cuisines": rng.sample(CUISINES, rng.randint(0, 2)),
+            "dishTypes": rng.sample(DISH_TYPES, rng.randint(1, 3)),
+            "diets": rng.sample(DIETS, rng.randint(0, 2)),
+            "extendedIngredients": [
+                {
+                    "id": 1000 + INGREDIENTS.index(name),
+                    "name": name if rng.random() < 0.8 else name.title(),
+                    "amount": round(rng.uniform(0.25, 4), 2),
+                    "unit": rng.choice(["cup", "g", "tbsp", "tsp", ""]),
+                    "original": f"1 {name}",
+                }
+                for name in names
+            ],
+            "analyzedInstructions": [{
+                "name": "",
+                "steps": [
+                    {"number": s + 1, "step": f"Step {s + 1}: prepare the {rng.choice(names)}."}
+                    for s in range(rng.randint(3, 9))
+                ],
+            }],
+            "nutrition": {
+                "nutrients": [
+                    {"name": name, "amount": round(rng.uniform(0.5, 900), 2), "unit": unit}
+                    for name, unit in NUTRIENTS
+                ],
+            },
+        })
+    return {"results": results, "offset": 0, "number": n, "totalResults": n}
+
+
+def record_complex_search(query: str, number: int) -> Dict:
+    import httpx
+
+    params = {
+        "apiKey": os.environ["SPOONACULAR_API_KEY"],
+        "query": query,
+        "addRecipeInformation": True,
+        "addRecipeNutrition": True,
+        "fillIngredients": True,
+        "number": number,
+        "sort": "popularity",
+    }
+    response = httpx.get("https://api.spoonacular.com/recipes/complexSearch", params=params, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+def load_complex_search(path: Path = COMPLEX_SEARCH) -> List[Dict]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def load_ollama_intents(path: Path = OLLAMA_INTENTS) -> Dict[str, Dict]:
+    """
+    Canned Phi-3 intent parses, keyed by the user query that produced them.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--record", metavar="QUERY")
+    group.add_argument("--synthesize", type=int, metavar="N")
+    parser.add_argument("--number", type=int, default=100)
+    parser.add_argument("--out", type=Path, default=COMPLEX_SEARCH)
+    args = parser.parse_args()
+
+    if args.record:
+        payload = record_complex_search(args.record, args.number)
+    else:
+        payload = synthesize_complex_search(args.synthesize)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    print(f"wrote {len(payload['results'])} recipes to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
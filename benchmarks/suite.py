@@ -0,0 +1,393 @@
+"""
+Reproducible benchmark suite for the recipe search pipeline.
+
+    python -m benchmarks.suite                              # everything, results to benchmarks/results/<commit>.json
+    python -m benchmarks.suite --only rank --quick          # name filter, fewer iterations
+    python -m benchmarks.suite --compare benchmarks/results/abc1234.json
+
+Runs offline: Spoonacular answers come from benchmarks/data/complex_search.json and
+Phi-3 from benchmarks/data/ollama_intents.json, served through mock transports on the
+real provider clients with injected latency (--spoonacular-ms, --ollama-first-token-ms,
+--ollama-token-ms), so the end-to-end numbers include the HTTP client, cache and
+retry layers but not the network.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+from unittest.mock import patch
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (register tables)
+from app.crud.recipe import bulk_create_recipes, create_recipe
+from app.db.database import Base
+from app.schemas.intent import IntentSchema
+from app.utils.explanation_builder import build_explanations
+from app.utils.hydration_analytics import analyze_history
+from app.utils.intent_normalizer import normalize_intent
+from app.utils.recipe_normalizer import normalize_spoonacular_batch, normalize_spoonacular_recipe
+from app.utils.recipe_ranker import rank_recipes
+from benchmarks.payloads import load_complex_search, load_ollama_intents
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Search queries for the end-to-end runs: lexicon fast path and LLM-parsed ones
+E2E_QUERIES = [
+    "quick vegan curry under 30 minutes",
+    "cheap high protein lunch",
+    "chicken pasta",
+    "kenyan dinner for my family without gluten",
+    "what can I make with leftover rice and eggs that my kids will eat",
+    "comfort food but healthy-ish for a cold night",
+]
+
+# A regression is flagged when the median gets this much slower
+REGRESSION_THRESHOLD = 0.10
+
+
+# ---------- HARNESS ----------
+
+def summarize(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+    return {
+        "runs": len(samples),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 3),
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+        "p95_us": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1e6, 3),
+        "min_us": round(ordered[0] * 1e6, 3),
+    }
+
+
+def time_sync(fn: Callable[[], object], repeat: int, number: int = 1, setup: Optional[Callable] = None) -> Dict:
+    """
+    `repeat` samples of `number` calls each; reported per call.
+    `setup` runs before every sample, outside the timed region.
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return summarize(samples)
+
+
+async def time_async(fn: Callable[[], Awaitable], repeat: int, setup: Optional[Callable] = None) -> Dict:
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+# ---------- MICRO-BENCHMARKS ----------
+
+def bench_normalize(raw: List[Dict], repeat: int) -> Dict[str, Dict]:
+    return {
+        "normalize_spoonacular_recipe": time_sync(
+            lambda: [normalize_spoonacular_recipe(r) for r in raw], repeat, number=5,
+        ),
+        "normalize_spoonacular_batch": time_sync(lambda: normalize_spoonacular_batch(raw), repeat, number=5),
+    }
+
+
+def bench_rank(raw: List[Dict], repeat: int) -> Dict[str, Dict]:
+    normalized, _ = normalize_spoonacular_batch(raw)
+    large = [dict(r, id=i, title=f"{r['title']} {i}") for i in range(10) for r in normalized]
+    constraints = {"max_time": 60}
+    return {
+        f"rank_recipes[{len(normalized)}]": time_sync(
+            lambda: rank_recipes([dict(r) for r in normalized], ["chicken breast"], constraints), repeat, number=5,
+        ),
+        f"rank_recipes[{len(large)}]": time_sync(
+            lambda: rank_recipes([dict(r) for r in large], ["chicken breast"], constraints), repeat,
+        ),
+    }
+
+
+def bench_explanations(raw: List[Dict], repeat: int) -> Dict[str, Dict]:
+    normalized, _ = normalize_spoonacular_batch(raw)
+
+    def run():
+        for r in normalized:
+            build_explanations(recipe=r, query_ingredients=["chicken breast", "garlic"], persona="busy_professional")
+
+    return {"build_explanations": time_sync(run, repeat, number=5)}
+
+
+def bench_normalize_intent(repeat: int) -> Dict[str, Dict]:
+    intents = [
+        IntentSchema(query="healthy breakfast under 10 minutes"),
+        IntentSchema(query="chicken stew", max_time_minutes=40),
+        IntentSchema(query="vegan curry", diet="vegan", intolerances=["Gluten"]),
+    ]
+
+    def run():
+        for intent in intents:
+            normalize_intent(intent.model_copy())
+
+    return {"normalize_intent": time_sync(run, repeat, number=20)}
+
+
+def bench_hydration(repeat: int) -> Dict[str, Dict]:
+    # A year of logs, three drinks a day; hot (31°C) days add 30 ml per °C
+    start = datetime(2025, 9, 1)
+    log = [
+        {
+            "timestamp": (start + timedelta(days=d, hours=hour)).isoformat(),
+            "amount": (2000 + (300 if d % 3 == 0 else 0)) * share,
+            "weather": f"Sunny, {31 if d % 3 == 0 else 21}°C",
+        }
+        for d in range(365)
+        for hour, share in ((7, 0.5), (12, 0.3), (16, 0.2))
+    ]
+    return {f"analyze_history[{len(log)}]": time_sync(lambda: analyze_history(log, "Sunny, 30°C"), repeat)}
+
+
+def bench_crud(raw: List[Dict], repeat: int) -> Dict[str, Dict]:
+    normalized, _ = normalize_spoonacular_batch(raw)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        make_session = sessionmaker(bind=engine, autoflush=False)
+
+        def reset():
+            Base.metadata.drop_all(bind=engine)
+            Base.metadata.create_all(bind=engine)
+
+        def ingest(fn):
+            def run():
+                db = make_session()
+                try:
+                    fn(db)
+                finally:
+                    db.close()
+            return run
+
+        def per_recipe(db):
+            for r in normalized:
+                create_recipe(db, r)
+
+        results[f"crud.create_recipe[{len(normalized)}]"] = time_sync(ingest(per_recipe), repeat, setup=reset)
+        results[f"crud.bulk_create_recipes[{len(normalized)}]"] = time_sync(
+            ingest(lambda db: bulk_create_recipes(db, normalized)), repeat, setup=reset,
+        )
+        engine.dispose()
+    return results
+
+
+# ---------- END-TO-END ----------
+
+class _DelayedLines(httpx.AsyncByteStream):
+    """Ollama-style NDJSON token stream with first-token and per-token latency."""
+
+    def __init__(self, lines: List[bytes], first_delay: float, per_line_delay: float):
+        self.lines = lines
+        self.first_delay = first_delay
+        self.per_line_delay = per_line_delay
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.first_delay)
+        for line in self.lines:
+            if self.per_line_delay:
+                await asyncio.sleep(self.per_line_delay)
+            yield line
+
+
+def spoonacular_handler(raw: List[Dict], latency: float):
+    async def handle(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        number = int(request.url.params.get("number", 10))
+        return httpx.Response(
+            200,
+            json={"results": raw[:number], "offset": 0, "number": number, "totalResults": len(raw)},
+            headers={"X-API-Quota-Request": "1.5", "X-API-Quota-Used": "10", "X-API-Quota-Left": "140"},
+        )
+    return handle
+
+
+def ollama_handler(intents: Dict[str, Dict], first_token: float, per_token: float, token_chars: int = 4):
+    async def handle(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["prompt"]
+        user_input = prompt.rsplit("User Request:", 1)[-1].split("\n", 1)[0].strip()
+        text = json.dumps(intents.get(user_input, {"query": user_input}))
+        tokens = [text[i:i + token_chars] for i in range(0, len(text), token_chars)]
+        lines = [json.dumps({"response": t, "done": False}).encode() + b"\n" for t in tokens]
+        lines.append(json.dumps({"response": "", "done": True}).encode() + b"\n")
+        return httpx.Response(200, stream=_DelayedLines(lines, first_token, per_token))
+    return handle
+
+
+async def bench_e2e(raw: List[Dict], repeat: int, spoonacular_s: float, first_token_s: float, token_s: float) -> Dict[str, Dict]:
+    from app.api.v1.endpoints import recipes as recipes_endpoint
+    from app.main import app
+    from app.services import llm_service, local_corpus, spoonacular_service
+    from app.services.http_clients import registry
+    from app.services.quota import QuotaBudget
+
+    registry._clients["spoonacular"] = httpx.AsyncClient(
+        base_url=spoonacular_service.BASE_URL,
+        transport=httpx.MockTransport(spoonacular_handler(raw, spoonacular_s)),
+    )
+    registry._clients["ollama"] = httpx.AsyncClient(
+        transport=httpx.MockTransport(ollama_handler(load_ollama_intents(), first_token_s, token_s)),
+    )
+
+    def clear_caches():
+        spoonacular_service.search_cache.clear()
+        llm_service.intent_cache.clear()
+        recipes_endpoint.response_cache.clear()
+
+    results = {}
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch.object(spoonacular_service, "SPOONACULAR_API_KEY", "benchmark"))
+        stack.enter_context(patch.object(spoonacular_service, "quota", QuotaBudget("spoonacular", capacity=1e12)))
+        stack.enter_context(patch.object(local_corpus, "LOCAL_CORPUS_ENABLED", False))
+        stack.enter_context(contextlib.redirect_stdout(io.StringIO()))  # pipeline traces
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def search_all():
+                for query in E2E_QUERIES:
+                    response = await client.post("/api/v1/recipes/search", json={"query": query})
+                    response.raise_for_status()
+
+            async def search_concurrent():
+                responses = await asyncio.gather(*(
+                    client.post("/api/v1/recipes/search", json={"query": q}) for q in E2E_QUERIES
+                ))
+                for response in responses:
+                    response.raise_for_status()
+
+            cold = await time_async(search_all, repeat, setup=clear_caches)
+            cold_concurrent = await time_async(search_concurrent, repeat, setup=clear_caches)
+            warm = await time_async(search_all, repeat)
+
+    await registry.close_all()
+    n = len(E2E_QUERIES)
+    results[f"e2e.search_cold[{n} sequential]"] = cold
+    results[f"e2e.search_cold[{n} concurrent]"] = cold_concurrent
+    results[f"e2e.search_warm[{n} sequential]"] = warm
+    return results
+
+
+# ---------- RESULTS ----------
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent, text=True, stderr=subprocess.DEVNULL,
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: Dict, baseline_path: Path) -> int:
+    """
+    Print median deltas against a previous results file. Returns the number of regressions.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = 0
+    print(f"\ncompared with {baseline['meta']['commit']} ({baseline_path}):")
+    for name, stats in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"  {name:<48} new")
+            continue
+        delta = stats["median_us"] / old["median_us"] - 1
+        flag = ""
+        if delta > REGRESSION_THRESHOLD:
+            flag = "  <-- REGRESSION"
+            regressions += 1
+        print(f"  {name:<48} {old['median_us']:>12.1f} -> {stats['median_us']:>12.1f} us  {delta:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", default=None, help="run benchmarks whose group name contains this")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations (smoke-check the suite)")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="previous results JSON to diff against")
+    parser.add_argument("--spoonacular-ms", type=float, default=150)
+    parser.add_argument("--ollama-first-token-ms", type=float, default=300)
+    parser.add_argument("--ollama-token-ms", type=float, default=15)
+    args = parser.parse_args()
+
+    repeat = 5 if args.quick else 50
+    e2e_repeat = 2 if args.quick else 10
+    raw = load_complex_search()
+
+    groups = {
+        "normalize": lambda: bench_normalize(raw, repeat),
+        "rank": lambda: bench_rank(raw, repeat),
+        "explanations": lambda: bench_explanations(raw, repeat),
+        "intent": lambda: bench_normalize_intent(repeat),
+        "hydration": lambda: bench_hydration(repeat),
+        "crud": lambda: bench_crud(raw, max(3, repeat // 10)),
+        "e2e": lambda: asyncio.run(bench_e2e(
+            raw, e2e_repeat,
+            args.spoonacular_ms / 1000, args.ollama_first_token_ms / 1000, args.ollama_token_ms / 1000,
+        )),
+    }
+
+    results: Dict[str, Dict] = {}
+    for group, run in groups.items():
+        if args.only and args.only not in group:
+            continue
+        for name, stats in run().items():
+            results[name] = stats
+            print(f"{name:<48} median {stats['median_us']:>12.1f} us  p95 {stats['p95_us']:>12.1f} us  ({stats['runs']} runs)")
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "payload_recipes": len(raw),
+            "latency_ms": {
+                "spoonacular": args.spoonacular_ms,
+                "ollama_first_token": args.ollama_first_token_ms,
+                "ollama_token": args.ollama_token_ms,
+            },
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    out = args.out or RESULTS_DIR / f"{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {out}")
+
+    if args.compare:
+        regressions = compare(report, args.compare)
+        raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Keep app start-up (create_all) away from the working tree's ./recipes.db
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='quickbite-tests-')}/recipes.db")
+
+import app.models  # noqa: E402,F401  (register tables)
+from app.db.database import Base  # noqa: E402
+from app.services import local_corpus  # noqa: E402
+from app.services.ingredient_index import IngredientIndex  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def local_corpus_db(monkeypatch):
+    """
+    Every test gets an empty in-memory corpus, so background persist_recipes
+    tasks never write mocked recipes anywhere a later search could serve them.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(local_corpus, "session_factory", sessionmaker(bind=engine, autoflush=False))
+    monkeypatch.setattr(local_corpus, "ingredient_index", IngredientIndex())
+    yield engine
+    engine.dispose()
@@ -0,0 +1,42 @@
+from app.utils.recipe_normalizer import normalize_spoonacular_batch, normalize_spoonacular_recipe
+from benchmarks.payloads import synthesize_complex_search
+
+
+def test_batch_matches_per_recipe_on_payload():
+    results = synthesize_complex_search(25)["results"]
+    recipes, nutrients = normalize_spoonacular_batch(results)
+
+    assert recipes == [normalize_spoonacular_recipe(r) for r in results]
+    assert set(nutrients) == {"calories", "protein", "carbs", "fat", "fiber"}
+    assert all(len(column) == len(results) for column in nutrients.values())
+    assert nutrients["protein"] == [r["protein_score"] for r in recipes]
+
+
+def test_batch_handles_layout_changes_and_gaps():
+    results = [
+        {"title": "A", "nutrition": {"nutrients": [{"name": "Calories", "amount": 100}, {"name": "Fiber", "amount": 3}]}},
+        # Same length, different order: must rescan rather than reuse positions
+        {"title": "B", "nutrition": {"nutrients": [{"name": "Fiber", "amount": 4}, {"name": "Calories", "amount": 200}]}},
+        {"title": "C", "instructions": "Boil. Drain."},
+        {"title": "D", "nutrition": {"nutrients": [{"name": "protein", "amount": 9}, {"name": "Protein", "amount": 1}]}},
+    ]
+    recipes, nutrients = normalize_spoonacular_batch(results)
+
+    assert recipes == [normalize_spoonacular_recipe(r) for r in results]
+    assert nutrients["calories"] == [100.0, 200.0, None, None]
+    assert nutrients["fiber"] == [3.0, 4.0, None, None]
+    assert nutrients["protein"] == [None, None, None, 9.0]
+    assert recipes[2]["instructions"] == ["Boil", "Drain"]
+
+
+def test_batch_rescans_when_same_length_layout_adds_a_nutrient():
+    results = [
+        {"title": "A", "nutrition": {"nutrients": [{"name": "Calories", "amount": 100}, {"name": "Sugar", "amount": 5}]}},
+        # Same length, Calories still at 0, but Protein where A had Sugar
+        {"title": "B", "nutrition": {"nutrients": [{"name": "Calories", "amount": 400}, {"name": "Protein", "amount": 30}]}},
+    ]
+    recipes, nutrients = normalize_spoonacular_batch(results)
+
+    assert recipes == [normalize_spoonacular_recipe(r) for r in results]
+    assert nutrients["protein"] == [None, 30.0]
+    assert recipes[1]["protein_score"] == 30.0
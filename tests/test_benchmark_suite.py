@@ -0,0 +1,27 @@
+import asyncio
+import json
+
+from benchmarks import suite
+from benchmarks.payloads import load_complex_search
+
+
+def test_e2e_benchmark_runs_offline():
+    raw = load_complex_search()[:10]
+    results = asyncio.run(suite.bench_e2e(raw, repeat=1, spoonacular_s=0, first_token_s=0, token_s=0))
+
+    assert set(results) == {
+        f"e2e.search_cold[{len(suite.E2E_QUERIES)} sequential]",
+        f"e2e.search_cold[{len(suite.E2E_QUERIES)} concurrent]",
+        f"e2e.search_warm[{len(suite.E2E_QUERIES)} sequential]",
+    }
+    assert all(r["runs"] == 1 and r["median_us"] > 0 for r in results.values())
+
+
+def test_compare_flags_regressions(tmp_path, capsys):
+    baseline = {"meta": {"commit": "base"}, "results": {"a": {"median_us": 100.0}, "b": {"median_us": 100.0}}}
+    path = tmp_path / "base.json"
+    path.write_text(json.dumps(baseline))
+
+    current = {"results": {"a": {"median_us": 150.0}, "b": {"median_us": 101.0}, "c": {"median_us": 1.0}}}
+    assert suite.compare(current, path) == 1
+    assert "REGRESSION" in capsys.readouterr().out
@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (register tables)
+from app.crud.recipe import bulk_create_recipes, resolve_ingredient_ids
+from app.db.database import Base
+from app.models.models import IngredientDB, RecipeDB, recipe_ingredients
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def make_recipe(rid, ingredients):
+    return {
+        "id": rid,
+        "title": f"Recipe {rid}",
+        "ingredients": ingredients,
+        "instructions": ["Cook."],
+        "ready_in_minutes": 15,
+    }
+
+
+def test_bulk_create_recipes_shares_ingredients_and_is_idempotent():
+    db = make_session()
+    recipes = [
+        make_recipe(1, ["Garlic", "onion", " garlic "]),
+        make_recipe(2, ["onion", "rice"]),
+        make_recipe(2, ["onion", "rice"]),  # duplicate inside the batch
+        make_recipe(None, ["rice"]),
+    ]
+
+    assert bulk_create_recipes(db, recipes) == 3
+    assert bulk_create_recipes(db, recipes[:2]) == 0
+
+    assert db.scalar(select(func.count()).select_from(RecipeDB)) == 3
+    assert sorted(db.scalars(select(IngredientDB.name))) == ["garlic", "onion", "rice"]
+    assert db.scalar(select(func.count()).select_from(recipe_ingredients)) == 5
+
+    recipe = db.scalars(select(RecipeDB).where(RecipeDB.spoonacular_id == 1)).one()
+    assert sorted(i.name for i in recipe.ingredients) == ["garlic", "onion"]
+
+
+def test_resolve_ingredient_ids_reuses_existing_rows():
+    db = make_session()
+    first = resolve_ingredient_ids(db, ["salt", "pepper"])
+    second = resolve_ingredient_ids(db, ["Salt", "sugar"])
+    assert second["salt"] == first["salt"]
+    assert set(second) == {"salt", "sugar"}
+
+
+def test_concurrent_persists_of_the_same_batch_do_not_fail(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'corpus.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    recipes = [make_recipe(i, ["onion", f"spice {i % 7}"]) for i in range(1, 301)]
+    barrier = threading.Barrier(4)
+
+    def persist():
+        db = factory()
+        try:
+            barrier.wait()
+            return bulk_create_recipes(db, recipes)
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        written = list(pool.map(lambda _: persist(), range(4)))
+
+    assert sum(written) == 300
+    db = factory()
+    assert db.scalar(select(func.count()).select_from(RecipeDB)) == 300
+    assert db.scalar(select(func.count()).select_from(recipe_ingredients)) == 600
+    db.close()
+    engine.dispose()
@@ -0,0 +1,126 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from app.services.http_clients import ProviderClientRegistry, ProviderConfig
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_opens_after_threshold_and_recovers_through_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker("fake", failure_threshold=3, recovery_time=10, clock=clock)
+
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 10
+    breaker.before_call()  # the single half-open probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.available()
+
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker("fake", failure_threshold=1, recovery_time=5, clock=clock)
+    breaker.record_failure()
+    clock.now = 5
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.counters["opened"] == 2
+
+
+def test_adaptive_timeout_tracks_p95():
+    breaker = CircuitBreaker("fake", min_samples=5, timeout_multiplier=3, min_timeout=0.5)
+    assert breaker.timeout(30) == 30  # not enough samples yet
+
+    for latency in (0.4, 0.5, 0.5, 0.6, 1.0):
+        breaker.record_success(latency)
+    assert breaker.timeout(30) == pytest.approx(3.0)
+    assert breaker.timeout(2) == 2  # never above the caller's ceiling
+
+
+def test_latency_is_tracked_per_operation():
+    breaker = CircuitBreaker("fake", failure_threshold=2, min_samples=5, timeout_multiplier=3, min_timeout=0.1)
+    for _ in range(5):
+        breaker.record_success(0.2, "intent")
+    assert breaker.timeout(60, "intent") == pytest.approx(0.6)
+    # Slow operations keep their full ceiling until they have samples of their own
+    assert breaker.timeout(60, "recipe_intent") == 60
+    assert breaker.timeout(30) == 30
+    assert breaker.snapshot()["latency"]["intent"]["samples"] == 5
+
+    # ...but failures from any operation count towards the one provider breaker
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_registry_fails_fast_once_open():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    async def run():
+        registry = ProviderClientRegistry()
+        registry.register(ProviderConfig(name="fake", base_url="http://fake", retries=0, breaker_failures=2))
+        registry._clients["fake"] = httpx.AsyncClient(base_url="http://fake", transport=httpx.MockTransport(handler))
+
+        for _ in range(2):
+            response = await registry.request("fake", "GET", "/thing")
+            assert response.status_code == 500
+        assert not registry.available("fake")
+
+        with pytest.raises(CircuitOpenError):
+            await registry.request("fake", "GET", "/thing")
+        assert len(calls) == 2
+        assert registry.breaker_states()["fake"]["state"] == OPEN
+        await registry.close_all()
+
+    asyncio.run(run())
+
+
+def test_streamed_5xx_trips_the_breaker():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503, text="overloaded")
+
+    async def run():
+        registry = ProviderClientRegistry()
+        registry.register(ProviderConfig(name="fake", base_url="http://fake", breaker_failures=5))
+        registry._clients["fake"] = httpx.AsyncClient(base_url="http://fake", transport=httpx.MockTransport(handler))
+
+        for _ in range(5):
+            with pytest.raises(httpx.HTTPStatusError):
+                async with registry.stream("fake", "POST", "/api/generate") as response:
+                    response.raise_for_status()
+        assert registry.breaker("fake").counters["failures"] == 5
+        assert registry.breaker_states()["fake"]["state"] == OPEN
+
+        with pytest.raises(CircuitOpenError):
+            async with registry.stream("fake", "POST", "/api/generate"):
+                pass
+        assert len(calls) == 5
+        await registry.close_all()
+
+    asyncio.run(run())
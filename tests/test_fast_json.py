@@ -0,0 +1,43 @@
+import json
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.api.utils.responses import FastJSONResponse, dumps
+from app.api.v1.endpoints import recipes as recipes_endpoint
+from app.main import app
+from app.schemas.intent import IntentSchema
+from app.schemas.recipe_response import Recipe
+from app.utils.recipe_record import RecipeRecord
+
+client = TestClient(app)
+
+
+def test_records_encode_like_the_response_model():
+    record = RecipeRecord.from_normalized({
+        "id": 3, "title": "Ugali", "ingredients": ["maize flour"], "instructions": ["Stir."], "diets": ["vegan"],
+    })
+    encoded = json.loads(dumps(record))
+    expected = Recipe.model_validate(record.as_dict()).model_dump(mode="json")
+    expected.pop("reasons")
+    assert encoded == expected
+    assert FastJSONResponse(b'{"cached":true}').body == b'{"cached":true}'
+
+
+@patch("app.api.v1.endpoints.recipes.search_local", return_value=[])
+@patch("app.api.v1.endpoints.recipes.parse_user_intent")
+@patch("app.api.v1.endpoints.recipes.search_recipes")
+def test_search_response_bytes_are_cached(mock_search, mock_parse, mock_local):
+    recipes_endpoint.response_cache.clear()
+    mock_parse.return_value = IntentSchema(query="beans")
+    mock_search.return_value = [{"id": 9, "title": "Bean Stew", "extendedIngredients": [{"name": "beans"}]}]
+
+    first = client.post("/api/v1/recipes/search", json={"query": "Bean  stew"})
+    second = client.post("/api/v1/recipes/search", json={"query": "bean stew"})
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers["content-type"] == "application/json"
+    assert first.content == second.content
+    assert [r["id"] for r in first.json()["recipes"]] == [9]
+    assert mock_parse.call_count == 1
+    recipes_endpoint.response_cache.clear()
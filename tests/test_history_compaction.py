@@ -0,0 +1,95 @@
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import anthropic_service
+from app.utils.hydration_history import compact_history, estimate_tokens, parse_history
+
+
+def make_history(days=90, seed=3):
+    rng = random.Random(seed)
+    start = datetime(2026, 6, 1)
+    history = []
+    for d in range(days):
+        for _ in range(rng.randint(3, 9)):
+            moment = start + timedelta(days=d, minutes=rng.randint(360, 1380))
+            history.append({
+                "timestamp": moment.isoformat(),
+                "amount": rng.choice([150, 250, 500]),
+                "weather": f"Sunny, {rng.randint(18, 33)}°C",
+            })
+    rng.shuffle(history)
+    return history
+
+
+def test_parses_client_shapes():
+    entries = parse_history([
+        {"time": "02:05 PM", "amount": 250},
+        {"time": "10:30", "amount": "500ml"},
+        {"timestamp": 1760000000000, "amount_ml": 300, "temperature": 27},
+        {"note": "no amount"},
+    ])
+    assert [e.amount for e in entries] == [300, 500, 250]
+    assert entries[0].day is not None and entries[0].temperature == 27
+    assert entries[1].minute == 10 * 60 + 30 and entries[1].day is None
+
+
+def test_out_of_range_timestamps_are_ignored():
+    entries = parse_history([
+        {"timestamp": 1e20, "amount": 250},
+        {"timestamp": -1e15, "amount": 250},
+        {"timestamp": float("inf"), "amount": 250},
+        {"timestamp": float("nan"), "amount": 250},
+    ])
+    assert len(entries) == 4
+    assert all(e.day is None and e.minute is None for e in entries)
+    assert compact_history([{"timestamp": 1e20, "amount": 250}]).recent.startswith("Latest day (today)")
+    assert parse_history([{"amount": float("nan")}, {"amount": float("inf")}]) == []
+
+
+def test_long_history_fits_budget_and_keeps_newest_detail():
+    history = make_history()
+    compact = compact_history(history, budget=400)
+    assert compact.tokens <= 400
+    assert estimate_tokens(json.dumps(history)) > 10 * compact.tokens
+
+    lines = compact.summary.splitlines()
+    assert lines[0].startswith("History 2026-06-01 to 2026-08-28")
+    # Newest days are kept day by day, older ones only as weekly rollups
+    assert lines[-1].startswith("2026-08-28:")
+    assert any(line.startswith("week of") for line in lines)
+    assert compact.recent.startswith("Latest day (2026-08-29)")
+
+
+def test_summary_is_stable_while_the_latest_day_grows():
+    history = make_history(days=20)
+    before = compact_history(history)
+    after = compact_history(history + [{"timestamp": "2026-06-20T23:50:00", "amount": 250}])
+    assert after.summary == before.summary
+    assert after.recent != before.recent
+
+
+def test_history_prompts_send_compact_text():
+    response = MagicMock()
+    response.json.return_value = {
+        "content": [{"type": "text", "text": "Drink up"}],
+        "usage": {"input_tokens": 940, "output_tokens": 12},
+    }
+    request = AsyncMock(return_value=response)
+    input_before = anthropic_service.ANTHROPIC_TOKENS.value(kind="input")
+
+    with patch.object(anthropic_service, "ANTHROPIC_API_KEY", "test"), \
+            patch.object(anthropic_service.registry, "request", request):
+        reply = asyncio.run(anthropic_service.chat_with_coach("Am I drinking enough?", make_history(), "Hot, 31°C"))
+
+    assert reply == "Drink up"
+    payload = request.await_args.kwargs["json"]
+    # The compacted history is far below the 1024-token prompt-caching minimum
+    assert "cache_control" not in str(payload)
+    prompt = payload["messages"][0]["content"]
+    assert prompt.startswith("History 2026-06-01") and "Latest day (" in prompt
+    assert prompt.endswith("User says: Am I drinking enough?")
+    assert "timestamp" not in prompt
+    assert anthropic_service.ANTHROPIC_TOKENS.value(kind="input") == input_before + 940
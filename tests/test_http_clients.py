@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+
+from app.services.http_clients import ProviderClientRegistry, ProviderConfig
+
+
+def make_registry(handler, retries=2):
+    registry = ProviderClientRegistry()
+    registry.register(ProviderConfig(name="fake", base_url="http://fake", retries=retries, backoff=0))
+    registry._clients["fake"] = httpx.AsyncClient(base_url="http://fake", transport=httpx.MockTransport(handler))
+    return registry
+
+
+def test_retries_retryable_status_then_succeeds():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503 if len(calls) < 3 else 200, json={"ok": True})
+
+    async def run():
+        registry = make_registry(handler)
+        response = await registry.request("fake", "GET", "/thing")
+        assert response.status_code == 200
+        stats = registry.stats()["fake"]
+        assert stats["requests"] == 3
+        assert stats["retries"] == 2
+        assert stats["in_flight"] == 0
+        await registry.close_all()
+
+    asyncio.run(run())
+
+
+def test_gives_up_after_retry_budget():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async def run():
+        registry = make_registry(handler, retries=1)
+        try:
+            await registry.request("fake", "GET", "/thing")
+        except httpx.ConnectError:
+            pass
+        else:
+            raise AssertionError("expected ConnectError")
+        stats = registry.stats()["fake"]
+        assert stats["requests"] == 2
+        assert stats["errors"] == 1
+        await registry.close_all()
+
+    asyncio.run(run())
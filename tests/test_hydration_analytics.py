@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from app.services import anthropic_service
+from app.utils.hydration_analytics import analyze_history, forecast_temperature
+
+
+def history(days=14, base=2000, step=50, heat=30, hot_every=3):
+    """
+    Synthetic log: intake grows `step` ml a day, hot days (31°C) add `heat` ml
+    per °C over the 21°C mild days, and most water comes in the morning.
+    """
+    start = datetime(2026, 9, 1)
+    log = []
+    for d in range(days):
+        temp = 31 if d % hot_every == 0 else 21
+        total = base + step * d + heat * (temp - 21)
+        for hour, share in ((7, 0.5), (12, 0.3), (16, 0.2)):
+            log.append({
+                "timestamp": (start + timedelta(days=d, hours=hour)).isoformat(),
+                "amount": total * share,
+                "weather": f"Sunny, {temp}°C",
+            })
+    return log
+
+
+def test_trend_pattern_and_weather_are_measured():
+    report = analyze_history(history())
+    # Last (in-progress) day is left out of the trend
+    assert report.days == 13
+    assert 45 < report.trend_ml_per_day < 55
+    assert max(report.block_share, key=report.block_share.get) == 2
+    assert report.heat_ml_per_c > 0 and report.heat_r > 0.3
+    assert report.hot_uplift > 0
+
+    trend, pattern, goal, weather = report.insights
+    assert "rising by about" in trend
+    assert pattern.startswith("Your intake peaks 06-09h (50%")
+    assert f"{report.goal:,}ml" in goal
+    assert "more on days at 25°C or hotter" in weather
+
+
+def test_goal_tracks_baseline_and_forecast():
+    cool = analyze_history(history(base=2600), "Cloudy, 18°C")
+    hot = analyze_history(history(base=2600), "Mostly sunny, 33°C")
+    assert cool.goal >= 2600 and cool.goal % 50 == 0
+    assert hot.goal > cool.goal
+    assert "33°C forecast" in hot.goal_reason
+    assert analyze_history(history(base=9000)).goal == 4500
+
+
+def test_empty_and_undated_history():
+    empty = analyze_history([], "Hot, 35°C")
+    assert empty.goal == 2900  # standard 2500 + 40ml/°C over 25°C
+    assert empty.insights[0].startswith("Log a few drinks")
+
+    today = analyze_history([{"time": "08:15", "amount": 500}, {"time": "14:00", "amount": 250}])
+    assert today.goal == 2500
+    assert "750ml across 2 drinks" in today.insights[0]
+    assert forecast_temperature("Partly cloudy, 27.5 °C") == 27.5
+
+
+def test_overlong_numbers_are_ignored_not_infinite():
+    huge = "9" * 400
+    report = analyze_history(
+        [{"timestamp": "2026-09-01T08:00:00", "amount": 500, "weather": f"Sunny, {huge}°C"},
+         {"timestamp": "2026-09-01T09:00:00", "amount": huge}],
+        f"Scorching, {huge}°C",
+    )
+    assert report.entries == 1 and report.forecast_c is None
+    assert report.goal == 2500
+
+
+def test_endpoints_skip_claude_unless_phrasing_is_enabled():
+    claude = AsyncMock(return_value="- one")
+    with patch.object(anthropic_service, "ANTHROPIC_API_KEY", "test"), \
+            patch.object(anthropic_service, "call_claude", claude):
+        insights = asyncio.run(anthropic_service.get_hydration_insights(history()))
+        prediction = asyncio.run(anthropic_service.get_goal_prediction(history(), "Sunny, 30°C"))
+
+    claude.assert_not_awaited()
+    assert insights == analyze_history(history()).insights
+    assert prediction == {"goal": analyze_history(history(), "Sunny, 30°C").goal,
+                          "reason": analyze_history(history(), "Sunny, 30°C").goal_reason}
+
+
+def test_phrasing_falls_back_to_local_text():
+    async def slow(*args):
+        await asyncio.sleep(1)
+
+    local = analyze_history(history()).insights
+    phrased = "\n".join(f"- Nice! {line}" for line in local)
+    with patch.object(anthropic_service, "ANTHROPIC_API_KEY", "test"), \
+            patch.object(anthropic_service, "HYDRATION_LLM_PHRASING", True):
+        with patch.object(anthropic_service, "call_claude", AsyncMock(return_value=phrased)):
+            assert asyncio.run(anthropic_service.get_hydration_insights(history()))[0].startswith("Nice! ")
+        with patch.object(anthropic_service, "call_claude", AsyncMock(return_value="I'm having trouble connecting")):
+            assert asyncio.run(anthropic_service.get_hydration_insights(history())) == local
+        with patch.object(anthropic_service, "call_claude", slow), \
+                patch.object(anthropic_service, "HYDRATION_LLM_TIMEOUT", 0.05):
+            assert asyncio.run(anthropic_service.get_hydration_insights(history())) == local
+
+
+def test_gapped_history_falls_back_to_older_days():
+    log = [
+        {"timestamp": "2026-01-01T09:00:00", "amount": 2200},
+        {"timestamp": "2026-03-01T09:00:00", "amount": 500},
+    ]
+    report = analyze_history(log, "Sunny, 30°C")
+    assert report.days == 1 and report.daily_mean == 2200
+    assert report.goal == 2700
+    assert "2,700ml" in report.insights[2]
@@ -0,0 +1,68 @@
+import io
+from unittest.mock import AsyncMock, patch
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.api.utils import uploads
+from app.main import app
+
+client = TestClient(app)
+URL = "/api/v1/tracker/calories/analyze/upload"
+
+
+def jpeg_bytes(size=(64, 48)):
+    out = io.BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+@patch("app.api.v1.endpoints.tracker.analyze_food_image_file", new_callable=AsyncMock)
+def test_multipart_upload_streams_file_part(mock_analyze):
+    mock_analyze.return_value = "Pilau: 520 kcal"
+    raw = jpeg_bytes()
+    response = client.post(
+        URL,
+        data={"note": "lunch"},
+        # Client claims PNG; the magic bytes say JPEG
+        files={"file": ("meal.png", raw, "image/png")},
+    )
+    assert response.status_code == 200
+    assert response.json()["analysis"] == "Pilau: 520 kcal"
+
+    f, media_type = mock_analyze.await_args.args
+    assert media_type == "image/jpeg"
+    assert f.closed
+
+
+@patch("app.api.v1.endpoints.tracker.analyze_food_image_file", new_callable=AsyncMock)
+def test_raw_body_upload(mock_analyze):
+    captured = {}
+
+    async def analyze(f, media_type):
+        captured["data"] = f.read()
+        return "Githeri: 400 kcal"
+
+    mock_analyze.side_effect = analyze
+    raw = jpeg_bytes()
+    response = client.post(URL, content=raw, headers={"content-type": "application/octet-stream"})
+    assert response.status_code == 200
+    assert captured["data"] == raw
+
+
+@patch("app.api.v1.endpoints.tracker.analyze_food_image_file", new_callable=AsyncMock)
+def test_rejects_non_images_oversized_and_missing_parts(mock_analyze):
+    response = client.post(URL, files={"file": ("meal.jpg", b"#!/bin/sh\necho hi", "image/jpeg")})
+    assert response.status_code == 415
+
+    with patch.object(uploads, "UPLOAD_MAX_BYTES", 1024):
+        response = client.post(URL, files={"file": ("meal.jpg", jpeg_bytes((800, 600)) + b"\0" * 4096, "image/jpeg")})
+    assert response.status_code == 413
+
+    response = client.post(URL, files={"photo": ("meal.jpg", jpeg_bytes(), "image/jpeg")})
+    assert response.status_code == 400
+
+    response = client.post(URL, content=b"", headers={"content-type": "image/jpeg"})
+    assert response.status_code == 400
+
+    mock_analyze.assert_not_awaited()
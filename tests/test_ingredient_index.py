@@ -0,0 +1,32 @@
+from app.services.ingredient_index import IngredientIndex
+
+
+def make_index():
+    index = IngredientIndex()
+    index.add(10, ["Chicken", "rice", "garlic"])
+    index.add(11, ["chicken", "garlic"])
+    index.add(12, ["rice", "beans", "onion", "tomato"])
+    index.add(13, ["salt"])
+    return index
+
+
+def test_all_and_any():
+    index = make_index()
+    assert sorted(index.all_of(["chicken", "garlic"])) == [10, 11]
+    assert index.all_of(["chicken", "beans"]) == []
+    assert index.any_of(["chicken", "garlic", "rice"])[0] == (10, 3)
+    assert {rid for rid, _ in index.any_of(["beans"])} == {12}
+
+
+def test_missing_at_most():
+    index = make_index()
+    assert index.missing_at_most(["chicken", "garlic"], 0) == [(11, [])]
+    results = dict(index.missing_at_most(["chicken", "garlic"], 1))
+    assert results == {11: [], 10: ["rice"], 13: ["salt"]}
+
+
+def test_incremental_add_updates_postings():
+    index = make_index()
+    index.add(11, ["rice"])
+    assert sorted(index.all_of(["chicken", "rice"])) == [10, 11]
+    assert dict(index.missing_at_most(["salt"], 0)) == {13: []}
@@ -0,0 +1,72 @@
+from app.utils.explanation_builder import build_explanations
+from app.utils.ingredient_vocab import IngredientVocabulary, ingredient_vocab, stem
+from app.utils.recipe_ranker import rank_recipes_scalar
+
+
+def test_stemming_is_consistent():
+    assert stem("tomatoes") == stem("tomato") == "tomato"
+    assert stem("berries") == "berry"
+    assert stem("peaches") == "peach"
+    assert stem("hummus") == "hummus"
+    assert stem("leaves") == "leaf"
+
+
+def test_plurals_and_synonyms_share_ids():
+    vocab = ingredient_vocab
+    query = vocab.query(["chicken"])
+    for name in ["Chicken", "chicken breasts", "boneless skinless chicken thighs"]:
+        assert query.matched(vocab.ingredient_ids(name)) == 1
+
+    assert vocab.query(["cilantro"]).matched(vocab.ingredient_ids("fresh coriander")) == 1
+    assert vocab.query(["scallions"]).matched(vocab.ingredient_ids("spring onion")) == 1
+
+
+def test_known_sub_phrases_and_no_substring_false_positives():
+    vocab = ingredient_vocab
+    assert vocab.query(["olive oil"]).matched(vocab.ingredient_ids("extra virgin olive oil")) == 1
+    assert vocab.query(["egg"]).matched(vocab.ingredient_ids("eggplant")) == 0
+
+
+def test_multi_word_query_is_segmented():
+    vocab = ingredient_vocab
+    query = vocab.query(["quick chicken pasta dinner"])
+    assert query.size == 2
+    recipe = vocab.recipe_ids(["chicken breast", "penne", "garlic"])
+    assert query.matched(recipe) == 2
+
+
+def test_trigram_lookup_catches_typos_and_prefixes():
+    vocab = IngredientVocabulary(["chicken", "tomato", "rice"])
+    assert vocab.fuzzy("chiken") == "chicken"
+    assert vocab.fuzzy("chick") == "chicken"
+    assert vocab.fuzzy("tofu") is None
+    assert vocab.query(["tomatoe"]).matched(vocab.ingredient_ids("tomatoes")) == 1
+
+
+def test_unknown_query_words_are_not_interned():
+    vocab = IngredientVocabulary(["chicken", "rice"])
+    vocab.ingredient_ids("chicken")
+    before = len(vocab)
+    query = vocab.query(["chicken zzqx blorf"])
+    assert query.size == 3
+    assert len(vocab) == before
+
+    # Words that recipes introduce later still match
+    recipe = vocab.recipe_ids(["zzqx paste"])
+    assert vocab.query(["chicken zzqx blorf"]).matched(recipe) == 1
+
+
+def test_ranker_matches_plurals_and_synonyms():
+    recipes = [
+        {"id": 1, "title": "Breast Bake", "ingredients": ["chicken breasts", "salt"], "ready_in_minutes": 20},
+        {"id": 2, "title": "Rice Bowl", "ingredients": ["rice", "beans"], "ready_in_minutes": 20},
+    ]
+    ranked = rank_recipes_scalar(recipes, ["chicken"])
+    assert [r["id"] for r in ranked] == [1]
+    assert "Uses 1 of your ingredients" in ranked[0]["explanation"]
+
+
+def test_explanations_count_query_ingredients():
+    recipe = {"ingredients": ["garlic cloves", "chicken thighs", "rice"]}
+    reasons = build_explanations(recipe, ["chicken", "garlic", "tofu"], "busy_professional")
+    assert "Uses 2 of your ingredients" in reasons
@@ -0,0 +1,91 @@
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+from app.services import llm_service
+from app.utils.intent_parser import USD_PER_KES, extract_intent
+
+
+def test_extract_intent_common_query():
+    intent, confidence = extract_intent("Vegan breakfast under 20 minutes")
+    assert confidence >= llm_service.INTENT_FAST_PATH_THRESHOLD
+    assert intent.diet == "Vegan"
+    assert intent.recipe_type == "breakfast"
+    assert intent.max_time_minutes == 20
+
+
+def test_extract_intent_constraints():
+    intent, _ = extract_intent("dairy-free thai curry in half an hour under 500 calories, cheap")
+    assert intent.query == "curry"
+    assert intent.cuisine == "Thai"
+    assert intent.intolerances == ["Dairy"]
+    assert intent.max_time_minutes == 30
+    assert intent.max_calories == 500
+    assert intent.max_price == 5.0
+
+
+def test_extract_intent_currency_is_price_not_time():
+    for text in ("cheap dinner under $10", "pasta under 10 dollars"):
+        intent, confidence = extract_intent(text)
+        assert intent.max_price == 10.0
+        assert intent.max_time_minutes is None
+        assert "dollars" not in intent.query
+        assert confidence >= llm_service.INTENT_FAST_PATH_THRESHOLD
+
+    intent, _ = extract_intent("chicken stew under 500 ksh")
+    assert intent.max_price == round(500 * USD_PER_KES, 2)
+    assert intent.query == "chicken stew"
+    assert extract_intent("lunch for $7.50")[0].max_price == 7.5
+
+
+def test_extract_intent_bare_under_defers_to_llm():
+    intent, confidence = extract_intent("bean stew under 20")
+    assert intent.max_time_minutes == 20
+    assert confidence < llm_service.INTENT_FAST_PATH_THRESHOLD
+
+
+def test_extract_intent_constraint_only_inputs_search_by_filters():
+    intent, confidence = extract_intent("vegan under 20 minutes")
+    assert (intent.query, intent.diet, intent.max_time_minutes) == ("", "Vegan", 20)
+    assert confidence >= llm_service.INTENT_FAST_PATH_THRESHOLD
+
+    assert extract_intent("cheap vegan")[0].query == ""
+    assert extract_intent("500 calorie meal")[0].query == ""
+    assert extract_intent("quick dinner for two")[0].query == "dinner"
+    assert extract_intent("pasta for 4 people")[0].query == "pasta"
+
+    _, confidence = extract_intent("!!!")
+    assert confidence < llm_service.INTENT_FAST_PATH_THRESHOLD
+
+
+def test_extract_intent_low_confidence_on_negation():
+    _, confidence = extract_intent("I need a cheap, high-protein vegan lunch that isn't salad.")
+    assert confidence < llm_service.INTENT_FAST_PATH_THRESHOLD
+
+
+@patch.object(llm_service, "_llm_parse_intent", new_callable=AsyncMock)
+def test_parse_user_intent_fast_path_and_memo(mock_llm):
+    llm_service.intent_cache.clear()
+    mock_llm.return_value = {"query": "high protein lunch", "diet": "Vegan", "intolerances": []}
+
+    async def run():
+        intent = await llm_service.parse_user_intent("keto chicken dinner")
+        assert intent.diet == "Ketogenic"
+        mock_llm.assert_not_awaited()
+
+        query = "vegan lunch that isn't salad"
+        await llm_service.parse_user_intent(query)
+        second = await llm_service.parse_user_intent("Vegan lunch that isn't salad!")
+        assert second.query == "high protein lunch"
+        assert mock_llm.await_count == 1
+
+    asyncio.run(run())
+    llm_service.intent_cache.clear()
+
+
+@patch.object(llm_service, "_llm_parse_intent", new_callable=AsyncMock)
+def test_parse_user_intent_falls_back_to_lexicon(mock_llm):
+    llm_service.intent_cache.clear()
+    mock_llm.side_effect = RuntimeError("ollama down")
+
+    intent = asyncio.run(llm_service.parse_user_intent("vegan stew without beans"))
+    assert intent.diet == "Vegan"
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.migrations import add_missing_columns
+from app.schemas.intent import IntentSchema
+from app.services import local_corpus
+
+
+@pytest.fixture
+def corpus(local_corpus_db, monkeypatch):
+    monkeypatch.setattr(local_corpus, "LOCAL_CORPUS_ENABLED", True)
+    return local_corpus_db
+
+
+def make_recipe(rid, title, ingredients, minutes=20, diets=(), cuisines=()):
+    return {
+        "id": rid,
+        "title": title,
+        "ingredients": list(ingredients),
+        "instructions": ["Chop.", "Cook."],
+        "ready_in_minutes": minutes,
+        "source_url": f"https://example.com/{rid}",
+        "image": None,
+        "estimated_cost_kes": 300,
+        "price_per_serving": 250.0,
+        "calories": 450.0,
+        "dietary_tags": [],
+        "protein_score": 30.0,
+        "protein_per_cost": 0.1,
+        "popularity": rid,
+        "diets": list(diets),
+        "cuisines": list(cuisines),
+        "dish_types": ["main course"],
+    }
+
+
+def test_persist_is_idempotent_and_search_filters(corpus):
+    recipes = [
+        make_recipe(1, "Chicken Curry", ["chicken", "curry paste"], cuisines=["Indian"]),
+        make_recipe(2, "Chicken Salad", ["chicken", "lettuce"], minutes=10, diets=["gluten free"]),
+        make_recipe(3, "Vegan Chili", ["beans", "tomato"], diets=["vegan"]),
+        make_recipe(4, "Slow Chicken Stew", ["chicken", "potato"], minutes=240),
+    ]
+    assert local_corpus.persist_recipes(recipes) == 4
+    assert local_corpus.persist_recipes(recipes) == 0
+
+    found = asyncio.run(local_corpus.search_local(IntentSchema(query="chicken", max_time_minutes=30)))
+    assert {r["id"] for r in found} == {1, 2}
+    assert found[0]["instructions"] == ("Chop.", "Cook.")
+
+    found = asyncio.run(local_corpus.search_local(IntentSchema(query="chicken", intolerances=["Gluten"])))
+    assert [r["id"] for r in found] == [2]
+
+    found = asyncio.run(local_corpus.search_local(IntentSchema(query="chicken", cuisine="Indian")))
+    assert [r["id"] for r in found] == [1]
+
+
+def test_unverifiable_intolerance_goes_upstream(corpus):
+    local_corpus.persist_recipes([make_recipe(1, "Peanut Noodles", ["noodles"])])
+    found = asyncio.run(local_corpus.search_local(IntentSchema(query="noodles", intolerances=["Peanut"])))
+    assert found == []
+
+
+def test_pantry_search_modes_and_incremental_index(corpus):
+    local_corpus.persist_recipes([
+        make_recipe(1, "Garlic Chicken", ["chicken", "garlic"]),
+        make_recipe(2, "Chicken Rice", ["chicken", "rice", "onion"]),
+    ])
+
+    found = asyncio.run(local_corpus.pantry_search(["chicken", "garlic"], mode="missing"))
+    assert [r["id"] for r in found] == [1]
+
+    found = asyncio.run(local_corpus.pantry_search(["chicken", "rice"], mode="missing", max_missing=1))
+    assert {r["id"]: r["missing_ingredients"] for r in found} == {1: ["garlic"], 2: ["onion"]}
+
+    # New recipes are picked up without rebuilding the index
+    local_corpus.persist_recipes([make_recipe(3, "Chicken Rice Bowl", ["chicken", "rice"])])
+    found = asyncio.run(local_corpus.pantry_search(["chicken", "rice"], mode="all"))
+    assert {r["id"] for r in found} == {2, 3}
+
+
+def test_old_database_is_upgraded_in_place(tmp_path, monkeypatch):
+    # recipes table as shipped before the local corpus columns existed
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE recipes (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, instructions TEXT NOT NULL,"
+            " ready_in_minutes INTEGER, source_url VARCHAR, estimated_cost_kes INTEGER,"
+            " protein_score FLOAT, protein_per_cost FLOAT, created_at DATETIME)"
+        )
+        conn.exec_driver_sql("INSERT INTO recipes (title, instructions) VALUES ('Old Stew', 'Cook.')")
+    Base.metadata.create_all(bind=engine)
+
+    added = add_missing_columns(engine, Base.metadata)
+    assert {"recipes.spoonacular_id", "recipes.diets", "recipes.calories"} <= set(added)
+    assert "ix_recipes_spoonacular_id" in {i["name"] for i in inspect(engine).get_indexes("recipes")}
+    assert add_missing_columns(engine, Base.metadata) == []
+
+    monkeypatch.setattr(local_corpus, "session_factory", sessionmaker(bind=engine, autoflush=False))
+    monkeypatch.setattr(local_corpus, "LOCAL_CORPUS_ENABLED", True)
+    assert local_corpus.persist_recipes([make_recipe(7, "Chicken Pilau", ["chicken", "rice"])]) == 1
+    found = asyncio.run(local_corpus.search_local(IntentSchema(query="chicken")))
+    assert [r["id"] for r in found] == [7]
+    engine.dispose()
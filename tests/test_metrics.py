@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import recipes as recipes_endpoint
+from app.main import app
+from app.schemas.intent import IntentSchema
+from app.services import tracing
+from app.services.metrics import MetricsRegistry, STAGE_SECONDS
+
+client = TestClient(app)
+
+
+def test_histogram_and_counter_render_prometheus_text():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+    errors = registry.counter("test_errors_total", "Errors", ["provider"])
+    latency.observe(0.05, stage="rank")
+    latency.observe(0.5, stage="rank")
+    errors.inc(provider='spoon"acular')
+
+    text = registry.render()
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{stage="rank",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="rank",le="1"} 2' in text
+    assert 'test_seconds_bucket{stage="rank",le="+Inf"} 2' in text
+    assert 'test_seconds_count{stage="rank"} 2' in text
+    assert 'test_errors_total{provider="spoon\\"acular"} 1' in text
+
+
+@patch.object(tracing, "start_writer")  # keep the record in the queue for inspection
+def test_sampled_trace_is_queued_not_written(_):
+    tracing.stop_writer()
+    trace = tracing.start_trace("test", sample_rate=1.0)
+    with tracing.span("unit_stage"):
+        tracing.trace("hello")
+    tracing.finish_trace()
+
+    record = tracing._queue.get_nowait()
+    assert trace.id in record.getMessage()
+    assert "[unit_stage]" in record.getMessage() and "hello" in record.getMessage()
+    assert STAGE_SECONDS.count(stage="unit_stage") >= 1
+
+    assert tracing.start_trace("test", sample_rate=0.0) is None
+    tracing.trace("dropped")  # no-op
+    tracing.finish_trace()
+
+
+@patch("app.api.v1.endpoints.recipes.search_local", return_value=[])
+@patch("app.api.v1.endpoints.recipes.parse_user_intent")
+@patch("app.api.v1.endpoints.recipes.search_recipes")
+def test_metrics_endpoint_exposes_stage_histograms(mock_search, mock_parse, mock_local):
+    recipes_endpoint.response_cache.clear()
+    mock_parse.return_value = IntentSchema(query="rice")
+    mock_search.return_value = [{"id": 5, "title": "Pilau", "extendedIngredients": [{"name": "rice"}]}]
+    assert client.post("/api/v1/recipes/search", json={"query": "pilau rice"}).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in ("intent_parse", "local_search", "upstream_search", "relaxation_step_0", "normalize", "rank", "serialize"):
+        assert f'quickbite_stage_seconds_count{{stage="{stage}"}}' in response.text
+    assert "quickbite_circuit_state" in response.text
+    recipes_endpoint.response_cache.clear()
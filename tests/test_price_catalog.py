@@ -0,0 +1,80 @@
+import csv
+import os
+
+from app.utils.cost_calculator import (
+    DEFAULT_COST,
+    INGREDIENT_COSTS,
+    PRICE_CATALOG_PATH,
+    PriceCatalog,
+    price_catalog,
+)
+
+
+CATALOG = """name,aliases,category,nairobi,mombasa
+chicken,,meat,400,420
+chicken thigh,,meat,380,
+salt,kosher salt,spice,5,5
+pepper,,spice,15,15
+olive oil,extra virgin olive oil,oil,120,130
+"""
+
+
+def write_catalog(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_longest_phrase_wins_and_phrases_add_up(tmp_path):
+    catalog = PriceCatalog(write_catalog(tmp_path / "prices.csv", CATALOG))
+    assert catalog.price_of("boneless chicken thighs") == 380
+    assert catalog.price_of("Chicken") == 400
+    assert catalog.price_of("salt and pepper") == 20
+    assert catalog.price_of("extra virgin olive oil") == 120
+    assert catalog.price_of("unicorn tears") == DEFAULT_COST
+
+
+def test_every_shipped_row_is_reachable_by_its_own_name():
+    catalog = PriceCatalog(PRICE_CATALOG_PATH, region="nairobi")
+    with open(PRICE_CATALOG_PATH, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    unreachable = [
+        name
+        for row in rows
+        for name in [row["name"], *filter(None, (a.strip() for a in row["aliases"].split(";")))]
+        if catalog.price_of(name) != int(row["nairobi"])
+    ]
+    assert unreachable == []
+    # Preparation words name distinct items in the catalog
+    assert catalog.price_of("whole chicken") != catalog.price_of("chicken")
+    assert catalog.price_of("whole wheat flour") != catalog.price_of("wheat flour")
+
+
+def test_region_column_with_fallback(tmp_path):
+    path = write_catalog(tmp_path / "prices.csv", CATALOG)
+    catalog = PriceCatalog(path, region="mombasa")
+    assert catalog.price_of("chicken") == 420
+    # Empty regional cell falls back to the first region
+    assert catalog.price_of("chicken thighs") == 380
+    assert PriceCatalog(path, region="lamu").price_of("chicken") == 400
+
+
+def test_batch_matches_per_recipe():
+    batch = [["chicken breasts", "garlic", "rice"], [], ["sukuma wiki", "ugali", "tomatoes"]]
+    assert price_catalog.estimate_batch(batch) == [price_catalog.estimate(b) for b in batch]
+
+
+def test_hot_reload_picks_up_edits(tmp_path):
+    path = write_catalog(tmp_path / "prices.csv", CATALOG)
+    catalog = PriceCatalog(path, reload_interval=0)
+    assert catalog.price_of("chicken") == 400
+
+    write_catalog(tmp_path / "prices.csv", CATALOG.replace("chicken,,meat,400", "chicken,,meat,450"))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert catalog.price_of("chicken") == 450
+
+
+def test_unreadable_catalog_falls_back(tmp_path):
+    catalog = PriceCatalog(str(tmp_path / "missing.csv"))
+    assert catalog.price_of("chicken") == INGREDIENT_COSTS["chicken"]
+    assert catalog.price_of("beans") == INGREDIENT_COSTS["beans"]
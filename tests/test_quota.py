@@ -0,0 +1,101 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services import spoonacular_service
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.quota import FULL, LEAN, LOCAL_ONLY, REDUCED, QuotaBudget, QuotaExhaustedError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_plan_degrades_as_budget_drains():
+    budget = QuotaBudget("fake", capacity=100, reduced_results=8, clock=FakeClock())
+    assert budget.plan(15).level == FULL
+    assert budget.plan(15).number == 15
+
+    budget.acquire(60)
+    plan = budget.plan(15)
+    assert (plan.level, plan.number, plan.nutrition) == (REDUCED, 8, True)
+
+    budget.acquire(20)
+    plan = budget.plan(15)
+    assert (plan.level, plan.nutrition) == (LEAN, False)
+
+    budget.acquire(15)
+    assert budget.plan(15).level == LOCAL_ONLY
+    assert not budget.plan(15).upstream
+    with pytest.raises(QuotaExhaustedError):
+        budget.acquire(10)
+
+
+def test_bucket_refills_and_headers_win():
+    clock = FakeClock()
+    budget = QuotaBudget("fake", capacity=100, period=100, clock=clock)
+    budget.acquire(50)
+    clock.now = 25
+    assert budget.remaining_fraction() == pytest.approx(0.75)
+
+    # Billed 3 points where we estimated 1; provider says 20 left today
+    budget.update_from_headers({"x-api-quota-request": "3", "x-api-quota-used": "130", "x-api-quota-left": "20"}, 1)
+    assert budget.tokens == 20
+    assert budget.snapshot()["upstream_used"] == 130
+    assert budget.snapshot()["points_spent"] == 3
+
+    budget.exhaust()
+    assert budget.level() == LOCAL_ONLY
+
+
+@patch.object(spoonacular_service, "SPOONACULAR_API_KEY", "test-key")
+@patch.object(spoonacular_service, "_fetch_complex_search", new_callable=AsyncMock)
+def test_search_trims_request_when_budget_low(mock_fetch):
+    spoonacular_service.search_cache.clear()
+    budget = QuotaBudget("spoonacular", capacity=100, reduced_results=8, clock=FakeClock())
+    mock_fetch.return_value = [{"id": 1}]
+
+    async def run():
+        with patch.object(spoonacular_service, "quota", budget):
+            budget.tokens = 20  # lean
+            assert await spoonacular_service.search_recipes("tacos", number=15) == [{"id": 1}]
+            params = mock_fetch.await_args.args[0]
+            assert params["number"] == 8
+            assert params["addRecipeNutrition"] is False
+
+            budget.tokens = 5  # local only: upstream never called
+            assert await spoonacular_service.search_recipes("pizza", number=15) == []
+            assert mock_fetch.await_count == 1
+
+    asyncio.run(run())
+    spoonacular_service.search_cache.clear()
+
+
+def test_estimate_search_cost_counts_flags():
+    full = {"number": 10, "addRecipeInformation": True, "addRecipeNutrition": True, "fillIngredients": True}
+    lean = dict(full, addRecipeNutrition=False)
+    assert spoonacular_service.estimate_search_cost(full) == pytest.approx(1.85)
+    assert spoonacular_service.estimate_search_cost(lean) < spoonacular_service.estimate_search_cost(full)
+
+
+def test_failed_upstream_call_refunds_reservation():
+    budget = QuotaBudget("spoonacular", capacity=100, clock=FakeClock())
+    request = AsyncMock(side_effect=CircuitOpenError("spoonacular", 30))
+
+    async def run():
+        with patch.object(spoonacular_service, "quota", budget), \
+                patch.object(spoonacular_service.registry, "request", request):
+            for _ in range(5):
+                with pytest.raises(CircuitOpenError):
+                    await spoonacular_service._fetch_complex_search({"query": "tacos", "number": 10})
+
+    asyncio.run(run())
+    assert request.await_count == 5
+    assert budget.tokens == 100
+    assert budget.level() == FULL
+    assert budget.snapshot()["refunded"] == 5
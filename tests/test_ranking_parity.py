@@ -0,0 +1,45 @@
+import copy
+import random
+
+from app.utils.recipe_ranker import rank_recipes, rank_recipes_scalar
+from app.utils.ranking_engine import rank_recipes_vectorized
+
+VOCAB = ["chicken", "rice", "garlic", "onion", "tomato", "beans", "beef", "egg", "chicken breasts", "lime"]
+
+
+def make_recipes(n, seed):
+    rng = random.Random(seed)
+    recipes = []
+    for i in range(n):
+        recipes.append({
+            "id": i,
+            # Few distinct titles so the title dedupe matters
+            "title": f"Dish {rng.randint(0, n // 3)}",
+            "ingredients": rng.sample(VOCAB, rng.randint(0, 8)),
+            "ready_in_minutes": rng.choice([None, 0, 5, 10, 15, 20, 30, 45, 60, 120]),
+            "protein_score": rng.choice([None, 0, 4.5, 12.0, 25.3, 60.0]),
+            "estimated_cost_kes": rng.choice([None, 0, 90, 250, 480, 700]),
+        })
+    return recipes
+
+
+def check_parity(recipes, query, constraints):
+    expected = rank_recipes_scalar(copy.deepcopy(recipes), query, constraints)
+    actual = rank_recipes_vectorized(copy.deepcopy(recipes), query, constraints)
+    assert [(r["id"], r["match_score"], r["explanation"]) for r in actual] == \
+        [(r["id"], r["match_score"], r["explanation"]) for r in expected]
+
+
+def test_vectorized_matches_scalar_scorer():
+    queries = [["chicken"], ["chick"], ["chicken pasta"], ["rice", "beans"], ["tofu"]]
+    for seed in range(20):
+        recipes = make_recipes(random.Random(seed).randint(1, 400), seed)
+        for query in queries:
+            for constraints in (None, {"max_time": 30}, {"max_time": None}):
+                check_parity(recipes, query, constraints)
+
+
+def test_rank_recipes_dispatches_large_batches_to_engine():
+    recipes = make_recipes(500, seed=7)
+    expected = rank_recipes_scalar(copy.deepcopy(recipes), ["chicken"])
+    assert [r["id"] for r in rank_recipes(copy.deepcopy(recipes), ["chicken"])] == [r["id"] for r in expected]
@@ -0,0 +1,40 @@
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from app.schemas.recipe_response import Recipe
+from app.utils.recipe_normalizer import normalize_spoonacular_recipe
+from app.utils.recipe_ranker import rank_recipes_scalar
+from app.utils.recipe_record import RecipeRecord
+
+RAW = {
+    "id": 11,
+    "title": "Garlic Chicken",
+    "readyInMinutes": 20,
+    "extendedIngredients": [{"name": "Chicken"}, {"name": "garlic"}],
+    "analyzedInstructions": [{"steps": [{"step": "Sear."}, {"step": "Serve."}]}],
+    "nutrition": {"nutrients": [{"name": "Protein", "amount": 30}, {"name": "Calories", "amount": 450}]},
+    "diets": ["Gluten Free"],
+    "cuisines": ["Kenyan"],
+}
+
+
+def test_record_is_slotted_frozen_and_interned():
+    a = RecipeRecord.from_normalized(normalize_spoonacular_recipe(RAW))
+    b = RecipeRecord.from_normalized(normalize_spoonacular_recipe(dict(RAW, id=12)))
+
+    assert not hasattr(a, "__dict__")
+    with pytest.raises(FrozenInstanceError):
+        a.title = "changed"
+    assert a.ingredients == ("chicken", "garlic")
+    assert a.ingredients[0] is b.ingredients[0]
+    assert a["diets"] == ("gluten free",) and a.get("missing", 1) == 1
+
+
+def test_response_matches_dict_path():
+    normalized = normalize_spoonacular_recipe(RAW)
+    from_dict = rank_recipes_scalar([dict(normalized)], ["chicken"])[0]
+    from_record = rank_recipes_scalar([RecipeRecord.from_normalized(normalized)], ["chicken"])[0]
+
+    assert isinstance(from_record, RecipeRecord)
+    assert from_record.to_response().model_dump() == Recipe.model_validate(from_dict).model_dump()
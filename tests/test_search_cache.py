@@ -0,0 +1,93 @@
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+from app.services import spoonacular_service
+from app.services.cache import TieredCache
+
+
+class FakeRedis:
+    """Minimal stand-in for redis.asyncio.Redis (get/set only)."""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_is_canonical():
+    a = spoonacular_service.search_cache_key("Chicken  Pasta", diet="Vegan", intolerances=["Gluten", "Dairy"], number=15)
+    b = spoonacular_service.search_cache_key("chicken pasta", diet="vegan", intolerances=["dairy", "gluten"], number=15)
+    c = spoonacular_service.search_cache_key("chicken pasta", diet="vegan", intolerances=["dairy"], number=15)
+    assert a == b
+    assert a != c
+
+
+def test_tiered_cache_hit_miss_and_redis_promotion():
+    async def run():
+        redis = FakeRedis()
+        loader = AsyncMock(return_value=[{"id": 1}])
+
+        cache = TieredCache("test", ttl=10, stale_ttl=60, redis=redis)
+        assert await cache.get_or_load("k", loader) == [{"id": 1}]
+        assert await cache.get_or_load("k", loader) == [{"id": 1}]
+        assert loader.await_count == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hits"] == 1
+
+        # A second worker shares the Redis tier
+        other = TieredCache("test", ttl=10, stale_ttl=60, redis=redis)
+        assert await other.get_or_load("k", loader) == [{"id": 1}]
+        assert loader.await_count == 1
+        assert other.stats()["redis_hits"] == 1
+
+    asyncio.run(run())
+
+
+def test_tiered_cache_stale_while_revalidate():
+    async def run():
+        clock = FakeClock()
+        loader = AsyncMock(side_effect=[["old"], ["new"]])
+        cache = TieredCache("test", ttl=10, stale_ttl=60, clock=clock)
+
+        assert await cache.get_or_load("k", loader) == ["old"]
+        clock.now += 30  # past ttl, inside stale window
+
+        assert await cache.get_or_load("k", loader) == ["old"]
+        await asyncio.sleep(0)  # let the background refresh run
+        assert await cache.get_or_load("k", loader) == ["new"]
+        assert cache.stats()["stale_hits"] == 1
+        assert cache.stats()["refreshes"] == 1
+
+        clock.now += 1000  # past the stale window: a real miss
+        loader.side_effect = [["newest"]]
+        assert await cache.get_or_load("k", loader) == ["newest"]
+
+    asyncio.run(run())
+
+
+@patch.object(spoonacular_service, "SPOONACULAR_API_KEY", "test-key")
+@patch.object(spoonacular_service, "_fetch_complex_search", new_callable=AsyncMock)
+def test_search_recipes_uses_cache_and_skips_errors(mock_fetch):
+    spoonacular_service.search_cache.clear()
+
+    async def run():
+        mock_fetch.side_effect = [RuntimeError("boom"), [{"id": 7}]]
+        assert await spoonacular_service.search_recipes("tacos", number=15) == []
+        assert await spoonacular_service.search_recipes("tacos", number=15) == [{"id": 7}]
+        assert await spoonacular_service.search_recipes(" Tacos ", number=15) == [{"id": 7}]
+        assert mock_fetch.await_count == 2
+
+    asyncio.run(run())
+    spoonacular_service.search_cache.clear()
@@ -0,0 +1,69 @@
+import asyncio
+
+from app.schemas.intent import IntentSchema
+from app.services.search_planner import plan_relaxations, search_with_relaxation
+
+
+def make_search(responses, delays, calls, cancelled):
+    """Fake search_recipes: picks its canned answer by which constraints are still set."""
+
+    async def fake_search(**params):
+        key = (params["max_time"] is not None, params["max_calories"] is not None)
+        calls.append(key)
+        try:
+            await asyncio.sleep(delays.get(key, 0))
+        except asyncio.CancelledError:
+            cancelled.append(key)
+            raise
+        return responses.get(key, [])
+
+    return fake_search
+
+
+INTENT = IntentSchema(query="pasta", max_time_minutes=20, max_calories=500)
+
+
+def test_plan_relaxations_is_cumulative():
+    plans = plan_relaxations(INTENT)
+    assert [relaxed for relaxed, _ in plans] == [[], ["max_time_minutes"], ["max_time_minutes", "max_calories"]]
+    assert plans[-1][1]["max_time"] is None and plans[-1][1]["max_calories"] is None
+
+    only_calories = plan_relaxations(IntentSchema(query="pasta", max_calories=500))
+    assert [relaxed for relaxed, _ in only_calories] == [[], ["max_calories"]]
+
+
+def test_strict_result_wins_and_losers_are_cancelled():
+    calls, cancelled = [], []
+    search = make_search(
+        responses={(True, True): [{"id": 1}], (False, True): [{"id": 2}], (False, False): [{"id": 3}]},
+        delays={(True, True): 0.01, (False, True): 0.01, (False, False): 1},
+        calls=calls,
+        cancelled=cancelled,
+    )
+    results, relaxed = asyncio.run(search_with_relaxation(search, INTENT))
+    assert results == [{"id": 1}]
+    assert relaxed == []
+    assert len(calls) == 3  # all variants fired concurrently
+    assert (False, False) in cancelled
+
+
+def test_least_relaxed_non_empty_result_wins():
+    calls, cancelled = [], []
+    search = make_search(
+        responses={(False, True): [{"id": 2}], (False, False): [{"id": 3}]},
+        delays={(True, True): 0.05},
+        calls=calls,
+        cancelled=cancelled,
+    )
+    results, relaxed = asyncio.run(search_with_relaxation(search, INTENT))
+    assert results == [{"id": 2}]
+    assert relaxed == ["max_time_minutes"]
+
+
+def test_all_empty_reports_every_relaxation_and_respects_fanout():
+    calls, cancelled = [], []
+    search = make_search(responses={}, delays={}, calls=calls, cancelled=cancelled)
+    results, relaxed = asyncio.run(search_with_relaxation(search, INTENT, fanout=1))
+    assert results == []
+    assert relaxed == ["max_time_minutes", "max_calories"]
+    assert calls == [(True, True), (False, True), (False, False)]
@@ -0,0 +1,71 @@
+import asyncio
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def run():
+        flight = SingleFlight("test")
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(10)))
+        assert all(r == {"value": 42} for r in results)
+        assert len(calls) == 1
+        assert flight.counters["followers"] == 9
+        assert flight.in_flight() == 0
+
+        # Finished work is not remembered
+        await flight.do("k", work)
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def test_errors_reach_every_waiter():
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        flight = SingleFlight("test")
+        results = await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+
+    asyncio.run(run())
+
+
+def test_work_cancelled_only_when_last_waiter_leaves():
+    finished = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(0.05)
+            finished.append(True)
+            return "done"
+        except asyncio.CancelledError:
+            finished.append(False)
+            raise
+
+    async def run():
+        flight = SingleFlight("test")
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        assert await second == "done"
+        assert finished == [True]
+
+        third = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        await asyncio.sleep(0.01)
+        assert finished == [True, False]
+        assert flight.counters["cancelled"] == 1
+
+    asyncio.run(run())
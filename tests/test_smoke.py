@@ -99,3 +99,33 @@ def test_search_recipes_full_logic(mock_search, mock_parse):
     # This usually means in the data fetching/processing layer.
 
     assert len(ids) == len(set(ids)), f"Duplicate IDs found in response: {ids}"
+
+
+@patch("app.api.v1.endpoints.recipes.parse_user_intent")
+@patch("app.api.v1.endpoints.recipes.search_recipes")
+def test_search_recipes_ndjson_stream(mock_search, mock_parse):
+    """
+    Streaming mode emits the intent first, then recipes, then the final metadata.
+    """
+    import json
+
+    mock_parse.return_value = IntentSchema(query="chicken")
+    mock_search.return_value = [
+        {"id": 11, "title": "Recipe A", "extendedIngredients": [{"name": "chicken"}], "readyInMinutes": 20},
+        {"id": 12, "title": "Recipe B", "extendedIngredients": [{"name": "chicken"}], "readyInMinutes": 25},
+    ]
+
+    response = client.post(
+        "/api/v1/recipes/search",
+        json={"query": "chicken", "stream": "ndjson"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+
+    assert events[0]["event"] == "intent"
+    assert events[0]["data"]["parsed_intent"]["query"] == "chicken"
+    assert [e["event"] for e in events[1:-1]] == ["recipe", "recipe"]
+    assert events[-1]["event"] == "done"
+    assert events[-1]["data"]["relaxation_applied"] == []
@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services import llm_service
+from app.services.http_clients import registry
+from app.utils.json_stream import JSONObjectScanner
+
+
+def test_scanner_returns_object_once_balanced():
+    scanner = JSONObjectScanner()
+    chunks = ['Sure! ', '{"query": "pa', 'sta {x}", "intolerances": ["Dairy"', '], "extra": {"a": 1}', '}', ' and more']
+    results = [scanner.feed(c) for c in chunks]
+    assert results[:4] == [None] * 4
+    assert json.loads(results[4]) == {"query": "pasta {x}", "intolerances": ["Dairy"], "extra": {"a": 1}}
+
+
+def test_scanner_validates_members_incrementally():
+    seen = []
+    scanner = JSONObjectScanner(on_member=lambda partial: seen.append(dict(partial)))
+    scanner.feed('{"a": 1, "b": "x,y", "c": [1, 2], "d": 4}')
+    assert seen == [{"a": 1}, {"a": 1, "b": "x,y"}, {"a": 1, "b": "x,y", "c": [1, 2]}]
+
+
+@pytest.fixture
+def fake_ollama(monkeypatch):
+    sent = {}
+
+    def install(tokens):
+        def handler(request):
+            sent["payload"] = json.loads(request.content)
+            lines = [json.dumps({"response": t, "done": False}) for t in tokens]
+            lines.append(json.dumps({"response": "", "done": True}))
+            return httpx.Response(200, content="\n".join(lines).encode())
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setitem(registry._clients, llm_service.PROVIDER, client)
+        return sent
+
+    return install
+
+
+def test_generate_json_stops_at_first_complete_object(fake_ollama):
+    sent = fake_ollama(['{"query": "tacos",', ' "diet": "Vegan"}', ' {"ignored": true}'])
+    data = asyncio.run(llm_service.generate_json("prompt", validate_partial=llm_service._check_partial_intent))
+    assert data == {"query": "tacos", "diet": "Vegan"}
+    assert sent["payload"]["format"] == "json"
+    assert sent["payload"]["stream"] is True
+    assert sent["payload"]["options"]["num_predict"] == llm_service.OLLAMA_NUM_PREDICT
+
+
+def test_generate_json_aborts_on_invalid_member(fake_ollama):
+    fake_ollama(['{"max_calories": "lots",', ' "query": "x"}'])
+    with pytest.raises(Exception):
+        asyncio.run(llm_service.generate_json("prompt", validate_partial=llm_service._check_partial_intent))
+
+
+def test_generate_json_incomplete_output_raises(fake_ollama):
+    fake_ollama(['{"query": "tac'])
+    with pytest.raises(ValueError):
+        asyncio.run(llm_service.generate_json("prompt"))
@@ -0,0 +1,112 @@
+import asyncio
+import base64
+import io
+from unittest.mock import AsyncMock, patch
+
+from PIL import Image, ImageDraw
+
+from app.services import anthropic_service
+from app.services.vision_cache import VisionCache
+from app.utils.image_processing import (
+    VISION_MAX_EDGE,
+    VISION_MAX_PIXELS,
+    decode_image_data,
+    hamming,
+    prepare_image,
+    sniff_media_type,
+)
+
+
+def photo(size=(4000, 3000), seed=0, mode="RGB"):
+    image = Image.new(mode, size, (240, 230, 200, 255)[: len(mode)])
+    draw = ImageDraw.Draw(image)
+    w, h = size
+    # A "plate" and a couple of items, placed differently per seed
+    draw.ellipse((w * 0.1, h * 0.1, w * 0.9, h * 0.9), fill=(250, 250, 250, 255)[: len(mode)])
+    draw.ellipse((w * (0.2 + 0.3 * seed), h * 0.3, w * (0.45 + 0.3 * seed), h * 0.6), fill=(160, 80, 30, 255)[: len(mode)])
+    draw.rectangle((w * 0.55 - w * 0.3 * seed, h * 0.5, w * 0.75 - w * 0.3 * seed, h * 0.8), fill=(60, 140, 60, 255)[: len(mode)])
+    return image
+
+
+def encode(image, fmt="JPEG", **kwargs):
+    out = io.BytesIO()
+    image.save(out, format=fmt, **kwargs)
+    return out.getvalue()
+
+
+def test_large_photo_is_downscaled_and_reencoded():
+    raw = encode(photo(), quality=95)
+    prepared = prepare_image(raw)
+    assert prepared.media_type == "image/jpeg"
+    assert max(prepared.width, prepared.height) <= VISION_MAX_EDGE
+    assert prepared.width * prepared.height <= VISION_MAX_PIXELS
+    assert len(prepared.data) < len(raw)
+    assert prepared.original_size == len(raw)
+
+
+def test_small_jpeg_is_sent_as_is_and_alpha_png_is_flattened():
+    raw = encode(photo((640, 480)), quality=60)
+    assert prepare_image(raw).data == raw
+
+    png = prepare_image(encode(photo((2400, 1800), mode="RGBA"), fmt="PNG"))
+    assert png.media_type == "image/jpeg"
+    assert Image.open(io.BytesIO(png.data)).mode == "RGB"
+
+
+def test_magic_bytes_and_data_urls():
+    assert sniff_media_type(encode(photo((32, 32)), fmt="PNG")[:12]) == "image/png"
+    assert sniff_media_type(encode(photo((32, 32)), fmt="WEBP")[:12]) == "image/webp"
+    assert sniff_media_type(b"not an image") is None
+
+    raw = encode(photo((32, 32)))
+    data, declared = decode_image_data("data:image/png;base64," + base64.b64encode(raw).decode())
+    assert data == raw and declared == "image/png"
+
+
+def test_perceptual_hash_survives_recompression_but_not_a_different_meal():
+    original = prepare_image(encode(photo(), quality=95))
+    resent = prepare_image(encode(photo().resize((1200, 900)), quality=40))
+    other = prepare_image(encode(photo(seed=1), quality=95))
+    assert original.sha256 != resent.sha256
+    assert hamming(original.phash, resent.phash) <= 6
+    assert hamming(original.phash, other.phash) > 6
+
+
+def test_cache_exact_similar_and_expiry():
+    now = [0.0]
+    cache = VisionCache(maxsize=2, ttl=10, max_distance=6, clock=lambda: now[0])
+    first = prepare_image(encode(photo(), quality=95))
+    cache.set(first, "Beef stew: 600 kcal")
+
+    assert cache.get_exact(first.sha256) == "Beef stew: 600 kcal"
+    assert cache.get(prepare_image(encode(photo().resize((1000, 750)), quality=50))) == "Beef stew: 600 kcal"
+    assert cache.get(prepare_image(encode(photo(seed=1)))) is None
+
+    now[0] = 11
+    assert cache.get(first) is None
+
+
+def test_repeat_photo_calls_vision_once():
+    vision = AsyncMock(return_value="Ugali and sukuma: 450 kcal")
+    with patch.object(anthropic_service, "ANTHROPIC_API_KEY", "test"), \
+            patch.object(anthropic_service, "vision_cache", VisionCache()), \
+            patch.object(anthropic_service, "_call_vision", vision):
+        first = base64.b64encode(encode(photo(), quality=95)).decode()
+        again = base64.b64encode(encode(photo().resize((2000, 1500)), quality=70)).decode()
+        assert asyncio.run(anthropic_service.analyze_food_image(first)) == "Ugali and sukuma: 450 kcal"
+        assert asyncio.run(anthropic_service.analyze_food_image(first)) == "Ugali and sukuma: 450 kcal"
+        assert asyncio.run(anthropic_service.analyze_food_image(again)) == "Ugali and sukuma: 450 kcal"
+
+    assert vision.await_count == 1
+    sent = vision.await_args.args[0]
+    assert max(sent.width, sent.height) <= VISION_MAX_EDGE
+
+
+def test_failed_analysis_is_not_cached():
+    vision = AsyncMock(side_effect=[None, "Chapati: 300 kcal"])
+    with patch.object(anthropic_service, "ANTHROPIC_API_KEY", "test"), \
+            patch.object(anthropic_service, "vision_cache", VisionCache()), \
+            patch.object(anthropic_service, "_call_vision", vision):
+        image = base64.b64encode(encode(photo((900, 700)))).decode()
+        assert asyncio.run(anthropic_service.analyze_food_image(image)) == anthropic_service.VISION_FALLBACK
+        assert asyncio.run(anthropic_service.analyze_food_image(image)) == "Chapati: 300 kcal"